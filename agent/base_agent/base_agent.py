@@ -98,6 +98,19 @@ from prompts.agent_prompt import STOP_SIGNAL, get_agent_system_prompt
 from tools.general_tools import (extract_conversation, extract_tool_messages,
                                  get_config_value, write_config_value)
 from tools.price_tools import add_no_trade_record
+from agent_tools.consolidated_server import (consolidated_entry,
+                                             is_consolidated_mode)
+from agent_tools.inprocess_tools import (INPROCESS_MODULES, INPROCESS_TRANSPORT,
+                                         get_transport_mode, inprocess_entry,
+                                         is_inprocess_search_enabled,
+                                         load_inprocess_tools, split_mcp_config)
+from tools.context_prefetch import MarketContextPrefetcher
+from tools.log_sink import SessionLogSink
+from tools.mcp_client_pool import get_mcp_client_pool, is_pool_enabled
+from tools.mcp_status import wait_for_mcp_services
+from tools.session_checkpoint import SessionCheckpoint
+from tools.rate_limiter import (ProviderCallLimiter, backoff_delay,
+                                get_provider_limiter)
 
 # Load environment variables
 load_dotenv()
@@ -296,6 +309,17 @@ class BaseAgent:
         else:
             self.openai_api_key = openai_api_key
 
+        # Shared (cross-process) rate limiter / circuit breaker for this provider
+        self.rate_limiter = get_provider_limiter(self.openai_base_url)
+        # Run callback that takes a token for (and classifies errors of) every model call
+        self._call_limiter = ProviderCallLimiter(self.rate_limiter)
+
+        # Buffered log writer for the running session (opened in run_trading_session)
+        self._log_sink: Optional[SessionLogSink] = None
+
+        # Background loader for the next trading date's prompt context
+        self._context_prefetcher = MarketContextPrefetcher()
+
         # Initialize components
         self.client: Optional[MultiServerMCPClient] = None
         self.tools: Optional[List] = None
@@ -308,7 +332,7 @@ class BaseAgent:
 
     def _get_default_mcp_config(self) -> Dict[str, Dict[str, Any]]:
         """Get default MCP configuration"""
-        return {
+        config = {
             "math": {
                 "transport": "streamable_http",
                 "url": f"http://localhost:{os.getenv('MATH_HTTP_PORT', '8000')}/mcp",
@@ -326,6 +350,17 @@ class BaseAgent:
                 "url": f"http://localhost:{os.getenv('TRADE_HTTP_PORT', '8002')}/mcp",
             },
         }
+        # All tool servers can be hosted by one consolidated process (MCP_SERVER_MODE=consolidated)
+        if is_consolidated_mode():
+            for name, service in (("math", "math"), ("stock_local", "price"), ("search", "search"), ("trade", "trade")):
+                config[name] = consolidated_entry(service)
+        # Local tools can be loaded in-process instead of over HTTP (MCP_TRANSPORT_MODE=inprocess)
+        if get_transport_mode() == INPROCESS_TRANSPORT:
+            for name in ("math", "stock_local", "trade"):
+                config[name] = inprocess_entry(INPROCESS_MODULES[name])
+            if is_inprocess_search_enabled():
+                config["search"] = inprocess_entry(INPROCESS_MODULES["search"])
+        return config
 
     async def initialize(self) -> None:
         """Initialize MCP client and AI model"""
@@ -351,10 +386,20 @@ class BaseAgent:
 
         try:
             # Create MCP client
-            self.client = MultiServerMCPClient(self.mcp_config)
+            # Remote servers go through the MCP client, in-process entries are wrapped directly
+            remote_config, inprocess_config = split_mcp_config(self.mcp_config)
+            self.client = MultiServerMCPClient(remote_config)
+
+            # Wait for supervised services to pass their readiness probe (no-op without a supervisor)
+            await wait_for_mcp_services(remote_config)
 
             # Get tools
-            self.tools = await self.client.get_tools()
+            if is_pool_enabled():
+                # Share keep-alive sessions and cached schemas with the other agents in this process
+                remote_tools = await get_mcp_client_pool().get_tools(remote_config)
+            else:
+                remote_tools = await self.client.get_tools()
+            self.tools = remote_tools + await load_inprocess_tools(inprocess_config)
             if not self.tools:
                 print("⚠️  Warning: No MCP tools loaded. MCP services may not be running.")
                 print(f"   MCP configuration: {self.mcp_config}")
@@ -422,22 +467,41 @@ class BaseAgent:
             "signature": self.signature,
             "new_messages": new_messages
         }
+        if self._log_sink is not None and self._log_sink.log_file == log_file:
+            self._log_sink.write(log_entry)
+            return
         with open(log_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
 
+    def _open_log_sink(self, log_file: str) -> None:
+        """Open the buffered log writer for a session, closing any previous one"""
+        if self._log_sink is not None:
+            self._log_sink.close()
+        self._log_sink = SessionLogSink(log_file)
+
+    async def _close_log_sink(self) -> None:
+        """Flush and close the session log writer"""
+        if self._log_sink is not None:
+            sink, self._log_sink = self._log_sink, None
+            await sink.aclose()
+
     async def _ainvoke_with_retry(self, message: List[Dict[str, str]]) -> Any:
-        """Agent invocation with retry"""
+        """Agent invocation with retry; each model call is throttled by the shared provider rate limiter"""
+        config = {"recursion_limit": 100, "callbacks": [self._call_limiter]}
         for attempt in range(1, self.max_retries + 1):
             try:
                 if self.verbose:
                     print(f"🤖 Calling LLM API ({self.basemodel})...")
-                return await self.agent.ainvoke({"messages": message}, {"recursion_limit": 100})
+                response = await self.agent.ainvoke({"messages": message}, config)
             except Exception as e:
                 if attempt == self.max_retries:
                     raise e
-                print(f"⚠️ Attempt {attempt} failed, retrying after {self.base_delay * attempt} seconds...")
+                delay = backoff_delay(attempt, self.base_delay)
+                print(f"⚠️ Attempt {attempt} failed, retrying after {delay:.2f} seconds...")
                 print(f"Error details: {e}")
-                await asyncio.sleep(self.base_delay * attempt)
+                await asyncio.sleep(delay)
+            else:
+                return response
 
     async def run_trading_session(self, today_date: str) -> None:
         """
@@ -450,12 +514,23 @@ class BaseAgent:
 
         # Set up logging
         log_file = self._setup_logging(today_date)
+        self._open_log_sink(log_file)
         write_config_value("LOG_FILE", log_file)
+        # Resume from the last completed step if an earlier attempt left a checkpoint
+        checkpoint = SessionCheckpoint(os.path.dirname(log_file))
+        saved_state = checkpoint.load()
+
         # Update system prompt
+        if saved_state is not None:
+            system_prompt = saved_state["system_prompt"]
+        else:
+            # Prompt price context for this exact date (prefetched during the previous session if available)
+            market_context = self._context_prefetcher.take(today_date, self.stock_symbols, self.market)
+            system_prompt = get_agent_system_prompt(today_date, self.signature, self.market, self.stock_symbols, market_context=market_context)
         self.agent = create_agent(
             self.model,
             tools=self.tools,
-            system_prompt=get_agent_system_prompt(today_date, self.signature, self.market, self.stock_symbols),
+            system_prompt=system_prompt,
         )
         # If verbose, try to attach console callbacks to the agent itself
         if self.verbose and _ConsoleHandler is not None:
@@ -473,14 +548,22 @@ class BaseAgent:
 
         # Initial user query
         user_query = [{"role": "user", "content": f"Please analyze and update today's ({today_date}) positions."}]
-        message = user_query.copy()
+        if saved_state is not None:
+            message = saved_state["messages"]
+            current_step = saved_state["step"]
+            finished = saved_state["finished"]
+            print(f"♻️ Resuming session {today_date} from step {current_step}")
+        else:
+            message = user_query.copy()
+            current_step = 0
+            finished = False
 
-        # Log initial message
-        self._log_message(log_file, user_query)
+            # Log initial message
+            self._log_message(log_file, user_query)
+            checkpoint.save(system_prompt, message, current_step)
 
         # Trading loop
-        current_step = 0
-        while current_step < self.max_steps:
+        while current_step < self.max_steps and not finished:
             current_step += 1
             print(f"🔄 Step {current_step}/{self.max_steps}")
 
@@ -496,6 +579,7 @@ class BaseAgent:
                     print("✅ Received stop signal, trading session ended")
                     print(agent_response)
                     self._log_message(log_file, [{"role": "assistant", "content": agent_response}])
+                    checkpoint.save(system_prompt, message, current_step, finished=True)
                     break
 
                 # Extract tool messages
@@ -514,6 +598,7 @@ class BaseAgent:
                 # Log messages
                 self._log_message(log_file, new_messages[0])
                 self._log_message(log_file, new_messages[1])
+                checkpoint.save(system_prompt, message, current_step)
 
             except Exception as e:
                 print(f"❌ Trading session error: {str(e)}")
@@ -522,6 +607,7 @@ class BaseAgent:
 
         # Handle trading results
         await self._handle_trading_result(today_date)
+        checkpoint.clear()
 
     async def _handle_trading_result(self, today_date: str) -> None:
         """Handle trading results"""
@@ -622,7 +708,10 @@ class BaseAgent:
         for attempt in range(1, self.max_retries + 1):
             try:
                 print(f"🔄 Attempting to run {self.signature} - {today_date} (Attempt {attempt})")
-                await self.run_trading_session(today_date)
+                try:
+                    await self.run_trading_session(today_date)
+                finally:
+                    await self._close_log_sink()
                 print(f"✅ {self.signature} - {today_date} run successful")
                 return
             except Exception as e:
@@ -655,13 +744,17 @@ class BaseAgent:
         print(f"📊 Trading days to process: {trading_dates}")
 
         # Process each trading day
-        for date in trading_dates:
+        for i, date in enumerate(trading_dates):
             print(f"🔄 Processing {self.signature} - Date: {date}")
 
             # Set configuration
             write_config_value("TODAY_DATE", date)
             write_config_value("SIGNATURE", self.signature)
 
+            # Warm up the next date's prompt context while this date's session runs
+            if i + 1 < len(trading_dates):
+                self._context_prefetcher.schedule(trading_dates[i + 1], self.stock_symbols, self.market)
+
             try:
                 await self.run_with_retry(date)
             except Exception as e:
@@ -669,6 +762,7 @@ class BaseAgent:
                 print(e)
                 raise
 
+        self._context_prefetcher.shutdown()
         print(f"✅ {self.signature} processing completed")
 
     def get_position_summary(self) -> Dict[str, Any]:
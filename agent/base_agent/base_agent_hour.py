@@ -22,6 +22,7 @@ sys.path.insert(0, project_root)
 
 from tools.general_tools import extract_conversation, extract_tool_messages, get_config_value, write_config_value
 from tools.price_tools import add_no_trade_record
+from tools.session_checkpoint import SessionCheckpoint
 from prompts.agent_prompt import get_agent_system_prompt, STOP_SIGNAL
 
 # Load environment variables
@@ -50,14 +51,25 @@ class BaseAgent_Hour(BaseAgent):
         
         # Set up logging
         log_file = self._setup_logging(today_date)
+        self._open_log_sink(log_file)
         write_config_value("LOG_FILE", log_file)
         
         # Update system prompt
         from langchain.agents import create_agent
+        # Resume from the last completed step if an earlier attempt left a checkpoint
+        checkpoint = SessionCheckpoint(os.path.dirname(log_file))
+        saved_state = checkpoint.load()
+
+        if saved_state is not None:
+            system_prompt = saved_state["system_prompt"]
+        else:
+            # Prompt price context for this exact date (prefetched during the previous session if available)
+            market_context = self._context_prefetcher.take(today_date, None, "us")
+            system_prompt = get_agent_system_prompt(today_date, self.signature, market_context=market_context)
         self.agent = create_agent(
             self.model,
             tools=self.tools,
-            system_prompt=get_agent_system_prompt(today_date, self.signature),
+            system_prompt=system_prompt,
         )
         # If verbose, try to attach console callbacks to the agent itself
         if getattr(self, "verbose", False):
@@ -77,14 +89,22 @@ class BaseAgent_Hour(BaseAgent):
 
         # Initial user query
         user_query = [{"role": "user", "content": f"Please analyze and update today's ({today_date}) positions."}]
-        message = user_query.copy()
-        
-        # Log initial message
-        self._log_message(log_file, user_query)
-        
+        if saved_state is not None:
+            message = saved_state["messages"]
+            current_step = saved_state["step"]
+            finished = saved_state["finished"]
+            print(f"♻️ Resuming session {today_date} from step {current_step}")
+        else:
+            message = user_query.copy()
+            current_step = 0
+            finished = False
+
+            # Log initial message
+            self._log_message(log_file, user_query)
+            checkpoint.save(system_prompt, message, current_step)
+
         # Trading loop
-        current_step = 0
-        while current_step < self.max_steps:
+        while current_step < self.max_steps and not finished:
             current_step += 1
             print(f"🔄 Step {current_step}/{self.max_steps}")
             
@@ -100,6 +120,7 @@ class BaseAgent_Hour(BaseAgent):
                     print("✅ Received stop signal, trading session ended")
                     print(agent_response)
                     self._log_message(log_file, [{"role": "assistant", "content": agent_response}])
+                    checkpoint.save(system_prompt, message, current_step, finished=True)
                     break
                 
                 # Extract tool messages with None check
@@ -118,6 +139,7 @@ class BaseAgent_Hour(BaseAgent):
                 # Log messages
                 self._log_message(log_file, new_messages[0])
                 self._log_message(log_file, new_messages[1])
+                checkpoint.save(system_prompt, message, current_step)
                 
             except Exception as e:
                 print(f"❌ Trading session error: {str(e)}")
@@ -126,6 +148,7 @@ class BaseAgent_Hour(BaseAgent):
         
         # Handle trading results
         await self._handle_trading_result(today_date)
+        checkpoint.clear()
     
     def get_trading_dates(self, init_date: str, end_date: str) -> List[str]:
         """
@@ -272,13 +295,17 @@ class BaseAgent_Hour(BaseAgent):
         print(f"📊 Trading days to process: {trading_dates}")
         
         # Process each trading day
-        for date in trading_dates:
+        for i, date in enumerate(trading_dates):
             print(f"🔄 Processing {self.signature} - Date: {date}")
             
             # Set configuration
             write_config_value("TODAY_DATE", date)
             write_config_value("SIGNATURE", self.signature)
             
+            # Warm up the next date's prompt context while this date's session runs
+            if i + 1 < len(trading_dates):
+                self._context_prefetcher.schedule(trading_dates[i + 1], None, "us")
+
             try:
                 await self.run_with_retry(date)
             except Exception as e:
@@ -286,6 +313,7 @@ class BaseAgent_Hour(BaseAgent):
                 print(e)
                 raise
         
+        self._context_prefetcher.shutdown()
         print(f"✅ {self.signature} processing completed")
 
     def __str__(self) -> str:
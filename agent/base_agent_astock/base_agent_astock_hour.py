@@ -34,6 +34,7 @@ from prompts.agent_prompt_astock import STOP_SIGNAL, get_agent_system_prompt_ast
 from tools.general_tools import (extract_conversation, extract_tool_messages,
                                  get_config_value, write_config_value)
 from tools.price_tools import add_no_trade_record
+from tools.session_checkpoint import SessionCheckpoint
 
 # Load environment variables
 load_dotenv()
@@ -275,25 +276,44 @@ class BaseAgentAStock_Hour(BaseAgentAStock):
 
         # Set up logging
         log_file = self._setup_logging(today_date)
+        self._open_log_sink(log_file)
         write_config_value("LOG_FILE", log_file)
 
+        # Resume from the last completed step if an earlier attempt left a checkpoint
+        checkpoint = SessionCheckpoint(os.path.dirname(log_file))
+        saved_state = checkpoint.load()
+
         # Update system prompt - use A-shares specific prompt
+        if saved_state is not None:
+            system_prompt = saved_state["system_prompt"]
+        else:
+            # Prompt price context for this exact date (prefetched during the previous session if available)
+            market_context = self._context_prefetcher.take(today_date, self.stock_symbols, "cn")
+            system_prompt = get_agent_system_prompt_astock(today_date, self.signature, self.stock_symbols, market_context=market_context)
         self.agent = create_agent(
             self.model,
             tools=self.tools,
-            system_prompt=get_agent_system_prompt_astock(today_date, self.signature, self.stock_symbols),
+            system_prompt=system_prompt,
         )
 
         # Initial user query in Chinese
         user_query = [{"role": "user", "content": f"请分析并更新今日（{today_date}）的持仓。"}]
-        message = user_query.copy()
+        if saved_state is not None:
+            message = saved_state["messages"]
+            current_step = saved_state["step"]
+            finished = saved_state["finished"]
+            print(f"♻️ Resuming session {today_date} from step {current_step}")
+        else:
+            message = user_query.copy()
+            current_step = 0
+            finished = False
 
-        # Log initial message
-        self._log_message(log_file, user_query)
+            # Log initial message
+            self._log_message(log_file, user_query)
+            checkpoint.save(system_prompt, message, current_step)
 
         # Trading loop
-        current_step = 0
-        while current_step < self.max_steps:
+        while current_step < self.max_steps and not finished:
             current_step += 1
             print(f"🔄 Step {current_step}/{self.max_steps}")
 
@@ -309,6 +329,7 @@ class BaseAgentAStock_Hour(BaseAgentAStock):
                     print("✅ Received stop signal, trading session ended")
                     print(agent_response)
                     self._log_message(log_file, [{"role": "assistant", "content": agent_response}])
+                    checkpoint.save(system_prompt, message, current_step, finished=True)
                     break
 
                 # Extract tool messages with None check (enhanced error handling)
@@ -327,6 +348,7 @@ class BaseAgentAStock_Hour(BaseAgentAStock):
                 # Log messages
                 self._log_message(log_file, new_messages[0])
                 self._log_message(log_file, new_messages[1])
+                checkpoint.save(system_prompt, message, current_step)
 
             except Exception as e:
                 print(f"❌ Trading session error: {str(e)}")
@@ -335,6 +357,7 @@ class BaseAgentAStock_Hour(BaseAgentAStock):
 
         # Handle trading results
         await self._handle_trading_result(today_date)
+        checkpoint.clear()
 
     def _setup_logging(self, today_date: str) -> str:
         """Set up log file path"""
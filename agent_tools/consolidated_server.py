@@ -0,0 +1,139 @@
+"""
+Consolidated MCP server: all tool sets in one process on one port.
+
+By default start_mcp_services.py launches one Python interpreter per tool server (Math,
+Search, TradeTools, LocalPrices, CryptoTradeTools), each importing fastmcp and the tools
+package and loading price data on its own. With MCP_SERVER_MODE=consolidated a single
+process mounts every FastMCP server's streamable-HTTP app under its own path:
+
+    http://localhost:<MCP_CONSOLIDATED_PORT>/math/mcp
+    http://localhost:<MCP_CONSOLIDATED_PORT>/search/mcp
+    http://localhost:<MCP_CONSOLIDATED_PORT>/trade/mcp
+    http://localhost:<MCP_CONSOLIDATED_PORT>/price/mcp
+    http://localhost:<MCP_CONSOLIDATED_PORT>/crypto/mcp
+
+All tools then share one tools.price_store cache and one copy of the trading (position)
+code. GET /health lists the mounted services and GET /metrics reports per-tool call
+counts, errors and latency histograms for all of them (tools/tool_metrics.py).
+
+MCP_CONSOLIDATED_SERVICES optionally restricts the mounted services (comma separated), and
+MCP_WORKERS > 1 serves the app from several worker processes (see mcp_workers.py).
+"""
+
+import importlib
+import os
+import sys
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+# Ensure project root is on sys.path for absolute imports like `tools.*` / `agent_tools.*`
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+load_dotenv()
+
+CONSOLIDATED_MODE = "consolidated"
+
+# Mount path -> module exposing the FastMCP server as `mcp`
+CONSOLIDATED_SERVICES = {
+    "math": "agent_tools.tool_math",
+    "search": "agent_tools.tool_alphavantage_news",
+    "trade": "agent_tools.tool_trade",
+    "price": "agent_tools.tool_get_price_local",
+    "crypto": "agent_tools.tool_crypto_trade",
+}
+
+
+def get_server_mode() -> str:
+    """How the tool servers are hosted: "separate" (default) or "consolidated" (MCP_SERVER_MODE)"""
+    return os.getenv("MCP_SERVER_MODE", "separate").strip().lower()
+
+
+def is_consolidated_mode() -> bool:
+    return get_server_mode() == CONSOLIDATED_MODE
+
+
+def get_consolidated_port() -> int:
+    return int(os.getenv("MCP_CONSOLIDATED_PORT", "8010"))
+
+
+def consolidated_entry(service: str) -> Dict[str, Any]:
+    """MCP config entry for a service mounted on the consolidated server"""
+    return {
+        "transport": "streamable_http",
+        "url": f"http://localhost:{get_consolidated_port()}/{service}/mcp",
+    }
+
+
+def configured_services() -> List[str]:
+    """Services to mount (MCP_CONSOLIDATED_SERVICES, default all)"""
+    value = os.getenv("MCP_CONSOLIDATED_SERVICES", "")
+    services = [s.strip() for s in value.split(",") if s.strip()]
+    return services or list(CONSOLIDATED_SERVICES)
+
+
+def build_app(services: Optional[Iterable[str]] = None, stateless_http: bool = False):
+    """
+    Build the Starlette app mounting the requested tool servers.
+
+    Args:
+        services: Mount names from CONSOLIDATED_SERVICES; defaults to MCP_CONSOLIDATED_SERVICES
+            or all services
+        stateless_http: Serve without MCP sessions (required with several workers)
+
+    Returns:
+        Starlette application
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Mount, Route
+
+    services = list(services) if services is not None else configured_services()
+    unknown = [s for s in services if s not in CONSOLIDATED_SERVICES]
+    if unknown:
+        raise ValueError(f"Unknown MCP services: {unknown}. Available: {list(CONSOLIDATED_SERVICES)}")
+
+    sub_apps = {}
+    for service in services:
+        module = importlib.import_module(CONSOLIDATED_SERVICES[service])
+        sub_apps[service] = module.mcp.http_app(path="/mcp", stateless_http=stateless_http)
+
+    async def health(request):
+        return JSONResponse({"status": "ok", "services": services})
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Each FastMCP app runs its own session manager; enter all of them
+        async with AsyncExitStack() as stack:
+            for sub_app in sub_apps.values():
+                await stack.enter_async_context(sub_app.lifespan(sub_app))
+            yield
+
+    from tools.tool_metrics import metrics_endpoint
+
+    # One registry per process: /metrics covers every mounted tool set
+    routes = [Route("/health", health), Route("/metrics", metrics_endpoint)]
+    routes += [Mount(f"/{service}", app=sub_app) for service, sub_app in sub_apps.items()]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def main() -> None:
+    import uvicorn
+
+    from agent_tools.mcp_workers import WORKER_MODULE_ENV, get_worker_count
+
+    port = get_consolidated_port()
+    host = os.getenv("MCP_CONSOLIDATED_HOST", "127.0.0.1")
+    workers = get_worker_count()
+    if workers > 1:
+        # Each worker builds its own stateless app and loads its own price store
+        os.environ[WORKER_MODULE_ENV] = "agent_tools.consolidated_server"
+        uvicorn.run("agent_tools.mcp_workers:worker_app", factory=True, host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(build_app(), host=host, port=port)
+
+if __name__ == "__main__":
+    main()
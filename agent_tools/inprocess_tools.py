@@ -0,0 +1,123 @@
+"""
+In-process transport for the local MCP tool servers.
+
+The math, price and trade tools are plain Python functions registered on FastMCP servers.
+When MCP_TRANSPORT_MODE=inprocess, agents load them straight from their modules and wrap
+them as LangChain tools instead of reaching them over streamable HTTP, which removes the
+HTTP round trip / JSON-RPC framing per tool call and the need to run those servers.
+
+The wrappers call FastMCP's own Tool.run(), so argument validation, tool names, schemas
+and the text returned to the model are the same as over HTTP, including the error text
+of a failing call. Tools read runtime config
+(SIGNATURE, TODAY_DATE, LOG_PATH) from the agent process's RUNTIME_ENV_PATH.
+
+The search (news) tools stay on the shared search server unless MCP_INPROCESS_SEARCH=true.
+They filter results by TODAY_DATE as well, so runs that simulate different dates at the
+same time (main_grid.py) load them in-process too.
+
+MCP config entries use {"transport": "inprocess", "module": "<python module>"}; the module
+must expose its FastMCP server as `mcp`.
+"""
+
+import importlib
+import os
+from typing import Any, Dict, List, Tuple
+
+from fastmcp.exceptions import ToolError
+from langchain_core.tools import BaseTool, StructuredTool
+
+INPROCESS_TRANSPORT = "inprocess"
+
+# MCP server name -> module providing the FastMCP server for that name
+INPROCESS_MODULES = {
+    "math": "agent_tools.tool_math",
+    "stock_local": "agent_tools.tool_get_price_local",
+    "price": "agent_tools.tool_get_price_local",
+    "trade": "agent_tools.tool_trade",
+    "crypto_trade": "agent_tools.tool_crypto_trade",
+    "search": "agent_tools.tool_alphavantage_news",
+}
+
+
+def get_transport_mode() -> str:
+    """Transport for local tools: "http" (default) or "inprocess" (MCP_TRANSPORT_MODE)"""
+    return os.getenv("MCP_TRANSPORT_MODE", "http").strip().lower()
+
+
+def is_inprocess_search_enabled() -> bool:
+    """Whether in-process mode also loads the search tools (MCP_INPROCESS_SEARCH, default false)"""
+    return os.getenv("MCP_INPROCESS_SEARCH", "false").strip().lower() in ("1", "true", "yes")
+
+
+def inprocess_entry(module: str) -> Dict[str, Any]:
+    """MCP config entry for a tool module loaded in-process"""
+    return {"transport": INPROCESS_TRANSPORT, "module": module}
+
+
+def split_mcp_config(mcp_config: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Split an MCP config into remote (HTTP/stdio) entries and in-process entries.
+
+    Returns:
+        (remote_config, inprocess_config)
+    """
+    remote_config = {}
+    inprocess_config = {}
+    for name, entry in mcp_config.items():
+        if entry.get("transport") == INPROCESS_TRANSPORT:
+            inprocess_config[name] = entry
+        else:
+            remote_config[name] = entry
+    return remote_config, inprocess_config
+
+
+def _result_to_text(result: Any) -> str:
+    """Flatten a FastMCP ToolResult into the text the MCP adapter would return"""
+    texts = [block.text for block in result.content if getattr(block, "type", None) == "text"]
+    return "\n".join(texts)
+
+
+def _wrap_tool(tool: Any) -> BaseTool:
+    """Wrap one FastMCP FunctionTool as a LangChain StructuredTool with the same schema"""
+
+    async def _call(**kwargs: Any) -> str:
+        # Over HTTP the server turns a failing call into error text for the model (see
+        # FastMCP's ToolManager.call_tool); return the same text instead of raising
+        try:
+            result = await tool.run(kwargs)
+        except ToolError as e:
+            return str(e)
+        except Exception as e:
+            return f"Error calling tool {tool.name!r}: {e}"
+        return _result_to_text(result)
+
+    return StructuredTool.from_function(
+        coroutine=_call,
+        name=tool.name,
+        description=tool.description or "",
+        args_schema=tool.parameters,
+    )
+
+
+async def load_inprocess_tools(inprocess_config: Dict[str, Dict[str, Any]]) -> List[BaseTool]:
+    """
+    Load tools for all in-process MCP entries.
+
+    Args:
+        inprocess_config: Entries with transport "inprocess"
+
+    Returns:
+        LangChain tools, in config order
+    """
+    tools: List[BaseTool] = []
+    for name, entry in inprocess_config.items():
+        module_name = entry.get("module") or INPROCESS_MODULES.get(name)
+        if not module_name:
+            raise ValueError(f"No in-process module configured for MCP server '{name}'")
+        module = importlib.import_module(module_name)
+        server = getattr(module, "mcp", None)
+        if server is None:
+            raise ValueError(f"Module {module_name} does not expose a FastMCP server as `mcp`")
+        server_tools = await server.get_tools()
+        tools.extend(_wrap_tool(tool) for tool in server_tools.values())
+    return tools
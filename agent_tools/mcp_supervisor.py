@@ -0,0 +1,252 @@
+"""
+Readiness/liveness supervisor for the MCP services started by start_mcp_services.py.
+
+A service counts as ready only once a real MCP round trip (initialize + list_tools) over
+streamable HTTP succeeds, not when its port accepts connections. Every check:
+
+    - probes each service URL and records the round-trip latency; p50/p99 are computed
+      over the last MCP_LATENCY_WINDOW probes,
+    - marks a service "degraded" while its p99 exceeds MCP_LATENCY_SLO_MS,
+    - restarts a service whose process exited, whose probes failed MCP_PROBE_FAILURES
+      times in a row, or which stayed degraded for MCP_PROBE_FAILURES checks; restarts of
+      the same service are spaced by exponential backoff,
+    - publishes the result to the status file agents wait on (tools/mcp_status.py).
+"""
+
+import asyncio
+import os
+import subprocess
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_mcp_adapters.sessions import create_session
+
+from tools.mcp_status import READY_STATES, get_status_path, write_status
+from tools.rate_limiter import backoff_delay
+
+
+async def probe_service(url: str, timeout: float) -> float:
+    """
+    Run initialize + list_tools against an MCP server.
+
+    Returns:
+        Round-trip time in milliseconds
+
+    Raises:
+        Exception if the server cannot be reached, does not answer within timeout or
+        reports no tools
+    """
+
+    async def _probe() -> int:
+        async with create_session({"transport": "streamable_http", "url": url}) as session:
+            await session.initialize()
+            result = await session.list_tools()
+            return len(result.tools)
+
+    start = time.perf_counter()
+    tool_count = await asyncio.wait_for(_probe(), timeout)
+    if tool_count == 0:
+        raise RuntimeError(f"{url} lists no tools")
+    return (time.perf_counter() - start) * 1000
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ServiceHealth:
+    """Probe history and restart bookkeeping for one service"""
+
+    def __init__(self, service_id: str, name: str, window: int):
+        self.service_id = service_id
+        self.name = name
+        self.state = "starting"
+        self.latencies = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.degraded_checks = 0
+        self.restarts = 0
+        self.restart_attempt = 0
+        self.next_restart_at = 0.0
+        self.started_at = time.time()
+        self.ever_ready = False
+        self.last_error: Optional[str] = None
+
+    @property
+    def p50_ms(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.50)
+
+    @property
+    def p99_ms(self) -> Optional[float]:
+        return _percentile(list(self.latencies), 0.99)
+
+    def reset(self) -> None:
+        """Forget probe history after a (re)start"""
+        self.state = "starting"
+        self.latencies.clear()
+        self.consecutive_failures = 0
+        self.degraded_checks = 0
+        self.started_at = time.time()
+        self.ever_ready = False
+
+    def to_status(self, urls: List[str], pid: Optional[int]) -> Dict[str, Any]:
+        p50, p99 = self.p50_ms, self.p99_ms
+        return {
+            "name": self.name,
+            "state": self.state,
+            "urls": urls,
+            "pid": pid,
+            "p50_ms": round(p50, 2) if p50 is not None else None,
+            "p99_ms": round(p99, 2) if p99 is not None else None,
+            "samples": len(self.latencies),
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "updated_at": time.time(),
+        }
+
+
+class MCPSupervisor:
+    """Probes, restarts and publishes the status of an MCPServiceManager's services"""
+
+    def __init__(self, manager: Any):
+        """
+        Initialize MCPSupervisor
+
+        Args:
+            manager: MCPServiceManager providing service_configs, services and start_service()
+        """
+        self.manager = manager
+        self.probe_timeout = float(os.getenv("MCP_PROBE_TIMEOUT", "5"))
+        self.failure_threshold = int(os.getenv("MCP_PROBE_FAILURES", "3"))
+        self.latency_slo_ms = float(os.getenv("MCP_LATENCY_SLO_MS", "2000"))
+        self.startup_grace = float(os.getenv("MCP_STARTUP_GRACE", "30"))
+        self.max_restart_backoff = float(os.getenv("MCP_RESTART_MAX_BACKOFF", "60"))
+        self.window = int(os.getenv("MCP_LATENCY_WINDOW", "100"))
+        # Percentiles over fewer probes are too noisy to call a service degraded
+        self.min_samples = 10
+        self.health: Dict[str, ServiceHealth] = {}
+
+    def service_urls(self, service_id: str) -> List[str]:
+        config = self.manager.service_configs[service_id]
+        port = config["port"]
+        return [f"http://localhost:{port}{path}" for path in config.get("mount_paths", ["/mcp"])]
+
+    def _health(self, service_id: str) -> ServiceHealth:
+        if service_id not in self.health:
+            name = self.manager.service_configs[service_id]["name"]
+            self.health[service_id] = ServiceHealth(service_id, name, self.window)
+        return self.health[service_id]
+
+    def is_ready(self, service_id: str) -> bool:
+        health = self.health.get(service_id)
+        return health is not None and health.state in READY_STATES
+
+    async def _probe_all(self) -> Dict[str, List[Any]]:
+        service_ids = list(self.manager.services)
+        urls = {service_id: self.service_urls(service_id) for service_id in service_ids}
+        tasks = [probe_service(url, self.probe_timeout) for service_id in service_ids for url in urls[service_id]]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        results: Dict[str, List[Any]] = {}
+        index = 0
+        for service_id in service_ids:
+            count = len(urls[service_id])
+            results[service_id] = list(outcomes[index : index + count])
+            index += count
+        return results
+
+    def check(self) -> Dict[str, ServiceHealth]:
+        """Probe every started service once, restart unhealthy ones and publish the status"""
+        results = asyncio.run(self._probe_all())
+        now = time.time()
+        for service_id, outcomes in results.items():
+            health = self._health(service_id)
+            process = self.manager.services[service_id]["process"]
+
+            if process.poll() is not None:
+                health.state = "down"
+                health.last_error = f"process exited with code {process.returncode}"
+                self._restart(service_id, health, now)
+                continue
+
+            errors = [o for o in outcomes if isinstance(o, BaseException)]
+            if errors:
+                health.consecutive_failures += 1
+                health.last_error = f"{type(errors[0]).__name__}: {errors[0]}"
+                in_grace = not health.ever_ready and now - health.started_at < self.startup_grace
+                if in_grace:
+                    health.state = "starting"
+                elif health.consecutive_failures >= self.failure_threshold:
+                    health.state = "down"
+                    self._restart(service_id, health, now)
+                continue
+
+            health.consecutive_failures = 0
+            health.last_error = None
+            health.ever_ready = True
+            health.latencies.append(max(outcomes))
+            p99 = health.p99_ms
+            if len(health.latencies) >= self.min_samples and p99 is not None and p99 > self.latency_slo_ms:
+                health.state = "degraded"
+                health.degraded_checks += 1
+                if health.degraded_checks >= self.failure_threshold:
+                    health.last_error = f"p99 {p99:.0f}ms above SLO {self.latency_slo_ms:.0f}ms"
+                    self._restart(service_id, health, now)
+            else:
+                health.state = "ready"
+                health.degraded_checks = 0
+                health.restart_attempt = 0
+
+        self.publish()
+        return self.health
+
+    def _restart(self, service_id: str, health: ServiceHealth, now: float) -> None:
+        if now < health.next_restart_at:
+            return
+        service = self.manager.services[service_id]
+        print(f"🔁 Restarting {health.name} ({health.last_error})")
+        process = service["process"]
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        health.restart_attempt += 1
+        health.restarts += 1
+        health.next_restart_at = now + backoff_delay(health.restart_attempt, 1.0, self.max_restart_backoff)
+        health.reset()
+        self.manager.start_service(service_id, self.manager.service_configs[service_id])
+
+    def wait_until_ready(self, timeout: float, interval: float = 0.5) -> bool:
+        """
+        Probe until every started service is ready.
+
+        Returns:
+            True if all services became ready within timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.check()
+            if all(self.is_ready(service_id) for service_id in self.manager.services):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def publish(self) -> None:
+        """Write the current status of every started service to the status file"""
+        services = {}
+        for service_id, service in self.manager.services.items():
+            health = self._health(service_id)
+            services[service_id] = health.to_status(self.service_urls(service_id), service["process"].pid)
+        write_status({"updated_at": time.time(), "services": services})
+
+    def clear_status(self) -> None:
+        """Remove the status file so agents stop waiting on stopped services"""
+        path = get_status_path()
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,70 @@
+"""
+Worker-pool hosting for the MCP tool servers.
+
+A FastMCP server started with mcp.run() handles every request in one process, so under
+main_parrallel.py all model subprocesses queue up behind the same trade/price server.
+With MCP_WORKERS=N (N > 1) the server is instead served by N uvicorn worker processes
+behind one listening port:
+
+    - Apps run in stateless HTTP mode, so any worker can serve any request (there is no
+      MCP session to pin a client to a worker).
+    - Prices are read through tools.price_store, which memory-maps the price files; the
+      pages are shared by all workers through the OS page cache.
+    - Position updates are serialized across workers by the trade tools' own per-signature
+      file lock, held for the whole read-modify-write of position.jsonl.
+"""
+
+import importlib
+import os
+from typing import Any
+
+WORKER_MODULE_ENV = "MCP_WORKER_MODULE"
+
+
+def get_worker_count() -> int:
+    """Number of worker processes per MCP server (MCP_WORKERS, default 1)"""
+    try:
+        return max(1, int(os.getenv("MCP_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def worker_app() -> Any:
+    """
+    uvicorn app factory executed in every worker process.
+
+    Builds the stateless HTTP app for the module named in MCP_WORKER_MODULE: either the
+    module's build_app() (consolidated server) or its FastMCP `mcp` server.
+    """
+    module = importlib.import_module(os.environ[WORKER_MODULE_ENV])
+    if hasattr(module, "build_app"):
+        return module.build_app(stateless_http=True)
+    return module.mcp.http_app(path="/mcp", stateless_http=True)
+
+
+def run_mcp_server(module_name: str, mcp: Any, port: int) -> None:
+    """
+    Serve an MCP tool server on a port, with MCP_WORKERS worker processes.
+
+    Args:
+        module_name: Importable module defining the server (e.g. "agent_tools.tool_trade")
+        mcp: The module's FastMCP server, used directly in single-worker mode
+        port: Port to listen on
+    """
+    workers = get_worker_count()
+    if workers <= 1:
+        mcp.run(transport="streamable-http", port=port)
+        return
+
+    import uvicorn
+
+    # Worker processes re-import the app through the factory, so pass the module by name
+    os.environ[WORKER_MODULE_ENV] = module_name
+    print(f"🚀 Serving {module_name} with {workers} workers on port {port}")
+    uvicorn.run(
+        "agent_tools.mcp_workers:worker_app",
+        factory=True,
+        host=os.getenv("MCP_HOST", "127.0.0.1"),
+        port=port,
+        workers=workers,
+    )
@@ -14,6 +14,15 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+# Ensure project root is on sys.path for absolute imports like `tools.*` / `agent_tools.*`
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from agent_tools.consolidated_server import configured_services
+from agent_tools.mcp_supervisor import MCPSupervisor
+from tools.mcp_status import get_status_path
+
 load_dotenv()
 
 
@@ -42,6 +51,26 @@ class MCPServiceManager:
             "crypto": {"script": os.path.join(mcp_server_dir, "tool_crypto_trade.py"), "name": "CryptoTradeTools", "port": self.ports["crypto"]},
         }
 
+        # With MCP_TRANSPORT_MODE=inprocess agents load math/price/trade tools directly,
+        # so only the remote (search) service needs to run
+        if os.getenv("MCP_TRANSPORT_MODE", "http").strip().lower() == "inprocess":
+            self.service_configs = {"search": self.service_configs["search"]}
+
+        # With MCP_SERVER_MODE=consolidated every tool set is mounted on one process/port
+        if os.getenv("MCP_SERVER_MODE", "separate").strip().lower() == "consolidated":
+            self.ports["all"] = int(os.getenv("MCP_CONSOLIDATED_PORT", "8010"))
+            self.service_configs = {
+                "all": {
+                    "script": os.path.join(mcp_server_dir, "consolidated_server.py"),
+                    "name": "ConsolidatedTools",
+                    "port": self.ports["all"],
+                    "mount_paths": [f"/{service}/mcp" for service in configured_services()],
+                }
+            }
+
+        # Readiness probes, latency tracking and restarts; publishes the status file agents wait on
+        self.supervisor = MCPSupervisor(self)
+
         # Create logs directory
         self.log_dir = Path("../logs")
         self.log_dir.mkdir(exist_ok=True)
@@ -118,7 +147,8 @@ class MCPServiceManager:
         try:
             # Start service process
             log_file = self.log_dir / f"{service_id}.log"
-            with open(log_file, "w") as f:
+            # Keep the previous output when the supervisor restarts a service
+            with open(log_file, "a" if service_id in self.services else "w") as f:
                 process = subprocess.Popen(
                     [sys.executable, script_path], stdout=f, stderr=subprocess.STDOUT, cwd=os.getcwd()
                 )
@@ -145,17 +175,8 @@ class MCPServiceManager:
         if process.poll() is not None:
             return False
 
-        # Check if port is responding (simple check)
-        try:
-            import socket
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(("localhost", port))
-            sock.close()
-            return result == 0
-        except:
-            return False
+        # Ready only once a real MCP list_tools round trip succeeded
+        return self.supervisor.is_ready(service_id)
 
     def start_all_services(self):
         """Start all services"""
@@ -183,9 +204,9 @@ class MCPServiceManager:
             print("\n❌ No services started successfully")
             return
 
-        # Wait for services to start
-        print("\n⏳ Waiting for services to start...")
-        time.sleep(3)
+        # Wait until every service answers a real MCP list_tools call
+        print("\n⏳ Waiting for services to become ready...")
+        self.supervisor.wait_until_ready(timeout=float(os.getenv("MCP_READY_TIMEOUT", "60")))
 
         # Check service status
         print("\n🔍 Checking service status...")
@@ -205,7 +226,8 @@ class MCPServiceManager:
         healthy_count = 0
         for service_id, service in self.services.items():
             if self.check_service_health(service_id):
-                print(f"✅ {service['name']} service running normally")
+                health = self.supervisor.health[service_id]
+                print(f"✅ {service['name']} service running normally (p50 {health.p50_ms:.1f}ms)")
                 healthy_count += 1
             else:
                 print(f"❌ {service['name']} service failed to start")
@@ -219,29 +241,21 @@ class MCPServiceManager:
             print(f"  - {service['name']}: http://localhost:{service['port']} (PID: {service['process'].pid})")
 
         print(f"\n📁 Log files location: {self.log_dir.absolute()}")
+        print(f"📡 Service status file: {get_status_path()}")
         print("\n🛑 Press Ctrl+C to stop all services")
 
     def keep_alive(self):
-        """Keep services running"""
+        """Keep services running: probe them and restart crashed or degraded ones"""
+        interval = float(os.getenv("MCP_PROBE_INTERVAL", "5"))
         try:
             while self.running:
-                time.sleep(5)
-
-                # Check service status
-                stopped_services = []
-                for service_id, service in self.services.items():
-                    if service["process"].poll() is not None:
-                        stopped_services.append(service["name"])
-
-                if stopped_services:
-                    print(f"\n⚠️  Following service(s) stopped unexpectedly: {', '.join(stopped_services)}")
-                    print(f"📋 Active services: {len(self.services) - len(stopped_services)}/{len(self.services)}")
+                time.sleep(interval)
 
-                    # Only stop all if all services have failed
-                    if len(stopped_services) == len(self.services):
-                        print("❌ All services have stopped, shutting down...")
-                        self.running = False
-                        break
+                health = self.supervisor.check()
+                unhealthy = [h.name for h in health.values() if h.state in ("down", "degraded")]
+                if unhealthy:
+                    print(f"\n⚠️  Unhealthy service(s): {', '.join(unhealthy)}")
+                    print(f"📋 Ready services: {len(self.services) - len(unhealthy)}/{len(self.services)}")
 
         except KeyboardInterrupt:
             pass
@@ -263,6 +277,7 @@ class MCPServiceManager:
             except Exception as e:
                 print(f"❌ Error stopping {service['name']} service: {e}")
 
+        self.supervisor.clear_status()
         print("✅ All services stopped")
 
     def status(self):
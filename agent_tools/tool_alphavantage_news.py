@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from typing import Any, Dict, List, Optional
@@ -12,7 +13,15 @@ import sys
 from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.alphavantage_client import (ALPHAVANTAGE_URL, INTERACTIVE,
+                                       AlphaVantageError,
+                                       get_alphavantage_scheduler)
 from tools.general_tools import get_config_value
+from tools.news_condense import condense_articles, find_article, format_article
+from tools.news_index import cutoff_from_today, get_news_index, rank_articles
+from tools.news_store import get_news_store, get_news_store_mode, normalize_time
+from tools.tool_cache import cached_tool
+from tools.tool_metrics import instrument_tool, register_metrics_route
 
 logger = logging.getLogger(__name__)
 
@@ -88,11 +97,12 @@ def parse_date_to_standard(date_str: str) -> str:
 class AlphaVantageNewsTool:
     def __init__(self):
         self.api_key = os.environ.get("ALPHAADVANTAGE_API_KEY")
-        if not self.api_key:
+        # Offline mode serves everything from the local news store and needs no key
+        if not self.api_key and get_news_store_mode() != "offline":
             raise ValueError(
                 "Alpha Vantage API key not provided! Please set ALPHAADVANTAGE_API_KEY environment variable."
             )
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = ALPHAVANTAGE_URL
 
     def _fetch_news(
         self,
@@ -101,9 +111,11 @@ class AlphaVantageNewsTool:
         time_from: Optional[str] = None,
         time_to: Optional[str] = None,
         sort: str = "LATEST",
+        limit: int = 20,
+        priority: str = INTERACTIVE,
     ) -> List[Dict[str, Any]]:
         """
-        Fetch news articles from Alpha Vantage NEWS_SENTIMENT API
+        Fetch news articles from Alpha Vantage NEWS_SENTIMENT API through the shared request scheduler
 
         Args:
             tickers: Stock/crypto/forex symbols (e.g., "AAPL" or "COIN,CRYPTO:BTC,FOREX:USD")
@@ -111,15 +123,20 @@ class AlphaVantageNewsTool:
             time_from: Start time in YYYYMMDDTHHMM format (e.g., "20220410T0130")
             time_to: End time in YYYYMMDDTHHMM format
             sort: Sort order ("LATEST", "EARLIEST", or "RELEVANCE")
+            limit: Maximum number of articles (API maximum: 1000)
+            priority: Scheduler priority class ("interactive" for agent queries, "bulk" for backfills)
 
         Returns:
-            List of news articles
+            List of news articles (empty only if the response had an empty feed)
+
+        Raises:
+            AlphaVantageError: The response had no feed (e.g. an Information notice)
         """
         params = {
             "function": "NEWS_SENTIMENT",
             "apikey": self.api_key,
             "sort": sort,
-            "limit": 20,  # Fixed limit
+            "limit": limit,
         }
 
         if tickers:
@@ -132,19 +149,16 @@ class AlphaVantageNewsTool:
             params["time_to"] = time_to
 
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-
-            json_data = response.json()
+            # Rate limiting, coalescing of identical queries and error/throttle handling live in the scheduler
+            json_data = get_alphavantage_scheduler(self.base_url).request(params, priority=priority)
 
-            # Check for API errors
-            if "Error Message" in json_data:
-                raise Exception(f"Alpha Vantage API error: {json_data['Error Message']}")
-            if "Note" in json_data:
-                raise Exception(f"Alpha Vantage API note: {json_data['Note']}")
+            # A payload without a feed (premium endpoint, invalid input, ... notices) is not "no news"
+            if "feed" not in json_data:
+                notice = json_data.get("Information") or json_data.get("Error Message") or sorted(json_data)
+                raise AlphaVantageError(f"Alpha Vantage returned no news feed: {notice}")
 
             # Extract feed data
-            feed = json_data.get("feed", [])
+            feed = json_data["feed"]
 
             if not feed:
                 print(f"⚠️ Alpha Vantage API returned empty feed")
@@ -169,7 +183,7 @@ class AlphaVantageNewsTool:
         Search for news articles with date filtering
 
         Args:
-            query: Search query (currently used for logging, actual filtering is done by tickers/topics)
+            query: Search query, articles are ranked by BM25 relevance to it (filtering is done by tickers/topics)
             tickers: Stock/crypto/forex symbols to filter by
             topics: News topics to filter by
 
@@ -203,6 +217,23 @@ class AlphaVantageNewsTool:
         else:
             print("⚠️ TODAY_DATE not set, returning all results without date filtering")
 
+        # Serve from the offline news store when it fully covers the window
+        store = get_news_store()
+        if store is not None and time_from and time_to:
+            if store.covers(tickers, topics, time_from, time_to) or get_news_store_mode() == "offline":
+                index = get_news_index()
+                all_articles = []
+                if index is not None and query:
+                    all_articles = index.search(query, time_to=time_to, time_from=time_from, tickers=tickers, topics=topics)
+                if not all_articles:
+                    # No article matches the query terms: fall back to the latest articles
+                    all_articles = store.query(tickers=tickers, topics=topics, time_from=time_from, time_to=time_to)
+                print(f"Found {len(all_articles)} articles in the offline news store")
+                return all_articles
+        if get_news_store_mode() == "offline":
+            print("⚠️ NEWS_STORE_MODE=offline but no date window available, returning no articles")
+            return []
+
         # Fetch articles with date filtering via API
         all_articles = self._fetch_news(
             tickers=tickers,
@@ -211,16 +242,25 @@ class AlphaVantageNewsTool:
             time_to=time_to,
             sort="LATEST",
         )
+        if store is not None and all_articles:
+            # Write through so later backtests can reuse them (the window is not marked as covered)
+            store.add_articles(all_articles)
+        if query:
+            all_articles = rank_articles(query, all_articles)
 
         print(f"Found {len(all_articles)} articles after API filtering")
         return all_articles
 
 
 mcp = FastMCP("Search")
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 
 @mcp.tool()
-def get_market_news(
+@instrument_tool
+@cached_tool
+async def get_market_news(
     query: str,
     tickers: Optional[str] = None,
     topics: Optional[str] = None
@@ -230,7 +270,7 @@ def get_market_news(
     Only returns articles published before TODAY_DATE (as configured in runtime config).
 
     Args:
-        query: Search query description (used for logging purposes)
+        query: Search query description; articles most relevant to it are listed first
         tickers: Optional. Stock/crypto/forex symbols to filter by.
                 Examples: "AAPL" or "COIN,CRYPTO:BTC,FOREX:USD"
         topics: Optional. News topics to filter by.
@@ -241,11 +281,16 @@ def get_market_news(
                 real_estate, retail_wholesale, technology
 
     Returns:
-        A string containing structured news articles with:
-        - Title: Article title
-        - URL: Article URL
-        - Summary: Article summary
+        A compact table of the most relevant articles (within a token budget), one row per article:
+        article id | date | source | ticker sentiment | title — shortened summary.
+        Use get_news_article with an article id to read one article in full.
     """
+    # Blocking HTTP runs in a worker thread, so concurrent calls of this server overlap and
+    # the Alpha Vantage scheduler can coalesce identical queries and order them by priority
+    return await asyncio.to_thread(_get_market_news, query, tickers, topics)
+
+
+def _get_market_news(query: str, tickers: Optional[str], topics: Optional[str]) -> str:
     try:
         tool = AlphaVantageNewsTool()
         results = tool(query=query, tickers=tickers, topics=topics)
@@ -254,61 +299,41 @@ def get_market_news(
         if not results:
             return f"⚠️ No news articles found matching criteria '{query}' (tickers={tickers}, topics={topics}). Articles may have been filtered out by date restrictions."
 
-        # Convert results to string format
-        formatted_results = []
-        for article in results:
-            title = article.get("title", "N/A")
-            url = article.get("url", "N/A")
-            summary = article.get("summary", "N/A")
-            time_published = article.get("time_published", "unknown")
-            source = article.get("source", "N/A")
-
-            # Format sentiment information
-            overall_sentiment = article.get("overall_sentiment_score", "N/A")
-            sentiment_label = article.get("overall_sentiment_label", "N/A")
-
-            # Format ticker sentiment
-            ticker_sentiment_str = "N/A"
-            ticker_sentiment = article.get("ticker_sentiment", [])
-            if ticker_sentiment:
-                ticker_parts = []
-                for ticker_info in ticker_sentiment:
-                    ticker = ticker_info.get("ticker", "N/A")
-                    relevance = ticker_info.get("relevance_score", "N/A")
-                    sentiment_score = ticker_info.get("ticker_sentiment_score", "N/A")
-                    sentiment_label_ticker = ticker_info.get("ticker_sentiment_label", "N/A")
-                    ticker_parts.append(
-                        f"{ticker}: relevance={relevance}, sentiment={sentiment_score} ({sentiment_label_ticker})"
-                    )
-                ticker_sentiment_str = "; ".join(ticker_parts)
-
-            # Format topics
-            topics_str = "N/A"
-            topics_list = article.get("topics", [])
-            if topics_list:
-                topics_str = ", ".join([topic.get("topic", "") for topic in topics_list])
-
-            formatted_result = f"""Title: {title}
-Summary: {summary[:1000]}
---------------------------------"""
-
-# Time Published: {time_published}
-# Source: {source}
-# Overall Sentiment: {sentiment_label} (score: {overall_sentiment})
-# Ticker Sentiment: {ticker_sentiment_str}
-# Topics: {topics_str}
-            formatted_results.append(formatted_result)
-
-        if not formatted_results:
-            return f"⚠️ No news articles found matching criteria '{query}' after date filtering."
-
-        return "\n".join(formatted_results)
+        # Compact ranked table within the token budget; full articles via get_news_article
+        return condense_articles(results, tickers=tickers, store=get_news_store())
 
     except Exception as e:
         logger.error(f"Alpha Vantage news tool execution failed: {str(e)}")
         return f"❌ Alpha Vantage news tool execution failed: {str(e)}"
 
 
+@mcp.tool()
+@instrument_tool
+@cached_tool
+def get_news_article(article_id: str) -> str:
+    """
+    Read one news article returned by get_market_news in full.
+
+    Args:
+        article_id: Article id from the first column of the get_market_news table, e.g. "20251003-a1b2c3"
+
+    Returns:
+        Title, URL, publish time, source, overall and per-ticker sentiment, topics and the full summary
+    """
+    try:
+        article = find_article(article_id.strip(), get_news_store())
+        if article is None:
+            return f"⚠️ News article '{article_id}' not found. Use an id from the latest get_market_news result."
+        cutoff = cutoff_from_today(get_config_value("TODAY_DATE"))
+        if cutoff and normalize_time(article.get("time_published", "")) > cutoff:
+            return f"⚠️ News article '{article_id}' is not available before TODAY_DATE."
+        return format_article(article)
+
+    except Exception as e:
+        logger.error(f"Alpha Vantage news article lookup failed: {str(e)}")
+        return f"❌ Alpha Vantage news article lookup failed: {str(e)}"
+
+
 if __name__ == "__main__":
     # Run with streamable-http, support configuring host and port through environment variables to avoid conflicts
     print("Running Alpha Vantage News Tool as search tool")
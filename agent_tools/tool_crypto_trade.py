@@ -12,13 +12,17 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 import json
 
+from agent_tools.mcp_workers import run_mcp_server
 from tools.general_tools import get_config_value, write_config_value
+from tools.tool_metrics import instrument_tool, register_metrics_route
 from tools.price_tools import (get_latest_position, get_open_prices,
                                get_yesterday_date,
                                get_yesterday_open_and_close_price,
                                get_yesterday_profit)
 
 mcp = FastMCP("CryptoTradeTools")
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 def _position_lock(signature: str):
     """Context manager for file-based lock to serialize position updates per signature."""
@@ -42,6 +46,7 @@ def _position_lock(signature: str):
 
 
 @mcp.tool()
+@instrument_tool
 def buy_crypto(symbol: str, amount: float) -> Dict[str, Any]:
     """
     Buy cryptocurrency function
@@ -183,6 +188,7 @@ def buy_crypto(symbol: str, amount: float) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@instrument_tool
 def sell_crypto(symbol: str, amount: float) -> Dict[str, Any]:
     """
     Sell cryptocurrency function
@@ -332,4 +338,5 @@ if __name__ == "__main__":
     # new_result = sell_crypto("BTC-USDT", 0.05)
     # print(new_result)
     port = int(os.getenv("CRYPTO_HTTP_PORT", "8014"))
-    mcp.run(transport="streamable-http", port=port)
\ No newline at end of file
+    # MCP_WORKERS > 1 serves the tools from a pool of worker processes
+    run_mcp_server("agent_tools.tool_crypto_trade", mcp, port)
\ No newline at end of file
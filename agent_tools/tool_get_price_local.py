@@ -20,7 +20,14 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from agent_tools.mcp_workers import run_mcp_server
 from tools.general_tools import get_config_value
+from tools.price_store import get_price_store
+from tools.tool_cache import cached_tool
+from tools.tool_metrics import instrument_tool, register_metrics_route
+
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 
 def _workspace_data_path(filename: str, symbol: Optional[str] = None) -> Path:
@@ -63,6 +70,8 @@ def _validate_date_hourly(date_str: str) -> None:
         raise ValueError("date must be in YYYY-MM-DD HH:MM:SS format") from exc
 
 @mcp.tool()
+@instrument_tool
+@cached_tool
 def get_price_local(symbol: str, date: str) -> Dict[str, Any]:
     """Read OHLCV data for specified stock and date. Get historical information for specified stock.
     
@@ -120,48 +129,41 @@ def get_price_local_daily(symbol: str, date: str) -> Dict[str, Any]:
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date,
-                }
-            if date == get_config_value("TODAY_DATE"):
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": "You can not get the current high price",
-                        "low": "You can not get the current low price", 
-                        "close": "You can not get the next close price",
-                        "volume": "You can not get the current volume",
-                    },
-                }
-            else:
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": day.get("2. high"),
-                        "low": day.get("3. low"), 
-                        "close": day.get("4. sell price"),
-                        "volume": day.get("5. volume"),
-                    },
-                }
-
+    # Parsed once per process and shared by every price lookup
+    series = get_price_store().get_series(data_path, symbol, "Time Series (Daily)")
+    if series is not None:
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
+            return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
+                "symbol": symbol,
+                "date": date,
+            }
+        if date == get_config_value("TODAY_DATE"):
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": "You can not get the current high price",
+                    "low": "You can not get the current low price", 
+                    "close": "You can not get the next close price",
+                    "volume": "You can not get the current volume",
+                },
+            }
+        else:
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": day.get("2. high"),
+                    "low": day.get("3. low"), 
+                    "close": day.get("4. sell price"),
+                    "volume": day.get("5. volume"),
+                },
+            }
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
 
@@ -186,47 +188,41 @@ def get_price_local_hourly(symbol: str, date: str) -> Dict[str, Any]:
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (60min)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date
-                }
-            if date == get_config_value("TODAY_DATE"):
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": "You can not get the current high price",
-                        "low": "You can not get the current low price", 
-                        "close": "You can not get the next close price",
-                        "volume": "You can not get the current volume",
-                    },
-                }
-            else:
-                return {
-                    "symbol": symbol,
-                    "date": date,
-                    "ohlcv": {
-                        "open": day.get("1. buy price"),
-                        "high": day.get("2. high"),
-                        "low": day.get("3. low"), 
-                        "close": day.get("4. sell price"),
-                        "volume": day.get("5. volume"),
-                    },
-                }
+    # Parsed once per process and shared by every price lookup
+    series = get_price_store().get_series(data_path, symbol, "Time Series (60min)")
+    if series is not None:
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
+            return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
+                "symbol": symbol,
+                "date": date
+            }
+        if date == get_config_value("TODAY_DATE"):
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": "You can not get the current high price",
+                    "low": "You can not get the current low price", 
+                    "close": "You can not get the next close price",
+                    "volume": "You can not get the current volume",
+                },
+            }
+        else:
+            return {
+                "symbol": symbol,
+                "date": date,
+                "ohlcv": {
+                    "open": day.get("1. buy price"),
+                    "high": day.get("2. high"),
+                    "low": day.get("3. low"), 
+                    "close": day.get("4. sell price"),
+                    "volume": day.get("5. volume"),
+                },
+            }
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
 
@@ -251,34 +247,28 @@ def get_price_local_function(symbol: str, date: str, filename: str = "merged.jso
     if not data_path.exists():
         return {"error": f"Data file not found: {data_path}", "symbol": symbol, "date": date}
 
-    with data_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            doc = json.loads(line)
-            meta = doc.get("Meta Data", {})
-            if meta.get("2. Symbol") != symbol:
-                continue
-            series = doc.get("Time Series (Daily)", {})
-            day = series.get(date)
-            if day is None:
-                sample_dates = sorted(series.keys(), reverse=True)[:5]
-                return {
-                    "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
-                    "symbol": symbol,
-                    "date": date,
-                }
+    # Parsed once per process and shared by every price lookup
+    series = get_price_store().get_series(data_path, symbol, "Time Series (Daily)")
+    if series is not None:
+        day = series.get(date)
+        if day is None:
+            sample_dates = sorted(series.keys(), reverse=True)[:5]
             return {
+                "error": f"Data not found for date {date}. Please verify the date exists in data. Sample available dates: {sample_dates}",
                 "symbol": symbol,
                 "date": date,
-                "ohlcv": {
-                    "buy price": day.get("1. buy price"),
-                    "high": day.get("2. high"),
-                    "low": day.get("3. low"),
-                    "sell price": day.get("4. sell price"),
-                    "volume": day.get("5. volume"),
-                },
             }
+        return {
+            "symbol": symbol,
+            "date": date,
+            "ohlcv": {
+                "buy price": day.get("1. buy price"),
+                "high": day.get("2. high"),
+                "low": day.get("3. low"),
+                "sell price": day.get("4. sell price"),
+                "volume": day.get("5. volume"),
+            },
+        }
 
     return {"error": f"No records found for stock {symbol} in local data", "symbol": symbol, "date": date}
 
@@ -286,4 +276,5 @@ def get_price_local_function(symbol: str, date: str, filename: str = "merged.jso
 if __name__ == "__main__":
     
     port = int(os.getenv("GETPRICE_HTTP_PORT", "8003"))
-    mcp.run(transport="streamable-http", port=port)
+    # MCP_WORKERS > 1 serves the tools from a pool of worker processes
+    run_mcp_server("agent_tools.tool_get_price_local", mcp, port)
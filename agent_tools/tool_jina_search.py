@@ -1,8 +1,12 @@
 import logging
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
@@ -16,6 +20,10 @@ from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tools.general_tools import get_config_value
+from tools.news_index import cutoff_from_today, get_news_index
+from tools.page_cache import get_page_cache
+from tools.tool_cache import cached_tool
+from tools.tool_metrics import instrument_tool, register_metrics_route
 
 logger = logging.getLogger(__name__)
 
@@ -98,57 +106,163 @@ def parse_date_to_standard(date_str: str) -> str:
     return date_str
 
 
+# Search and scrape budgets (seconds): JINA_TIMEOUT per HTTP request, JINA_DEADLINE per search call
+JINA_TIMEOUT = float(os.getenv("JINA_TIMEOUT", "15"))
+JINA_DEADLINE = float(os.getenv("JINA_DEADLINE", "30"))
+# Pages scraped per query and scrapes running concurrently (shared by all queries in the process)
+JINA_MAX_PAGES = int(os.getenv("JINA_MAX_PAGES", "1"))
+JINA_MAX_WORKERS = int(os.getenv("JINA_MAX_WORKERS", "4"))
+
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Process-wide session, so requests to s.jina.ai/r.jina.ai reuse pooled keep-alive connections"""
+    global _session
+    with _pool_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(JINA_MAX_WORKERS, 1))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(JINA_MAX_WORKERS, 1), thread_name_prefix="jina-scrape")
+        return _executor
+
+
+def _published_after_today(publish_time: str) -> bool:
+    """Whether a page's publish time is known and not before the simulated TODAY_DATE"""
+    standardized_date = parse_date_to_standard(publish_time)
+    if standardized_date == "unknown" or standardized_date == publish_time:
+        return False
+    today_date = get_config_value("TODAY_DATE")
+    return bool(today_date) and today_date <= standardized_date
+
+
 class WebScrapingJinaTool:
-    def __init__(self):
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None,
+                 max_pages: Optional[int] = None):
+        """
+        Initialize WebScrapingJinaTool
+
+        Args:
+            timeout: Seconds per HTTP request; defaults to JINA_TIMEOUT (15)
+            deadline: Seconds for a whole search + scrape call; defaults to JINA_DEADLINE (30)
+            max_pages: Pages scraped per query; defaults to JINA_MAX_PAGES (1)
+        """
         self.api_key = os.environ.get("JINA_API_KEY")
         if not self.api_key:
             raise ValueError("Jina API key not provided! Please set JINA_API_KEY environment variable.")
+        self.timeout = JINA_TIMEOUT if timeout is None else timeout
+        self.deadline = JINA_DEADLINE if deadline is None else deadline
+        self.max_pages = max(JINA_MAX_PAGES if max_pages is None else max_pages, 1)
+        self.session = _get_session()
+
+    def _request_timeout(self, deadline_at: Optional[float]) -> float:
+        """Per-request timeout, shortened so a request never outlives the call deadline"""
+        if deadline_at is None:
+            return self.timeout
+        return max(min(self.timeout, deadline_at - time.monotonic()), 0.1)
 
     def __call__(self, query: str) -> List[Dict[str, Any]]:
+        deadline_at = time.monotonic() + self.deadline
         print(f"Searching for {query}")
-        all_urls = self._jina_search(query)
+        all_urls = self._jina_search(query, deadline_at)
         return_content = []
         print(f"Found {len(all_urls)} URLs")
-        if len(all_urls) > 1:
-            # Randomly select three to form new all_urls
-            all_urls = random.sample(all_urls, 1)
-        for url in all_urls:
-            print(f"Scraping {url}")
-            return_content.append(self._jina_scrape(url))
-            print(f"Scraped {url}")
+        if len(all_urls) > self.max_pages:
+            all_urls = random.sample(all_urls, self.max_pages)
+
+        # Scrape concurrently; the call takes as long as the slowest page, capped by the deadline
+        executor = _get_executor()
+        futures = {executor.submit(self._jina_scrape, url, deadline_at): url for url in all_urls}
+        pending = set(futures)
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                return_content.append(future.result())
+                print(f"Scraped {futures[future]}")
+        if pending:
+            # Partial results: unfinished scrapes keep running in the pool but are not awaited
+            for future in pending:
+                future.cancel()
+            print(f"⚠️ Jina scrape deadline ({self.deadline}s) reached, returning {len(return_content)}/{len(futures)} pages")
 
         return return_content
 
-    def _jina_scrape(self, url: str) -> Dict[str, Any]:
+    def _jina_scrape(self, url: str, deadline_at: Optional[float] = None) -> Dict[str, Any]:
         try:
-            jina_url = f"https://r.jina.ai/{url}"
-            headers = {
-                "Accept": "application/json",
-                "Authorization": self.api_key,
-                "X-Timeout": "10",
-                "X-With-Generated-Alt": "true",
-            }
-            response = requests.get(jina_url, headers=headers)
-
-            if response.status_code != 200:
-                raise Exception(f"Jina AI Reader Failed for {url}: {response.status_code}")
-
-            response_dict = response.json()
-
-            return {
-                "url": response_dict["data"]["url"],
-                "title": response_dict["data"]["title"],
-                "description": response_dict["data"]["description"],
-                "content": response_dict["data"]["content"],
-                "publish_time": response_dict["data"].get("publishedTime", "unknown"),
-            }
+            page = self._fetch_page(url, deadline_at)
+            if _published_after_today(page.get("publish_time", "unknown")):
+                # Same rule as the search filter: never show pages published on/after TODAY_DATE
+                return {"url": url, "content": "", "error": f"Page published after TODAY_DATE: {page['publish_time']}"}
+            return page
 
         except Exception as e:
             logger.error(str(e))
             return {"url": url, "content": "", "error": str(e)}
 
-    def _jina_search(self, query: str) -> List[str]:
-        url = f"https://s.jina.ai/?q={query}&n=1"
+    def _fetch_page(self, url: str, deadline_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Page from the page cache, revalidated or re-downloaded through the Jina reader once stale.
+
+        The stored ETag/Last-Modified are the reader's (r.jina.ai) response headers, not the
+        origin page's, so a stale page is only answered with 304 if the reader honours them.
+        """
+        cache = get_page_cache()
+        cached = cache.get(url) if cache is not None else None
+        if cached is not None and cached["fresh"]:
+            return cached["page"]
+
+        timeout = self._request_timeout(deadline_at)
+        jina_url = f"https://r.jina.ai/{url}"
+        headers = {
+            "Accept": "application/json",
+            "Authorization": self.api_key,
+            "X-Timeout": str(max(int(timeout), 1)),
+            "X-With-Generated-Alt": "true",
+        }
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        response = self.session.get(jina_url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and cached is not None:
+            cache.touch(url)
+            return cached["page"]
+        if response.status_code != 200:
+            raise Exception(f"Jina AI Reader Failed for {url}: {response.status_code}")
+
+        response_dict = response.json()
+
+        page = {
+            "url": response_dict["data"]["url"],
+            "title": response_dict["data"]["title"],
+            "description": response_dict["data"]["description"],
+            "content": response_dict["data"]["content"],
+            "publish_time": response_dict["data"].get("publishedTime", "unknown"),
+        }
+        if cache is not None:
+            cache.put(url, page, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        return page
+
+    def _jina_search(self, query: str, deadline_at: Optional[float] = None) -> List[str]:
+        url = "https://s.jina.ai/"
+        params = {"q": query, "n": self.max_pages}
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
@@ -156,7 +270,8 @@ class WebScrapingJinaTool:
         }
 
         try:
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, params=params, headers=headers,
+                                        timeout=self._request_timeout(deadline_at))
             response.raise_for_status()  # 检查HTTP状态码
 
             json_data = response.json()
@@ -210,16 +325,52 @@ class WebScrapingJinaTool:
             return []
 
 
+def search_local_news(query: str, limit: int = 3) -> List[Dict[str, Any]]:
+    """
+    Search the local news index for articles published before TODAY_DATE
+
+    Args:
+        query: Search terms
+        limit: Maximum number of articles
+
+    Returns:
+        Results in the same format as WebScrapingJinaTool, empty if the index is disabled or has no match
+    """
+    index = get_news_index()
+    if index is None:
+        return []
+    try:
+        cutoff = cutoff_from_today(get_config_value("TODAY_DATE"))
+        articles = index.search(query, time_to=cutoff, limit=limit)
+    except Exception as e:
+        logger.error(f"Local news search failed: {e}")
+        return []
+    return [
+        {
+            "url": article.get("url", ""),
+            "title": article.get("title", ""),
+            "description": article.get("source", ""),
+            "content": article.get("summary") or "",
+            "publish_time": parse_date_to_standard(article.get("time_published", "unknown")),
+        }
+        for article in articles
+    ]
+
+
 mcp = FastMCP("Search")
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 
 @mcp.tool()
+@instrument_tool
+@cached_tool
 def get_information(query: str) -> str:
     """
     Use search tool to scrape and return main content information related to specified query in a structured way.
 
     Args:
-        query: Key information or search terms you want to retrieve, will search for the most matching results on the internet.
+        query: Key information or search terms you want to retrieve, will search the local news index first, then the internet, for the most matching results.
 
     Returns:
         A string containing several retrieved web page contents, structured content includes:
@@ -232,8 +383,13 @@ def get_information(query: str) -> str:
         If scraping fails, returns corresponding error information.
     """
     try:
-        tool = WebScrapingJinaTool()
-        results = tool(query)
+        # Relevant stored news answers without any external call; otherwise search the web
+        results = search_local_news(query)
+        if results:
+            print(f"Found {len(results)} articles in the local news index")
+        else:
+            tool = WebScrapingJinaTool()
+            results = tool(query)
 
         # Check if results are empty
         if not results:
@@ -6,12 +6,16 @@ from fastmcp import FastMCP
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from tools.general_tools import get_config_value
+from tools.tool_metrics import instrument_tool, register_metrics_route
 load_dotenv()
 
 mcp = FastMCP("Math")
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 
 @mcp.tool()
+@instrument_tool
 def add(a: float, b: float) -> float:
     """Add two numbers (supports int and float)"""
     # log_file = get_config_value("LOG_FILE")
@@ -26,6 +30,7 @@ def add(a: float, b: float) -> float:
 
 
 @mcp.tool()
+@instrument_tool
 def multiply(a: float, b: float) -> float:
     """Multiply two numbers (supports int and float)"""
     # log_file = get_config_value("LOG_FILE")
@@ -16,7 +16,9 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 import json
 
+from agent_tools.mcp_workers import run_mcp_server
 from tools.general_tools import get_config_value, write_config_value
+from tools.tool_metrics import instrument_tool, register_metrics_route
 from tools.price_tools import (get_latest_position, get_open_prices,
                                get_yesterday_date,
                                get_yesterday_open_and_close_price,
@@ -25,6 +27,8 @@ from brokers.broker_factory import BrokerAdapterFactory
 from brokers.base_broker import OrderType
 
 mcp = FastMCP("TradeTools")
+# Per-tool call/error/latency metrics in Prometheus format at GET /metrics
+register_metrics_route(mcp)
 
 def _position_lock(signature: str):
     """Context manager for file-based lock to serialize position updates per signature."""
@@ -60,6 +64,7 @@ def _position_lock(signature: str):
 
 
 @mcp.tool()
+@instrument_tool
 def buy(symbol: str, amount: int) -> Dict[str, Any]:
     """
     Buy stock function
@@ -144,113 +149,113 @@ def buy(symbol: str, amount: int) -> Dict[str, Any]:
             print(e)
             print(today_date, signature)
             return {"error": f"Failed to load latest position: {e}", "symbol": symbol, "date": today_date}
-    # Step 3: Get stock opening price for the day
-    # Use get_open_prices function to get the opening price of specified stock for the day
-    # If stock symbol does not exist or price data is missing, KeyError exception will be raised
-    try:
-        this_symbol_price = get_open_prices(today_date, [symbol], market=market)[f"{symbol}_price"]
-    except KeyError:
-        # Stock symbol does not exist or price data is missing, return error message
-        return {
-            "error": f"Symbol {symbol} not found! This action will not be allowed.",
-            "symbol": symbol,
-            "date": today_date,
-        }
-    # Validate price availability (e.g., timestamp not present in dataset yet)
-    if this_symbol_price is None:
-        return {
-            "error": f"Price data not available for {symbol} at {today_date}.",
-            "symbol": symbol,
-            "date": today_date,
-            "market": market,
-        }
+        # Step 3: Get stock opening price for the day
+        # Use get_open_prices function to get the opening price of specified stock for the day
+        # If stock symbol does not exist or price data is missing, KeyError exception will be raised
+        try:
+            this_symbol_price = get_open_prices(today_date, [symbol], market=market)[f"{symbol}_price"]
+        except KeyError:
+            # Stock symbol does not exist or price data is missing, return error message
+            return {
+                "error": f"Symbol {symbol} not found! This action will not be allowed.",
+                "symbol": symbol,
+                "date": today_date,
+            }
+        # Validate price availability (e.g., timestamp not present in dataset yet)
+        if this_symbol_price is None:
+            return {
+                "error": f"Price data not available for {symbol} at {today_date}.",
+                "symbol": symbol,
+                "date": today_date,
+                "market": market,
+            }
 
-    # Step 4: Validate buy conditions
-    # Calculate cash required for purchase: stock price × buy quantity
-    try:
-        cash_left = current_position["CASH"] - this_symbol_price * amount
-    except Exception as e:
-        # Defensive: if any unexpected structure, surface a clear error
-        return {
-            "error": f"Failed to compute cash after purchase: {e}",
-            "symbol": symbol,
-            "date": today_date,
-            "price": this_symbol_price,
-            "amount": amount,
-            "position_keys": list(current_position.keys()),
-        }
+        # Step 4: Validate buy conditions
+        # Calculate cash required for purchase: stock price × buy quantity
+        try:
+            cash_left = current_position["CASH"] - this_symbol_price * amount
+        except Exception as e:
+            # Defensive: if any unexpected structure, surface a clear error
+            return {
+                "error": f"Failed to compute cash after purchase: {e}",
+                "symbol": symbol,
+                "date": today_date,
+                "price": this_symbol_price,
+                "amount": amount,
+                "position_keys": list(current_position.keys()),
+            }
 
-    # Check if cash balance is sufficient for purchase
-    if cash_left < 0:
-        # Insufficient cash, return error message
-        return {
-            "error": "Insufficient cash! This action will not be allowed.",
-            "required_cash": this_symbol_price * amount,
-            "cash_available": current_position.get("CASH", 0),
-            "symbol": symbol,
-            "date": today_date,
-        }
-    else:
-        # Step 4.5: Execute Real Broker Trade (if enabled)
-        broker_mode = get_config_value("BROKER_MODE")
-        if broker_mode and broker_mode in ["gjzj", "futu", "auto"]:
-            try:
-                broker = BrokerAdapterFactory.create_broker(symbol=symbol, broker_mode=broker_mode)
-                broker_result = broker.buy(symbol=symbol, amount=amount, order_type=OrderType.MARKET)
-                if broker_result.get("error"):
+        # Check if cash balance is sufficient for purchase
+        if cash_left < 0:
+            # Insufficient cash, return error message
+            return {
+                "error": "Insufficient cash! This action will not be allowed.",
+                "required_cash": this_symbol_price * amount,
+                "cash_available": current_position.get("CASH", 0),
+                "symbol": symbol,
+                "date": today_date,
+            }
+        else:
+            # Step 4.5: Execute Real Broker Trade (if enabled)
+            broker_mode = get_config_value("BROKER_MODE")
+            if broker_mode and broker_mode in ["gjzj", "futu", "auto"]:
+                try:
+                    broker = BrokerAdapterFactory.create_broker(symbol=symbol, broker_mode=broker_mode)
+                    broker_result = broker.buy(symbol=symbol, amount=amount, order_type=OrderType.MARKET)
+                    if broker_result.get("error"):
+                        return {
+                            "error": f"Broker buy failed: {broker_result.get('error')}",
+                            "symbol": symbol,
+                            "amount": amount,
+                            "date": today_date,
+                            "broker_result": broker_result
+                        }
+                except Exception as e:
                     return {
-                        "error": f"Broker buy failed: {broker_result.get('error')}",
+                        "error": f"Broker execution exception: {str(e)}",
                         "symbol": symbol,
                         "amount": amount,
-                        "date": today_date,
-                        "broker_result": broker_result
+                        "date": today_date
                     }
-            except Exception as e:
-                return {
-                    "error": f"Broker execution exception: {str(e)}",
-                    "symbol": symbol,
-                    "amount": amount,
-                    "date": today_date
-                }
 
-        # Step 5: Execute buy operation, update position
-        # Create a copy of current position to avoid directly modifying original data
-        new_position = current_position.copy()
+            # Step 5: Execute buy operation, update position
+            # Create a copy of current position to avoid directly modifying original data
+            new_position = current_position.copy()
 
-        # Decrease cash balance
-        new_position["CASH"] = cash_left
+            # Decrease cash balance
+            new_position["CASH"] = cash_left
 
-        # Increase stock position quantity
-        new_position[symbol] = new_position.get(symbol, 0) + amount
+            # Increase stock position quantity
+            new_position[symbol] = new_position.get(symbol, 0) + amount
 
-        # Step 6: Record transaction to position.jsonl file
-        # Build file path: {project_root}/data/{log_path}/{signature}/position/position.jsonl
-        # Use append mode ("a") to write new transaction record
-        # Each operation ID increments by 1, ensuring uniqueness of operation sequence
-        log_path = get_config_value("LOG_PATH", "./data/agent_data")
-        if log_path.startswith("./data/"):
-            log_path = log_path[7:]  # Remove "./data/" prefix
-        position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
-        with open(position_file_path, "a") as f:
-            # Write JSON format transaction record, containing date, operation ID, transaction details and updated position
-            print(
-                f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'buy','symbol':symbol,'amount':amount},'positions': new_position})}"
-            )
-            f.write(
-                json.dumps(
-                    {
-                        "date": today_date,
-                        "id": current_action_id + 1,
-                        "this_action": {"action": "buy", "symbol": symbol, "amount": amount},
-                        "positions": new_position,
-                    }
+            # Step 6: Record transaction to position.jsonl file
+            # Build file path: {project_root}/data/{log_path}/{signature}/position/position.jsonl
+            # Use append mode ("a") to write new transaction record
+            # Each operation ID increments by 1, ensuring uniqueness of operation sequence
+            log_path = get_config_value("LOG_PATH", "./data/agent_data")
+            if log_path.startswith("./data/"):
+                log_path = log_path[7:]  # Remove "./data/" prefix
+            position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+            with open(position_file_path, "a") as f:
+                # Write JSON format transaction record, containing date, operation ID, transaction details and updated position
+                print(
+                    f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'buy','symbol':symbol,'amount':amount},'positions': new_position})}"
                 )
-                + "\n"
-            )
-        # Step 7: Return updated position
-        write_config_value("IF_TRADE", True)
-        print("IF_TRADE", get_config_value("IF_TRADE"))
-        return new_position
+                f.write(
+                    json.dumps(
+                        {
+                            "date": today_date,
+                            "id": current_action_id + 1,
+                            "this_action": {"action": "buy", "symbol": symbol, "amount": amount},
+                            "positions": new_position,
+                        }
+                    )
+                    + "\n"
+                )
+            # Step 7: Return updated position
+            write_config_value("IF_TRADE", True)
+            print("IF_TRADE", get_config_value("IF_TRADE"))
+            return new_position
 
 
 def _get_today_buy_amount(symbol: str, today_date: str, signature: str) -> int:
@@ -298,6 +303,7 @@ def _get_today_buy_amount(symbol: str, today_date: str, signature: str) -> int:
 
 
 @mcp.tool()
+@instrument_tool
 def sell(symbol: str, amount: int) -> Dict[str, Any]:
     """
     Sell stock function
@@ -375,118 +381,120 @@ def sell(symbol: str, amount: int) -> Dict[str, Any]:
     # Step 2: Get current latest position and operation ID
     # get_latest_position returns two values: position dictionary and current maximum operation ID
     # This ID is used to ensure each operation has a unique identifier
-    current_position, current_action_id = get_latest_position(today_date, signature)
+    # Acquire lock for atomic read-modify-write on positions
+    with _position_lock(signature):
+        current_position, current_action_id = get_latest_position(today_date, signature)
 
-    # Step 3: Get stock opening price for the day
-    # Use get_open_prices function to get the opening price of specified stock for the day
-    # If stock symbol does not exist or price data is missing, KeyError exception will be raised
-    try:
-        this_symbol_price = get_open_prices(today_date, [symbol], market=market)[f"{symbol}_price"]
-    except KeyError:
-        # Stock symbol does not exist or price data is missing, return error message
-        return {
-            "error": f"Symbol {symbol} not found! This action will not be allowed.",
-            "symbol": symbol,
-            "date": today_date,
-        }
+        # Step 3: Get stock opening price for the day
+        # Use get_open_prices function to get the opening price of specified stock for the day
+        # If stock symbol does not exist or price data is missing, KeyError exception will be raised
+        try:
+            this_symbol_price = get_open_prices(today_date, [symbol], market=market)[f"{symbol}_price"]
+        except KeyError:
+            # Stock symbol does not exist or price data is missing, return error message
+            return {
+                "error": f"Symbol {symbol} not found! This action will not be allowed.",
+                "symbol": symbol,
+                "date": today_date,
+            }
 
-    # Step 4: Validate sell conditions
-    # Check if holding this stock
-    if symbol not in current_position:
-        return {
-            "error": f"No position for {symbol}! This action will not be allowed.",
-            "symbol": symbol,
-            "date": today_date,
-        }
+        # Step 4: Validate sell conditions
+        # Check if holding this stock
+        if symbol not in current_position:
+            return {
+                "error": f"No position for {symbol}! This action will not be allowed.",
+                "symbol": symbol,
+                "date": today_date,
+            }
 
-    # Check if position quantity is sufficient for selling
-    if current_position[symbol] < amount:
-        return {
-            "error": "Insufficient shares! This action will not be allowed.",
-            "have": current_position.get(symbol, 0),
-            "want_to_sell": amount,
-            "symbol": symbol,
-            "date": today_date,
-        }
+        # Check if position quantity is sufficient for selling
+        if current_position[symbol] < amount:
+            return {
+                "error": "Insufficient shares! This action will not be allowed.",
+                "have": current_position.get(symbol, 0),
+                "want_to_sell": amount,
+                "symbol": symbol,
+                "date": today_date,
+            }
 
-    # 🇨🇳 Chinese A-shares T+1 trading rule: Cannot sell shares bought on the same day
-    if market == "cn":
-        bought_today = _get_today_buy_amount(symbol, today_date, signature)
-        if bought_today > 0:
-            # Calculate sellable quantity (total position - bought today)
-            sellable_amount = current_position[symbol] - bought_today
-            if amount > sellable_amount:
-                return {
-                    "error": f"T+1 restriction violated! You bought {bought_today} shares of {symbol} today and cannot sell them until tomorrow.",
-                    "symbol": symbol,
-                    "total_position": current_position[symbol],
-                    "bought_today": bought_today,
-                    "sellable_today": max(0, sellable_amount),
-                    "want_to_sell": amount,
-                    "date": today_date,
-                }
+        # 🇨🇳 Chinese A-shares T+1 trading rule: Cannot sell shares bought on the same day
+        if market == "cn":
+            bought_today = _get_today_buy_amount(symbol, today_date, signature)
+            if bought_today > 0:
+                # Calculate sellable quantity (total position - bought today)
+                sellable_amount = current_position[symbol] - bought_today
+                if amount > sellable_amount:
+                    return {
+                        "error": f"T+1 restriction violated! You bought {bought_today} shares of {symbol} today and cannot sell them until tomorrow.",
+                        "symbol": symbol,
+                        "total_position": current_position[symbol],
+                        "bought_today": bought_today,
+                        "sellable_today": max(0, sellable_amount),
+                        "want_to_sell": amount,
+                        "date": today_date,
+                    }
 
-    # Step 4.5: Execute Real Broker Trade (if enabled)
-    broker_mode = get_config_value("BROKER_MODE")
-    if broker_mode and broker_mode in ["gjzj", "futu", "auto"]:
-        try:
-            broker = BrokerAdapterFactory.create_broker(symbol=symbol, broker_mode=broker_mode)
-            broker_result = broker.sell(symbol=symbol, amount=amount, order_type=OrderType.MARKET)
-            if broker_result.get("error"):
+        # Step 4.5: Execute Real Broker Trade (if enabled)
+        broker_mode = get_config_value("BROKER_MODE")
+        if broker_mode and broker_mode in ["gjzj", "futu", "auto"]:
+            try:
+                broker = BrokerAdapterFactory.create_broker(symbol=symbol, broker_mode=broker_mode)
+                broker_result = broker.sell(symbol=symbol, amount=amount, order_type=OrderType.MARKET)
+                if broker_result.get("error"):
+                    return {
+                        "error": f"Broker sell failed: {broker_result.get('error')}",
+                        "symbol": symbol,
+                        "amount": amount,
+                        "date": today_date,
+                        "broker_result": broker_result
+                    }
+            except Exception as e:
                 return {
-                    "error": f"Broker sell failed: {broker_result.get('error')}",
+                    "error": f"Broker execution exception: {str(e)}",
                     "symbol": symbol,
                     "amount": amount,
-                    "date": today_date,
-                    "broker_result": broker_result
+                    "date": today_date
                 }
-        except Exception as e:
-            return {
-                "error": f"Broker execution exception: {str(e)}",
-                "symbol": symbol,
-                "amount": amount,
-                "date": today_date
-            }
 
-    # Step 5: Execute sell operation, update position
-    # Create a copy of current position to avoid directly modifying original data
-    new_position = current_position.copy()
+        # Step 5: Execute sell operation, update position
+        # Create a copy of current position to avoid directly modifying original data
+        new_position = current_position.copy()
 
-    # Decrease stock position quantity
-    new_position[symbol] -= amount
+        # Decrease stock position quantity
+        new_position[symbol] -= amount
 
-    # Increase cash balance: sell price × sell quantity
-    # Use get method to ensure CASH field exists, default to 0 if not present
-    new_position["CASH"] = new_position.get("CASH", 0) + this_symbol_price * amount
+        # Increase cash balance: sell price × sell quantity
+        # Use get method to ensure CASH field exists, default to 0 if not present
+        new_position["CASH"] = new_position.get("CASH", 0) + this_symbol_price * amount
 
-    # Step 6: Record transaction to position.jsonl file
-    # Build file path: {project_root}/data/{log_path}/{signature}/position/position.jsonl
-    # Use append mode ("a") to write new transaction record
-    # Each operation ID increments by 1, ensuring uniqueness of operation sequence
-    log_path = get_config_value("LOG_PATH", "./data/agent_data")
-    if log_path.startswith("./data/"):
-        log_path = log_path[7:]  # Remove "./data/" prefix
-    position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
-    with open(position_file_path, "a") as f:
-        # Write JSON format transaction record, containing date, operation ID and updated position
-        print(
-            f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'sell','symbol':symbol,'amount':amount},'positions': new_position})}"
-        )
-        f.write(
-            json.dumps(
-                {
-                    "date": today_date,
-                    "id": current_action_id + 1,
-                    "this_action": {"action": "sell", "symbol": symbol, "amount": amount},
-                    "positions": new_position,
-                }
+        # Step 6: Record transaction to position.jsonl file
+        # Build file path: {project_root}/data/{log_path}/{signature}/position/position.jsonl
+        # Use append mode ("a") to write new transaction record
+        # Each operation ID increments by 1, ensuring uniqueness of operation sequence
+        log_path = get_config_value("LOG_PATH", "./data/agent_data")
+        if log_path.startswith("./data/"):
+            log_path = log_path[7:]  # Remove "./data/" prefix
+        position_file_path = os.path.join(project_root, "data", log_path, signature, "position", "position.jsonl")
+        with open(position_file_path, "a") as f:
+            # Write JSON format transaction record, containing date, operation ID and updated position
+            print(
+                f"Writing to position.jsonl: {json.dumps({'date': today_date, 'id': current_action_id + 1, 'this_action':{'action':'sell','symbol':symbol,'amount':amount},'positions': new_position})}"
+            )
+            f.write(
+                json.dumps(
+                    {
+                        "date": today_date,
+                        "id": current_action_id + 1,
+                        "this_action": {"action": "sell", "symbol": symbol, "amount": amount},
+                        "positions": new_position,
+                    }
+                )
+                + "\n"
             )
-            + "\n"
-        )
 
-    # Step 7: Return updated position
-    write_config_value("IF_TRADE", True)
-    return new_position
+        # Step 7: Return updated position
+        write_config_value("IF_TRADE", True)
+        return new_position
 
 
 if __name__ == "__main__":
@@ -495,4 +503,5 @@ if __name__ == "__main__":
     # new_result = sell("AAPL", 1)
     # print(new_result)
     port = int(os.getenv("TRADE_HTTP_PORT", "8002"))
-    mcp.run(transport="streamable-http", port=port)
+    # MCP_WORKERS > 1 serves the tools from a pool of worker processes
+    run_mcp_server("agent_tools.tool_trade", mcp, port)
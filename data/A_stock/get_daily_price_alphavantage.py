@@ -1,12 +1,16 @@
 import os
+import sys
+from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 import json
 import datetime
 from collections import OrderedDict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tools.alphavantage_client import BULK, AlphaVantageError, get_alphavantage_scheduler
 sse_50_codes = [
     "600519.SHH",
     "601318.SHH",
@@ -110,18 +114,18 @@ def load_existing_data(filepath: str):
 def get_daily_price(SYMBOL: str):
     FUNCTION = "TIME_SERIES_DAILY"
     OUTPUTSIZE = "compact"
-    APIKEY = os.getenv("ALPHAADVANTAGE_API_KEY")
-    url = (
-        f"https://www.alphavantage.co/query?function={FUNCTION}&symbol={SYMBOL}&entitlement=delayed&outputsize={OUTPUTSIZE}&apikey={APIKEY}"
-    )
-    r = requests.get(url)
-    data = r.json()
+    params = {"function": FUNCTION, "symbol": SYMBOL, "entitlement": "delayed", "outputsize": OUTPUTSIZE}
+    # The shared scheduler paces requests to the API quota (and retries throttled ones)
+    try:
+        data = get_alphavantage_scheduler().request(params, priority=BULK)
+    except AlphaVantageError as e:
+        print(f"Error: {e}")
+        return
+    if data.get("Information") is not None:
+        print(f"Error: {data['Information']}")
+        return
     stock_name = data.get("Meta Data").get("2. Symbol")
     print("Done for ", stock_name)
-    if data.get("Note") is not None or data.get("Information") is not None:
-        print(f"Error")
-        exit()
-        return
     if OUTPUTSIZE == "full":
         data = filter_data(data, "2025-10-01")
     
@@ -185,14 +185,29 @@ function updateStats() {
         dataLoader.formatPercent(bestReturn) : '暂无';
 }
 
+// Points to draw for an agent: the smallest precomputed LTTB resolution that still has
+// a point per pixel of the chart, or the full history
+function getDisplayHistory(data, width) {
+    const history = data.assetHistory;
+    const levels = Object.keys(data.resolutions || {}).map(Number).sort((a, b) => a - b);
+    const level = levels.find(points => points >= width);
+    if (!level) {
+        return history;
+    }
+    return data.resolutions[level].map(i => history[i]).filter(Boolean);
+}
+
 // Create the main chart
 function createChart() {
     const ctx = document.getElementById('assetChart').getContext('2d');
+    const chartWidth = ctx.canvas.clientWidth || ctx.canvas.width;
 
     // Collect all unique dates and sort them
     const allDates = new Set();
+    const displayHistories = {};
     Object.keys(allAgentsData).forEach(agentName => {
-        allAgentsData[agentName].assetHistory.forEach(h => allDates.add(h.date));
+        displayHistories[agentName] = getDisplayHistory(allAgentsData[agentName], chartWidth);
+        displayHistories[agentName].forEach(h => allDates.add(h.date));
     });
     const sortedDates = Array.from(allDates).sort();
 
@@ -220,11 +235,12 @@ function createChart() {
         console.log(`[DATASET ${index}] ${agentName} => COLOR: ${color}, isBenchmark: ${isBenchmark}`);
 
         // Create data points for all dates, filling missing dates with null
+        const valuesByDate = new Map(displayHistories[agentName].map(h => [h.date, h.value]));
         const chartData = sortedDates.map(date => {
-            const historyEntry = data.assetHistory.find(h => h.date === date);
+            const value = valuesByDate.get(date);
             return {
                 x: date,
-                y: historyEntry ? historyEntry.value : null
+                y: value !== undefined ? value : null
             };
         });
 
@@ -117,30 +117,173 @@ class CacheManager {
     }
 
     /**
-     * Load pre-computed cache from server (static JSON file)
+     * Fetch a JSON file from the data directory, bypassing the browser HTTP cache.
+     * Files ending in .gz are decompressed in the browser.
      */
-    async loadServerCache(market) {
+    async fetchJson(path) {
+        // Add cache-busting to prevent browser HTTP cache from serving stale files
+        // This ensures we always check for the latest version from the server
+        const timestamp = Date.now();
+        const response = await fetch(`./data/${path}?v=${timestamp}`, {
+            cache: 'no-store',
+            headers: {
+                'Cache-Control': 'no-cache, no-store, must-revalidate',
+                'Pragma': 'no-cache',
+                'Expires': '0'
+            }
+        });
+
+        if (!response.ok) {
+            return null;
+        }
+
+        if (path.endsWith('.gz')) {
+            const stream = response.body.pipeThrough(new DecompressionStream('gzip'));
+            return await new Response(stream).json();
+        }
+        return await response.json();
+    }
+
+    /**
+     * Fetch one of the encodings listed in a meta file (gzip if the browser can decompress it)
+     */
+    async fetchEncoded(files) {
+        if (files.gzip && typeof DecompressionStream !== 'undefined') {
+            try {
+                const data = await this.fetchJson(files.gzip);
+                if (data) {
+                    return data;
+                }
+            } catch (error) {
+                // e.g. the server already decoded a Content-Encoding: gzip response
+                console.warn(`[CacheManager] Could not read ${files.gzip}, falling back to ${files.json}:`, error);
+            }
+        }
+        return await this.fetchJson(files.json);
+    }
+
+    /**
+     * Columnar asset history ({date: [...], value: [...], ...}) to per-point objects
+     */
+    decodeHistory(history) {
+        if (!history || Array.isArray(history)) {
+            return history || [];
+        }
+        const keys = Object.keys(history);
+        const length = keys.length ? history[keys[0]].length : 0;
+        const points = new Array(length);
+        for (let i = 0; i < length; i++) {
+            const point = {};
+            for (const key of keys) {
+                point[key] = history[key][i];
+            }
+            points[i] = point;
+        }
+        return points;
+    }
+
+    decodeAgents(agentsData) {
+        for (const agent of Object.values(agentsData)) {
+            agent.assetHistory = this.decodeHistory(agent.assetHistory);
+        }
+        return agentsData;
+    }
+
+    /**
+     * Apply one delta file (appended history points, replaced and removed agents)
+     */
+    applyDelta(agentsData, delta) {
+        const next = {};
+        for (const name of delta.order) {
+            if (delta.replace[name]) {
+                next[name] = delta.replace[name];
+                next[name].assetHistory = this.decodeHistory(next[name].assetHistory);
+                continue;
+            }
+            const agent = agentsData[name];
+            if (!agent) {
+                throw new Error(`delta references unknown agent ${name}`);
+            }
+            const change = delta.append[name];
+            if (change) {
+                for (const [field, items] of Object.entries(change.append)) {
+                    const decoded = field === 'assetHistory' ? this.decodeHistory(items) : items;
+                    agent[field] = (agent[field] || []).concat(decoded);
+                }
+                Object.assign(agent, change.set);
+            }
+            next[name] = agent;
+        }
+        return next;
+    }
+
+    /**
+     * Bring a local cache up to the server version through the delta chain in the meta file.
+     * Returns null if the chain does not start at the local version.
+     */
+    async applyDeltas(market, localCache, meta) {
+        try {
+            const chain = meta.deltas || [];
+            let version = localCache.version;
+            let agentsData = localCache.agentsData;
+            let steps = 0;
+
+            while (version !== meta.version) {
+                const step = chain.find(d => d.from === version);
+                if (!step) {
+                    return null;
+                }
+                const delta = await this.fetchEncoded(step.files);
+                if (!delta) {
+                    return null;
+                }
+                agentsData = this.applyDelta(agentsData, delta);
+                version = step.to;
+                steps++;
+            }
+
+            console.log(`[CacheManager] ✓ Applied ${steps} delta(s) for ${market}: ${localCache.version} → ${version}`);
+            return { version, generatedAt: meta.generatedAt, agentsData, method: 'server delta' };
+        } catch (error) {
+            console.warn(`[CacheManager] Failed to apply deltas for ${market}:`, error);
+            return null;
+        }
+    }
+
+    /**
+     * Load pre-computed cache from server.
+     *
+     * The small meta file is read first: an unchanged version reuses the local cache, an
+     * older local version is updated with delta files, and otherwise the full cache is
+     * downloaded (precompressed if possible). Without a meta file the plain JSON is used.
+     */
+    async loadServerCache(market, localCache = null) {
         try {
             console.log(`[CacheManager] Loading server cache for ${market} market...`);
 
-            // Add cache-busting to prevent browser HTTP cache from serving stale files
-            // This ensures we always check for the latest version from the server
-            const timestamp = Date.now();
-            const response = await fetch(`./data/${market}_cache.json?v=${timestamp}`, {
-                cache: 'no-store',
-                headers: {
-                    'Cache-Control': 'no-cache, no-store, must-revalidate',
-                    'Pragma': 'no-cache',
-                    'Expires': '0'
+            const meta = await this.fetchJson(`${market}_cache.meta.json`).catch(() => null);
+
+            if (meta && localCache) {
+                if (localCache.version === meta.version) {
+                    console.log(`[CacheManager] ✓ Server cache unchanged for ${market} (version ${meta.version})`);
+                    return { version: meta.version, generatedAt: meta.generatedAt, agentsData: localCache.agentsData };
                 }
-            });
+                const updated = await this.applyDeltas(market, localCache, meta);
+                if (updated) {
+                    return updated;
+                }
+            }
+
+            const cache = meta
+                ? await this.fetchEncoded(meta.files)
+                : await this.fetchJson(`${market}_cache.json`);
 
-            if (!response.ok) {
-                console.warn(`[CacheManager] Server cache not found for ${market} (${response.status})`);
+            if (!cache) {
+                console.warn(`[CacheManager] Server cache not found for ${market}`);
                 return null;
             }
 
-            const cache = await response.json();
+            this.decodeAgents(cache.agentsData);
             console.log(`[CacheManager] ✓ Server cache loaded for ${market}:`, {
                 version: cache.version,
                 generatedAt: cache.generatedAt,
@@ -284,8 +427,8 @@ class CacheManager {
         // Step 1: Try local cache first (fastest)
         const localCache = this.loadLocalCache(market);
 
-        // Step 2: Load server cache
-        const serverCache = await this.loadServerCache(market);
+        // Step 2: Load server cache (only downloads what changed since the local version)
+        const serverCache = await this.loadServerCache(market, localCache);
 
         // If no server cache exists, use local cache if available
         if (!serverCache) {
@@ -339,13 +482,14 @@ class CacheManager {
         this.saveLocalCache(market, serverCache.version, serverCache.agentsData);
 
         const loadTime = performance.now() - startTime;
+        const method = serverCache.method || 'server cache';
         this.performanceMetrics = {
             lastLoadTime: loadTime,
             cacheHit: true,
-            method: 'server cache'
+            method: method
         };
         if (this.shouldShowPerformanceMetrics()) {
-            console.log(`[CacheManager] ⚡ Cache load time: ${loadTime.toFixed(2)}ms (server cache)`);
+            console.log(`[CacheManager] ⚡ Cache load time: ${loadTime.toFixed(2)}ms (${method})`);
         }
         console.log(`[CacheManager] 📊 Loaded ${Object.keys(serverCache.agentsData).length} agents from server`);
 
@@ -334,7 +334,7 @@ async def main(config_path=None):
             print(f"📋 Error details: {e}")
             # Can choose to continue processing next model, or exit
             # continue  # Continue processing next model
-            exit()  # Or exit program
+            exit(1)  # Or exit program (non-zero so callers such as main_grid.py see the failure)
 
         print("=" * 60)
         print(f"✅ Model {model_name} ({signature}) processing completed")
@@ -0,0 +1,353 @@
+"""
+Experiment grid runner.
+
+Expands a sweep spec (models × agent types × date windows × agent settings) into
+independent jobs and runs each one as a `main.py` subprocess with its own config file,
+LOG_PATH and runtime env file. Jobs are scheduled on a bounded pool with optional
+per-provider concurrency caps; progress is recorded in a manifest so an interrupted
+sweep can be resumed, and completed jobs are summarised with tools/calculate_metrics.
+
+Sweep spec example (configs/grid_example.json):
+{
+  "name": "steps-sweep",
+  "base_config": "configs/ustock_hour_config.json",
+  "output_dir": "./data/grid/steps-sweep",
+  "max_workers": 4,
+  "provider_limits": {"deepseek": 2, "default": 1},
+  "grid": {
+    "models": [{"name": "deepseek-chat", "basemodel": "deepseek-chat", "signature": "deepseek-chat"}],
+    "date_range": [{"init_date": "2025-10-01", "end_date": "2025-10-31"}],
+    "agent_config.max_steps": [10, 30]
+  }
+}
+
+Each "grid" key is a (dotted) path into the base config and maps to the list of values
+to sweep; "models" values are single model entries.
+
+The local tools read SIGNATURE, TODAY_DATE and LOG_PATH from the runtime env file of the
+process they run in, so shared MCP servers would write every job's trades under whichever
+job updated the default runtime env last, and filter search results by its date. Grid
+jobs therefore always run with MCP_TRANSPORT_MODE=inprocess and MCP_INPROCESS_SEARCH=true,
+loading the math, price, trade and search tools inside the job process where they see the
+job's own RUNTIME_ENV_PATH; no MCP services need to be running.
+
+Usage:
+    python main_grid.py configs/grid_example.json [--max-workers N] [--dry-run] [--results-only]
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+MANIFEST_NAME = "manifest.json"
+
+# Model name fragments -> provider key, same detection main.py uses for API credentials
+PROVIDER_PREFIXES = {"deepseek": "deepseek", "minimax": "minimax", "gemini": "gemini"}
+
+
+def load_sweep_spec(spec_path: str) -> Dict[str, Any]:
+    """Load a sweep spec and resolve its base config"""
+    with open(spec_path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    base_config = spec.get("base_config", {})
+    if isinstance(base_config, str):
+        base_path = Path(base_config)
+        if not base_path.is_absolute():
+            base_path = PROJECT_ROOT / base_path
+        with open(base_path, "r", encoding="utf-8") as f:
+            base_config = json.load(f)
+    spec["base_config"] = base_config
+    spec.setdefault("name", Path(spec_path).stem)
+    spec.setdefault("output_dir", f"./data/grid/{spec['name']}")
+    return spec
+
+
+def _set_path(config: Dict[str, Any], dotted_key: str, value: Any) -> None:
+    """Set config['a']['b'] = value for dotted_key 'a.b'"""
+    parts = dotted_key.split(".")
+    node = config
+    for part in parts[:-1]:
+        node = node.setdefault(part, {})
+    node[parts[-1]] = value
+
+
+def _slug(value: Any) -> str:
+    """Short, filesystem-safe label for a swept value"""
+    if isinstance(value, dict):
+        value = value.get("signature") or value.get("name") or value.get("init_date") or json.dumps(value, sort_keys=True)
+    text = str(value).replace(" ", "_").replace(":", "-").replace("/", "-")
+    return text[:40]
+
+
+def get_provider_key(model: Dict[str, Any]) -> str:
+    """Provider used for concurrency caps: explicit 'provider', else detected from the model name"""
+    if model.get("provider"):
+        return model["provider"]
+    name = (model.get("name") or model.get("basemodel") or "").lower()
+    for fragment, provider in PROVIDER_PREFIXES.items():
+        if fragment in name:
+            return provider
+    return "default"
+
+
+def expand_jobs(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand a sweep spec into independent jobs.
+
+    Returns:
+        List of jobs with a stable job_id, the swept params and the full per-job config
+    """
+    grid = spec.get("grid", {})
+    keys = sorted(grid.keys())
+    output_dir = Path(spec["output_dir"])
+    jobs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        config = copy.deepcopy(spec["base_config"])
+        params = dict(zip(keys, values))
+        for key, value in params.items():
+            if key == "models":
+                config["models"] = [dict(value, enabled=True)]
+            else:
+                _set_path(config, key, value)
+
+        enabled_models = [m for m in config.get("models", []) if m.get("enabled", True)]
+        if len(enabled_models) != 1:
+            raise ValueError(f"Each grid job must run exactly one model, got {len(enabled_models)} for {params}")
+        config["models"] = enabled_models
+
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:8]
+        job_id = "__".join(_slug(params[key]) for key in keys) + f"__{digest}" if keys else digest
+        job_dir = output_dir / "jobs" / job_id
+        config.setdefault("log_config", {})["log_path"] = str(job_dir / "agent_data")
+
+        jobs.append({
+            "job_id": job_id,
+            "params": params,
+            "provider": get_provider_key(enabled_models[0]),
+            "job_dir": str(job_dir),
+            "config": config,
+        })
+    return jobs
+
+
+def _position_file(job: Dict[str, Any]) -> Path:
+    config = job["config"]
+    signature = config["models"][0]["signature"]
+    log_path = Path(config["log_config"]["log_path"])
+    if not log_path.is_absolute():
+        log_path = PROJECT_ROOT / log_path
+    return log_path / signature / "position" / "position.jsonl"
+
+
+class GridManifest:
+    """Resumable record of job states, persisted atomically after every change"""
+
+    def __init__(self, output_dir: str):
+        self.path = Path(output_dir) / MANIFEST_NAME
+        self.data: Dict[str, Any] = {"jobs": {}}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+            self.data.setdefault("jobs", {})
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def status(self, job_id: str) -> Optional[str]:
+        return self.data["jobs"].get(job_id, {}).get("status")
+
+    def update(self, job: Dict[str, Any], **fields: Any) -> None:
+        entry = self.data["jobs"].setdefault(job["job_id"], {})
+        entry.setdefault("params", job["params"])
+        entry.setdefault("provider", job["provider"])
+        entry.setdefault("job_dir", job["job_dir"])
+        entry.update(fields)
+        self.save()
+
+    def is_complete(self, job: Dict[str, Any]) -> bool:
+        """A job is complete if it finished successfully and its positions still exist"""
+        return self.status(job["job_id"]) == "done" and _position_file(job).exists()
+
+
+def _job_command(config_file: Path) -> List[str]:
+    return [sys.executable, str(PROJECT_ROOT / "main.py"), str(config_file)]
+
+
+def _job_env(job: Dict[str, Any]) -> Dict[str, str]:
+    """Per-job environment: private runtime env file, in-process local tools, no global date overrides"""
+    env = dict(os.environ)
+    env["RUNTIME_ENV_PATH"] = str(Path(job["job_dir"]).resolve() / ".runtime_env.json")
+    # Tools served by shared MCP processes would read another job's runtime env
+    env["MCP_TRANSPORT_MODE"] = "inprocess"
+    env["MCP_INPROCESS_SEARCH"] = "true"
+    env.pop("INIT_DATE", None)
+    env.pop("END_DATE", None)
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+async def _run_job(job: Dict[str, Any], manifest: GridManifest, global_slots: asyncio.Semaphore,
+                   provider_slots: asyncio.Semaphore) -> bool:
+    job_dir = Path(job["job_dir"])
+    job_dir.mkdir(parents=True, exist_ok=True)
+    config_file = job_dir / "config.json"
+    with open(config_file, "w", encoding="utf-8") as f:
+        json.dump(job["config"], f, ensure_ascii=False, indent=2)
+
+    async with provider_slots, global_slots:
+        print(f"🧩 Starting job {job['job_id']} (provider={job['provider']})")
+        manifest.update(job, status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+        with open(job_dir / "stdout.log", "ab") as log:
+            proc = await asyncio.create_subprocess_exec(
+                *_job_command(config_file), cwd=str(PROJECT_ROOT), env=_job_env(job),
+                stdout=log, stderr=asyncio.subprocess.STDOUT,
+            )
+            returncode = await proc.wait()
+
+    status = "done" if returncode == 0 else "failed"
+    manifest.update(job, status=status, returncode=returncode, finished_at=datetime.now().isoformat(timespec="seconds"))
+    print(f"{'✅' if status == 'done' else '❌'} Job {job['job_id']} {status} (exit code {returncode})")
+    return status == "done"
+
+
+async def run_grid(spec: Dict[str, Any], max_workers: Optional[int] = None) -> GridManifest:
+    """
+    Run all incomplete jobs of a sweep.
+
+    Args:
+        spec: Loaded sweep spec
+        max_workers: Overrides spec['max_workers'] (default 2)
+
+    Returns:
+        The updated manifest
+    """
+    jobs = expand_jobs(spec)
+    manifest = GridManifest(spec["output_dir"])
+    manifest.data["spec"] = {k: v for k, v in spec.items() if k != "base_config"}
+    manifest.save()
+
+    pending = []
+    for job in jobs:
+        if manifest.is_complete(job):
+            print(f"⏭️  Skipping completed job {job['job_id']}")
+        else:
+            manifest.update(job, status="pending")
+            pending.append(job)
+
+    max_workers = max_workers or spec.get("max_workers", 2)
+    provider_limits = spec.get("provider_limits", {})
+    global_slots = asyncio.Semaphore(max_workers)
+    provider_slots: Dict[str, asyncio.Semaphore] = {}
+    for job in pending:
+        if job["provider"] not in provider_slots:
+            limit = provider_limits.get(job["provider"], provider_limits.get("default", max_workers))
+            provider_slots[job["provider"]] = asyncio.Semaphore(max(int(limit), 1))
+
+    print(f"🚀 Running {len(pending)} of {len(jobs)} jobs with up to {max_workers} workers")
+    await asyncio.gather(*(
+        _run_job(job, manifest, global_slots, provider_slots[job["provider"]]) for job in pending
+    ))
+    return manifest
+
+
+def _market_for_job(config: Dict[str, Any]) -> str:
+    agent_type = config.get("agent_type", "BaseAgent")
+    if agent_type.startswith("BaseAgentAStock"):
+        return "cn"
+    if agent_type == "BaseAgentCrypto":
+        return "crypto"
+    return config.get("market", "us")
+
+
+def build_results_table(spec: Dict[str, Any]):
+    """
+    Compute performance metrics for every completed job.
+
+    Returns:
+        pandas DataFrame with one row per job (params + CR/SR/Vol/MDD and friends)
+    """
+    import pandas as pd
+
+    from tools.calculate_metrics import (calculate_metrics,
+                                         calculate_portfolio_values,
+                                         load_all_price_files,
+                                         load_position_data)
+
+    manifest = GridManifest(spec["output_dir"])
+    price_cache: Dict[str, Dict[str, Any]] = {}
+    rows = []
+    for job in expand_jobs(spec):
+        row = {"job_id": job["job_id"], "status": manifest.status(job["job_id"]) or "pending"}
+        row.update({key: _slug(value) for key, value in job["params"].items()})
+        position_file = _position_file(job)
+        if row["status"] == "done" and position_file.exists():
+            config = job["config"]
+            market = _market_for_job(config)
+            data_dir = {"cn": "data/A_stock", "crypto": "data/crypto"}.get(market, "data")
+            if market not in price_cache:
+                price_cache[market] = load_all_price_files(
+                    PROJECT_ROOT / data_dir, is_crypto=market == "crypto", is_astock=market == "cn"
+                )
+            positions = load_position_data(position_file)
+            portfolio_df = calculate_portfolio_values(positions, price_cache[market], market == "crypto", verbose=False)
+            if config.get("agent_type", "").endswith("_Hour"):
+                periods_per_year = 252 * 6.5
+            elif market == "crypto":
+                periods_per_year = 365
+            else:
+                periods_per_year = 252
+            if len(portfolio_df) > 1:
+                metrics = calculate_metrics(portfolio_df, periods_per_year)
+                for key in ("CR", "SR", "Vol", "MDD", "Sharpe Ratio", "Win Rate", "Final Value", "Number of Trades"):
+                    row[key] = metrics[key]
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    output_file = Path(spec["output_dir"]) / "results.csv"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_file, index=False)
+    print(f"📊 Results table saved to {output_file}")
+    return table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI-Trader experiment grid runner")
+    parser.add_argument("spec_path", help="Path to sweep spec JSON")
+    parser.add_argument("--max-workers", type=int, default=None, help="Maximum concurrent jobs")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the expanded jobs")
+    parser.add_argument("--results-only", action="store_true", help="Skip running and only build the results table")
+    args = parser.parse_args()
+
+    spec = load_sweep_spec(args.spec_path)
+    if args.dry_run:
+        manifest = GridManifest(spec["output_dir"])
+        for job in expand_jobs(spec):
+            state = "done" if manifest.is_complete(job) else (manifest.status(job["job_id"]) or "new")
+            print(f"{job['job_id']:<80} provider={job['provider']:<10} {state}")
+        return
+
+    if not args.results_only:
+        asyncio.run(run_grid(spec, args.max_workers))
+    table = build_results_table(spec)
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
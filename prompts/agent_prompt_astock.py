@@ -13,11 +13,12 @@ import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 # Add project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+from tools.context_prefetch import context_matches
 from tools.general_tools import get_config_value
 from tools.price_tools import (all_sse_50_symbols,
                                format_price_dict_with_names, get_open_prices,
@@ -101,7 +102,12 @@ agent_system_prompt_astock = """
 """
 
 
-def get_agent_system_prompt_astock(today_date: str, signature: str, stock_symbols: Optional[List[str]] = None) -> str:
+def get_agent_system_prompt_astock(
+    today_date: str,
+    signature: str,
+    stock_symbols: Optional[List[str]] = None,
+    market_context: Optional[Dict[str, Any]] = None,
+) -> str:
     """
     生成A股专用系统提示词
 
@@ -109,6 +115,7 @@ def get_agent_system_prompt_astock(today_date: str, signature: str, stock_symbol
         today_date: 今日日期
         signature: Agent签名
         stock_symbols: 股票代码列表，默认为上证50成分股
+        market_context: 可选，预取的行情上下文（仅当日期与 today_date 完全一致时使用）
 
     Returns:
         格式化的系统提示词字符串
@@ -124,11 +131,17 @@ def get_agent_system_prompt_astock(today_date: str, signature: str, stock_symbol
     # 获取前一时间点的买入和卖出价格，硬编码market="cn"
     # 对于日线交易：获取昨日的开盘价和收盘价
     # 对于小时级交易：获取上一小时的开盘价和收盘价
-    yesterday_buy_prices, yesterday_sell_prices = get_yesterday_open_and_close_price(
-        today_date, stock_symbols, market="cn"
-    )
-    # 获取当前时间点的买入价格
-    today_buy_price = get_open_prices(today_date, stock_symbols, market="cn")
+    # 若有预取的行情上下文且日期完全匹配则直接复用，否则同步读取
+    if context_matches(market_context, today_date, "cn", stock_symbols):
+        yesterday_buy_prices = market_context["yesterday_buy_prices"]
+        yesterday_sell_prices = market_context["yesterday_sell_prices"]
+        today_buy_price = market_context["today_buy_price"]
+    else:
+        yesterday_buy_prices, yesterday_sell_prices = get_yesterday_open_and_close_price(
+            today_date, stock_symbols, market="cn"
+        )
+        # 获取当前时间点的买入价格
+        today_buy_price = get_open_prices(today_date, stock_symbols, market="cn")
     # 获取当前持仓
     today_init_position = get_today_init_position(today_date, signature)
     
@@ -8,11 +8,12 @@ import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 # Add project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+from tools.context_prefetch import context_matches
 from tools.general_tools import get_config_value
 from tools.price_tools import (format_price_dict_with_names, get_open_prices,
                                get_today_init_position, get_yesterday_date,
@@ -63,7 +64,11 @@ When you think your task is complete, output
 
 
 def get_agent_system_prompt_crypto(
-    today_date: str, signature: str, market: str = "crypto", crypto_symbols: Optional[List[str]] = None
+    today_date: str,
+    signature: str,
+    market: str = "crypto",
+    crypto_symbols: Optional[List[str]] = None,
+    market_context: Optional[Dict[str, Any]] = None,
 ) -> str:
     print(f"signature: {signature}")
     print(f"today_date: {today_date}")
@@ -74,11 +79,16 @@ def get_agent_system_prompt_crypto(
         from agent.base_agent_crypto.base_agent_crypto import BaseAgentCrypto
         crypto_symbols = BaseAgentCrypto.DEFAULT_CRYPTO_SYMBOLS
 
-    # Get yesterday's buy and sell prices
-    yesterday_buy_prices, yesterday_sell_prices = get_yesterday_open_and_close_price(
-        today_date, crypto_symbols, market=market
-    )
-    today_buy_price = get_open_prices(today_date, crypto_symbols, market=market)
+    # Get yesterday's buy and sell prices (reuse prefetched context only if it is for this exact date)
+    if context_matches(market_context, today_date, market, crypto_symbols):
+        yesterday_buy_prices = market_context["yesterday_buy_prices"]
+        yesterday_sell_prices = market_context["yesterday_sell_prices"]
+        today_buy_price = market_context["today_buy_price"]
+    else:
+        yesterday_buy_prices, yesterday_sell_prices = get_yesterday_open_and_close_price(
+            today_date, crypto_symbols, market=market
+        )
+        today_buy_price = get_open_prices(today_date, crypto_symbols, market=market)
     today_init_position = get_today_init_position(today_date, signature)
     # yesterday_profit = get_yesterday_profit(today_date, yesterday_buy_prices, yesterday_sell_prices, today_init_position)
 
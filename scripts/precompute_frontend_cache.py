@@ -5,20 +5,59 @@ Generates a static JSON file with all calculated metrics for faster frontend loa
 Run this script after updating trading data to regenerate the cache.
 
 Usage:
-    python scripts/precompute_frontend_cache.py
+    python scripts/precompute_frontend_cache.py [--full] [--workers N] [--compress gzip,br|none]
+                                                [--[no-]compact] [--delta-history N] [--downsample 300,1200|none]
+
+Only agents whose position ledger changed since the last run are reprocessed (content
+hashes are kept in docs/data/<market>_cache.manifest.json); their results are merged into
+the existing cache file. Changed agents of all markets are processed in a process pool.
 
 Output:
     docs/data/us_cache.json - Pre-computed data for US market
     docs/data/cn_cache.json - Pre-computed data for A-share market
+    docs/data/<market>_cache.json.gz/.br - Precompressed copies
+    docs/data/<market>_cache.meta.json - Current version, encodings and delta chain
+    docs/data/deltas/<market>_delta_<from>_<to>.json - History appended between versions
 """
 
 import os
+import sys
 import json
 import hashlib
+import argparse
+import gzip
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import yaml
 
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from tools.asof_join import CLOSE_FIELDS, cached_series
+from tools.downsample import resolution_levels
+
+DATA_DIR = Path(__file__).parent.parent / 'docs' / 'data'
+
+# Add a manual version prefix to force cache invalidation when data structure changes
+CACHE_FORMAT_VERSION = 'v4'  # Increment this when changing data structure (v4: fixed hourly SSE-50 benchmark)
+
+# Output options; overridden by the `cache` section of docs/config.yaml and the command line
+DEFAULT_OUTPUT = {
+    'compress': ['gzip'],   # precompressed siblings: gzip (.json.gz), br (.json.br)
+    'compact': True,        # columnar asset histories, rounded values, no indentation
+    'precision': 2,         # decimals kept for values in compact mode
+    'delta_history': 5,     # per-version delta files kept (0 disables deltas)
+    'downsample': [300, 1200],  # LTTB point counts of the chart resolutions per agent ([] disables)
+}
+# Agent entry fields that only grow between versions; deltas carry their new items
+APPEND_FIELDS = ('assetHistory', 'positions')
+
 
 def get_data_version_hash(market_config):
     """
@@ -29,7 +68,7 @@ def get_data_version_hash(market_config):
 
     # Get agent data directory
     data_dir = market_config.get('data_dir', 'agent_data')
-    base_path = Path(__file__).parent.parent / 'docs' / 'data' / data_dir
+    base_path = DATA_DIR / data_dir
 
     # Collect all position file timestamps
     position_files = sorted(base_path.glob('*/position/position.jsonl'))
@@ -57,7 +96,7 @@ def load_config():
 def load_position_data(agent_folder, market_config):
     """Load position data for a specific agent."""
     data_dir = market_config.get('data_dir', 'agent_data')
-    position_file = Path(__file__).parent.parent / 'docs' / 'data' / data_dir / agent_folder / 'position' / 'position.jsonl'
+    position_file = DATA_DIR / data_dir / agent_folder / 'position' / 'position.jsonl'
 
     if not position_file.exists():
         return []
@@ -78,11 +117,11 @@ def load_position_data(agent_folder, market_config):
 def load_price_data_us(symbol):
     """Load price data for a US stock."""
     # Try hourly data first
-    price_file = Path(__file__).parent.parent / 'docs' / 'data' / f'Ahourly_prices_{symbol}.json'
+    price_file = DATA_DIR / f'Ahourly_prices_{symbol}.json'
 
     if not price_file.exists():
         # Fall back to daily data
-        price_file = Path(__file__).parent.parent / 'docs' / 'data' / f'daily_prices_{symbol}.json'
+        price_file = DATA_DIR / f'daily_prices_{symbol}.json'
 
     if not price_file.exists():
         return None
@@ -105,7 +144,7 @@ def load_price_data_cn(market_config=None):
     else:
         price_data_file = 'A_stock/merged.jsonl'
 
-    merged_file = Path(__file__).parent.parent / 'docs' / 'data' / price_data_file
+    merged_file = DATA_DIR / price_data_file
 
     if not merged_file.exists():
         return {}
@@ -132,59 +171,19 @@ def load_price_data_cn(market_config=None):
 
 
 def get_closing_price(symbol, date, price_data, market='us'):
-    """Get closing price for a symbol on a specific date."""
-    if market == 'us':
-        prices = price_data.get(symbol)
-        if not prices:
-            return None
-
-        # Try exact match first
-        if date in prices:
-            return float(prices[date].get('4. close') or prices[date].get('4. sell price', 0))
+    """
+    Get closing price for a symbol on a specific date.
 
+    US: the bar at exactly date (daily series are matched on the date part).
+    CN: the bar at date or the closest earlier bar of the same day; a date-only
+    request takes the last bar of that day.
+    """
+    prices = price_data.get(symbol)
+    if not prices:
         return None
 
-    else:  # cn market
-        prices = price_data.get(symbol)
-        if not prices:
-            return None
-
-        # Try exact match first (for hourly data)
-        if date in prices:
-            price_value = prices[date].get('4. close') or prices[date].get('4. sell price', 0)
-            if price_value and price_value != 'N/A':
-                return float(price_value)
-
-        # Extract date only for daily data matching
-        date_only = date.split(' ')[0]
-
-        if date_only in prices:
-            price_value = prices[date_only].get('4. close') or prices[date_only].get('4. sell price', 0)
-            if price_value and price_value != 'N/A':
-                return float(price_value)
-
-        # Try to find the REQUESTED timestamp or closest earlier timestamp on same date
-        date_prefix = date_only
-        matching_keys = [k for k in prices.keys() if k.startswith(date_prefix)]
-
-        if matching_keys:
-            # For hourly timestamps, find the exact or closest earlier time
-            if ':' in date:  # Hourly timestamp requested
-                # Try to find exact or closest earlier match
-                matching_keys = [k for k in matching_keys if k <= date]
-                if matching_keys:
-                    closest_key = sorted(matching_keys)[-1]
-                    price_value = prices[closest_key].get('4. close') or prices[closest_key].get('4. sell price', 0)
-                    if price_value and price_value != 'N/A':
-                        return float(price_value)
-            else:  # Daily date requested
-                # Use last available time on that day
-                last_key = sorted(matching_keys)[-1]
-                price_value = prices[last_key].get('4. close') or prices[last_key].get('4. sell price', 0)
-                if price_value and price_value != 'N/A':
-                    return float(price_value)
-
-        return None
+    series = cached_series(prices, CLOSE_FIELDS, price_file=False)
+    return series.price_at(date, mode='exact' if market == 'us' else 'same_day')
 
 
 def calculate_asset_value(position, date, price_data, market='us'):
@@ -412,7 +411,7 @@ def process_benchmark_us(market_config, agents_data=None):
     print("  Processing QQQ benchmark...")
 
     benchmark_file = market_config.get('benchmark_file', 'Adaily_prices_QQQ.json')
-    benchmark_path = Path(__file__).parent.parent / 'docs' / 'data' / benchmark_file
+    benchmark_path = DATA_DIR / benchmark_file
 
     if not benchmark_path.exists():
         print("    QQQ benchmark file not found")
@@ -501,7 +500,7 @@ def process_benchmark_cn(market_config, agents_data=None):
     print("  Processing SSE 50 benchmark...")
 
     benchmark_file = market_config.get('benchmark_file', 'A_stock/index_daily_sse_50.json')
-    benchmark_path = Path(__file__).parent.parent / 'docs' / 'data' / benchmark_file
+    benchmark_path = DATA_DIR / benchmark_file
 
     if not benchmark_path.exists():
         print("    SSE 50 benchmark file not found")
@@ -615,8 +614,317 @@ def process_benchmark_cn(market_config, agents_data=None):
         return None
 
 
-def generate_cache_for_market(market_id, market_config, config):
-    """Generate cache file for a specific market."""
+def load_price_cache_cn(market_config):
+    """A-share prices for a market config, loaded once per process."""
+    key = (market_config.get('price_data_file'), market_config.get('time_granularity'))
+    if key not in _price_caches_cn:
+        print("  Loading A-share price data...")
+        _price_caches_cn[key] = load_price_data_cn(market_config)
+        print(f"  Loaded prices for {len(_price_caches_cn[key])} symbols")
+    return _price_caches_cn[key]
+
+
+_price_caches_cn = {}
+
+
+def process_agent(market_id, agent_config, market_config):
+    """Process one agent of a market (runs in a worker process)."""
+    if market_id == 'us':
+        return process_agent_data_us(agent_config, market_config)
+    return process_agent_data_cn(agent_config, market_config, load_price_cache_cn(market_config))
+
+
+def agent_fingerprint(agent_config, market_config, output=None):
+    """
+    Content hash of everything an agent's cache entry is computed from: its ledger,
+    its config, the market settings used to value it and the output options applied
+    to it (reused entries keep e.g. the precision they were rounded to).
+
+    Price files are not part of it; run with --full after correcting past prices.
+    """
+    hash_obj = hashlib.sha256()
+    output = output or DEFAULT_OUTPUT
+    settings = {
+        'format': CACHE_FORMAT_VERSION,
+        'agent': agent_config,
+        'market': {k: market_config.get(k) for k in ('data_dir', 'price_data_file', 'time_granularity')},
+        'output': {k: output.get(k) for k in ('compact', 'precision', 'downsample')},
+    }
+    hash_obj.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+
+    data_dir = market_config.get('data_dir', 'agent_data')
+    position_file = DATA_DIR / data_dir / agent_config['folder'] / 'position' / 'position.jsonl'
+    if position_file.exists():
+        with open(position_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                hash_obj.update(block)
+    return hash_obj.hexdigest()
+
+
+def cache_path(market_id):
+    return DATA_DIR / f'{market_id}_cache.json'
+
+
+def manifest_path(market_id):
+    return DATA_DIR / f'{market_id}_cache.manifest.json'
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data, **kwargs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def encode_history(history):
+    """Per-point dicts -> columnar arrays ({'date': [...], 'value': [...], ...})"""
+    columns = {}
+    for point in history:
+        for key in point:
+            columns.setdefault(key, [])
+    for point in history:
+        for key, values in columns.items():
+            values.append(point.get(key))
+    return columns
+
+
+def decode_history(history):
+    """Inverse of encode_history; per-point lists pass through"""
+    if not isinstance(history, dict):
+        return history
+    keys = list(history)
+    return [dict(zip(keys, row)) for row in zip(*(history[key] for key in keys))]
+
+
+def round_agent(entry, precision):
+    """Agent entry with history values and summary figures rounded to precision decimals"""
+    entry = dict(entry)
+    entry['assetHistory'] = [
+        {**point, 'value': round(point['value'], precision)} if isinstance(point.get('value'), float) else point
+        for point in entry.get('assetHistory', [])
+    ]
+    for key in ('initialValue', 'currentValue', 'return'):
+        if isinstance(entry.get(key), float):
+            entry[key] = round(entry[key], precision)
+    return entry
+
+
+def add_resolutions(entry, levels):
+    """
+    Agent entry with LTTB chart resolutions: {"<points>": [assetHistory indices]} for
+    each level shorter than the history. The chart draws the smallest resolution that
+    still has a point per pixel instead of the full history.
+
+    The full history is kept (tables, stats and deltas use it), so the indices make the
+    cache larger, not smaller: about 4% raw / 6% gzipped for a 5000-point history at the
+    default levels. Without levels any stale 'resolutions' key is dropped.
+    """
+    entry = dict(entry)
+    if not levels:
+        entry.pop('resolutions', None)
+        return entry
+    entry['resolutions'] = resolution_levels([point.get('value') for point in entry.get('assetHistory', [])], levels)
+    return entry
+
+
+def encode_agents(agents_data, compact):
+    if not compact:
+        return agents_data
+    return {name: {**entry, 'assetHistory': encode_history(entry.get('assetHistory', []))}
+            for name, entry in agents_data.items()}
+
+
+def load_cache(market_id):
+    """Existing cache file of a market with agent histories decoded, or None"""
+    cache = _load_json(cache_path(market_id))
+    if cache is None:
+        return None
+    for entry in cache.get('agentsData', {}).values():
+        entry['assetHistory'] = decode_history(entry.get('assetHistory', []))
+    return cache
+
+
+def build_delta(old_agents, new_agents):
+    """
+    Changes from one version's agentsData to the next.
+
+    Agents whose list fields only grew carry just the new items ('append') plus their
+    scalar fields ('set'); anything else is sent whole ('replace'). 'order' restores the
+    agent order of the new version.
+    """
+    append, replace = {}, {}
+    for name, new in new_agents.items():
+        old = old_agents.get(name)
+        if old is None or set(old) - set(new):
+            replace[name] = new
+            continue
+        appended = {}
+        for field in APPEND_FIELDS:
+            old_items, new_items = old.get(field, []), new.get(field, [])
+            if new_items[:len(old_items)] != old_items:
+                appended = None
+                break
+            if len(new_items) > len(old_items):
+                appended[field] = new_items[len(old_items):]
+        if appended is None:
+            replace[name] = new
+            continue
+        scalars = {k: v for k, v in new.items() if k not in APPEND_FIELDS}
+        if appended or scalars != {k: v for k, v in old.items() if k not in APPEND_FIELDS}:
+            append[name] = {'append': appended, 'set': scalars}
+    return {
+        'append': append,
+        'replace': replace,
+        'remove': [name for name in old_agents if name not in new_agents],
+        'order': list(new_agents),
+    }
+
+
+def _write_compressed(path, payload, compress):
+    """Write payload bytes and its precompressed siblings; returns {format: file name}"""
+    files = {'json': path.name}
+    _write_bytes(path, payload)
+    if 'gzip' in compress:
+        _write_bytes(path.with_name(path.name + '.gz'), gzip.compress(payload, compresslevel=9, mtime=0))
+        files['gzip'] = path.name + '.gz'
+    if 'br' in compress:
+        if brotli is None:
+            print("  ⚠️ brotli is not installed, skipping .br output (pip install brotli)")
+        else:
+            _write_bytes(path.with_name(path.name + '.br'), brotli.compress(payload, quality=11))
+            files['br'] = path.name + '.br'
+    return files
+
+
+def _write_bytes(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _dumps(data, compact):
+    if compact:
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def write_cache_artifacts(market_id, cache, previous, output):
+    """
+    Write a market's cache file, its compressed siblings, a delta from the previous
+    version and the meta file the frontend reads first.
+
+    docs/data/<market>_cache.meta.json lists the current version, the available encodings
+    of the full cache and the delta chain, so a client holding an older version downloads
+    only the history points appended since.
+    """
+    compact = output['compact']
+    encoding = 'columnar' if compact else 'rows'
+    files = _write_compressed(cache_path(market_id), _dumps(
+        {**cache, 'encoding': encoding, 'agentsData': encode_agents(cache['agentsData'], compact)}, compact
+    ), output['compress'])
+
+    meta_file = DATA_DIR / f'{market_id}_cache.meta.json'
+    deltas = (_load_json(meta_file) or {}).get('deltas', []) if previous else []
+    if previous and previous.get('version') != cache['version'] and output['delta_history'] > 0:
+        delta = build_delta(previous.get('agentsData', {}), cache['agentsData'])
+        for change in delta['append'].values():
+            if 'assetHistory' in change['append'] and compact:
+                change['append']['assetHistory'] = encode_history(change['append']['assetHistory'])
+        delta['replace'] = encode_agents(delta['replace'], compact)
+        name = f"{market_id}_delta_{previous['version']}_{cache['version']}.json"
+        delta_files = _write_compressed(DATA_DIR / 'deltas' / name, _dumps({
+            'market': market_id,
+            'from': previous['version'],
+            'version': cache['version'],
+            'encoding': encoding,
+            **delta,
+        }, compact), output['compress'])
+        deltas.append({'from': previous['version'], 'to': cache['version'],
+                       'files': {k: f'deltas/{v}' for k, v in delta_files.items()}})
+
+    # Keep the newest delta_history deltas and remove the files of older ones
+    keep = deltas[-output['delta_history']:] if output['delta_history'] > 0 else []
+    for dropped in deltas[:len(deltas) - len(keep)]:
+        for file_name in dropped['files'].values():
+            (DATA_DIR / file_name).unlink(missing_ok=True)
+
+    _write_json(meta_file, {
+        'version': cache['version'],
+        'generatedAt': cache['generatedAt'],
+        'encoding': encoding,
+        'files': files,
+        'deltas': keep,
+    }, indent=2)
+    return files
+
+
+def output_options(config, args=None):
+    """DEFAULT_OUTPUT updated from the config's cache section and command line arguments"""
+    cache_config = (config or {}).get('cache') or {}
+    output = {key: cache_config.get(key, default) for key, default in DEFAULT_OUTPUT.items()}
+    if args is not None:
+        if args.compress is not None:
+            output['compress'] = [] if args.compress == 'none' else args.compress.split(',')
+        if args.compact is not None:
+            output['compact'] = args.compact
+        if args.delta_history is not None:
+            output['delta_history'] = args.delta_history
+        if args.downsample is not None:
+            output['downsample'] = [] if args.downsample == 'none' else [int(v) for v in args.downsample.split(',')]
+    return output
+
+
+def plan_market(market_id, market_config, full=False, output=None):
+    """
+    Split a market's enabled agents into reusable cache entries and agents to reprocess.
+
+    An agent is reused when its fingerprint matches the manifest of the last run and the
+    existing cache file still holds its entry.
+
+    Returns:
+        (fingerprints, reused agentsData entries, agent configs to process)
+    """
+    agents = [a for a in market_config.get('agents', []) if a.get('enabled', True)]
+    fingerprints = {a['folder']: agent_fingerprint(a, market_config, output) for a in agents}
+
+    previous = {} if full else (_load_json(manifest_path(market_id)) or {}).get('agents', {})
+    cached = {} if full else (load_cache(market_id) or {}).get('agentsData', {})
+
+    reused, stale = {}, []
+    for agent_config in agents:
+        folder = agent_config['folder']
+        if previous.get(folder) == fingerprints[folder] and folder in cached:
+            reused[folder] = cached[folder]
+        else:
+            stale.append(agent_config)
+    return fingerprints, reused, stale
+
+
+def generate_cache_for_market(market_id, market_config, config, processed=None, reused=None, fingerprints=None,
+                              output=None):
+    """
+    Generate cache file for a specific market.
+
+    Args:
+        market_id: Market key in the config (us, cn, cn_hour, ...)
+        market_config: Market section of the config
+        config: Full config
+        processed: Already computed agent results by folder (None: process all agents here)
+        reused: Unchanged agent entries taken over from the existing cache
+        fingerprints: Agent fingerprints to record in the manifest
+        output: Output options (see DEFAULT_OUTPUT); defaults to the config's cache section
+    """
     print(f"\n{'='*60}")
     print(f"Generating cache for {market_id.upper()} market")
     print(f"{'='*60}")
@@ -625,43 +933,41 @@ def generate_cache_for_market(market_id, market_config, config):
     version = get_data_version_hash(market_config)
     print(f"Version hash: {version}")
 
-    # Process all enabled agents
+    processed = processed or {}
+    reused = reused or {}
+    if reused:
+        print(f"  Reusing {len(reused)} unchanged agents: {', '.join(reused)}")
+
+    # Assemble enabled agents in config order
     agents_data = {}
+    for agent_config in market_config.get('agents', []):
+        if agent_config.get('enabled', True):
+            folder = agent_config['folder']
+            if folder in reused:
+                result = reused[folder]
+            elif folder in processed:
+                result = processed[folder]
+            else:
+                result = process_agent(market_id, agent_config, market_config)
+            if result:
+                agents_data[folder] = result
 
+    # Process benchmark (pass agents_data for initial value matching and date range filtering)
     if market_id == 'us':
-        # Process US market agents
-        for agent_config in market_config.get('agents', []):
-            if agent_config.get('enabled', True):
-                result = process_agent_data_us(agent_config, market_config)
-                if result:
-                    agents_data[agent_config['folder']] = result
-
-        # Process benchmark (pass agents_data for initial value matching)
         benchmark_data = process_benchmark_us(market_config, agents_data)
         if benchmark_data:
             agents_data['QQQ Invesco'] = benchmark_data
-
     else:  # cn market
-        # Load all A-share prices once
-        print("  Loading A-share price data...")
-        price_cache = load_price_data_cn(market_config)
-        print(f"  Loaded prices for {len(price_cache)} symbols")
-
-        # Process A-share market agents
-        for agent_config in market_config.get('agents', []):
-            if agent_config.get('enabled', True):
-                result = process_agent_data_cn(agent_config, market_config, price_cache)
-                if result:
-                    agents_data[agent_config['folder']] = result
-
-        # Process benchmark (pass agents_data for initial value matching and date range filtering)
         benchmark_data = process_benchmark_cn(market_config, agents_data)
         if benchmark_data:
             agents_data[benchmark_data['name']] = benchmark_data
 
+    output = output or output_options(config)
+    if output['compact']:
+        agents_data = {name: round_agent(entry, output['precision']) for name, entry in agents_data.items()}
+    agents_data = {name: add_resolutions(entry, output['downsample']) for name, entry in agents_data.items()}
+
     # Create cache object
-    # Add a manual version prefix to force cache invalidation when data structure changes
-    CACHE_FORMAT_VERSION = 'v4'  # Increment this when changing data structure (v4: fixed hourly SSE-50 benchmark)
     cache = {
         'version': f"{CACHE_FORMAT_VERSION}_{version}",
         'generatedAt': datetime.now().isoformat(),
@@ -669,38 +975,103 @@ def generate_cache_for_market(market_id, market_config, config):
         'agentsData': agents_data
     }
 
-    # Write cache file
-    output_path = Path(__file__).parent.parent / 'docs' / 'data' / f'{market_id}_cache.json'
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, 'w') as f:
-        json.dump(cache, f, indent=2)
+    # Write cache file, compressed siblings and the delta from the previous version
+    output_path = cache_path(market_id)
+    previous = load_cache(market_id)
+    files = write_cache_artifacts(market_id, cache, previous, output)
+    if fingerprints is None:
+        fingerprints = {
+            a['folder']: agent_fingerprint(a, market_config, output)
+            for a in market_config.get('agents', []) if a.get('enabled', True)
+        }
+    _write_json(manifest_path(market_id), {'version': cache['version'], 'agents': fingerprints}, indent=2)
 
     print(f"\n✓ Cache generated: {output_path}")
     print(f"  - Version: {cache['version']}")
     print(f"  - Agents: {len(agents_data)}")
-    print(f"  - File size: {output_path.stat().st_size / 1024:.1f} KB")
+    for file_name in files.values():
+        print(f"  - {file_name}: {(DATA_DIR / file_name).stat().st_size / 1024:.1f} KB")
 
     return cache
 
 
-def main():
+def process_stale_agents(tasks, workers):
+    """
+    Process (market_id, agent_config, market_config) tasks, in a process pool if workers > 1.
+
+    Returns:
+        Dict of (market_id, folder) -> agent result (None if it failed or had no data)
+    """
+    results = {}
+    if workers <= 1 or len(tasks) <= 1:
+        for market_id, agent_config, market_config in tasks:
+            key = (market_id, agent_config['folder'])
+            try:
+                results[key] = process_agent(market_id, agent_config, market_config)
+            except Exception as e:
+                print(f"\n✗ Error processing {key[1]} ({key[0]}): {e}")
+                results[key] = None
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = {
+            pool.submit(process_agent, market_id, agent_config, market_config): (market_id, agent_config['folder'])
+            for market_id, agent_config, market_config in tasks
+        }
+        for future, key in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                print(f"\n✗ Error processing {key[1]} ({key[0]}): {e}")
+                results[key] = None
+    return results
+
+
+def main(argv=None):
     """Main function to generate cache files for all markets."""
+    parser = argparse.ArgumentParser(description='Pre-compute frontend cache files')
+    parser.add_argument('--full', action='store_true', help='Reprocess every agent, ignoring the manifest')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for agent processing (default: CPU count)')
+    parser.add_argument('--compress', help='Precompressed siblings: comma separated gzip,br or none')
+    parser.add_argument('--compact', action=argparse.BooleanOptionalAction, default=None,
+                        help='Columnar, rounded encoding of asset histories')
+    parser.add_argument('--delta-history', type=int, help='Per-version delta files to keep (0 disables)')
+    parser.add_argument('--downsample', help='Comma separated LTTB chart resolutions (point counts) or none')
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("Pre-computing Frontend Cache")
     print("=" * 60)
 
     # Load configuration
     config = load_config()
+    output = output_options(config, args)
 
     # Process each market (generate cache even for hidden markets like cn_hour)
     markets = config.get('markets', {})
 
+    # Only agents whose ledger (or config) changed since the last run are reprocessed,
+    # across all markets in one process pool
+    plans, tasks = {}, []
     for market_id, market_config in markets.items():
+        try:
+            plans[market_id] = plan_market(market_id, market_config, args.full, output)
+        except Exception as e:
+            print(f"\n✗ Error planning cache for {market_id}: {e}")
+            continue
+        tasks.extend((market_id, agent_config, market_config) for agent_config in plans[market_id][2])
+
+    print(f"Agents to process: {len(tasks)} (workers: {args.workers})")
+    results = process_stale_agents(tasks, args.workers)
+
+    for market_id, (fingerprints, reused, stale) in plans.items():
         # Generate cache for all markets with data directories, even if UI-disabled
         # This allows 1D/1H toggle to work with cached data
+        processed = {a['folder']: results.get((market_id, a['folder'])) for a in stale}
         try:
-            generate_cache_for_market(market_id, market_config, config)
+            generate_cache_for_market(market_id, markets[market_id], config, processed, reused, fingerprints,
+                                      output)
         except Exception as e:
             print(f"\n✗ Error generating cache for {market_id}: {e}")
             import traceback
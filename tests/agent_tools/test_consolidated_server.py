@@ -0,0 +1,66 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from agent_tools.consolidated_server import build_app
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_unknown_service_is_rejected():
+    with pytest.raises(ValueError):
+        build_app(["math", "nope"])
+
+
+def test_all_services_served_from_one_process():
+    port = _free_port()
+    env = dict(os.environ, MCP_CONSOLIDATED_PORT=str(port), MCP_CONSOLIDATED_SERVICES="math,price,trade")
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(project_root, "agent_tools", "consolidated_server.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            with socket.socket() as sock:
+                if sock.connect_ex(("127.0.0.1", port)) == 0:
+                    break
+            time.sleep(0.1)
+        else:
+            pytest.skip("consolidated MCP server did not start")
+
+        async def run():
+            client = MultiServerMCPClient({
+                name: {"transport": "streamable_http", "url": f"http://localhost:{port}/{name}/mcp"}
+                for name in ("math", "price", "trade")
+            })
+            tools = {tool.name: tool for tool in await client.get_tools()}
+            return tools, await tools["add"].ainvoke({"a": 2, "b": 3})
+
+        tools, result = asyncio.run(run())
+        assert {"add", "multiply", "get_price_local", "buy", "sell"} <= set(tools)
+        assert result == "5.0"
+
+        # One /metrics endpoint reports the tools of every mounted service
+        with urllib.request.urlopen(f"http://localhost:{port}/metrics", timeout=10) as response:
+            metrics = response.read().decode()
+        assert 'mcp_tool_calls_total{tool="add"' in metrics
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+from agent_tools.inprocess_tools import (INPROCESS_MODULES, _wrap_tool,
+                                         inprocess_entry, load_inprocess_tools,
+                                         split_mcp_config)
+
+
+def test_split_mcp_config():
+    config = {
+        "math": inprocess_entry("agent_tools.tool_math"),
+        "search": {"transport": "streamable_http", "url": "http://localhost:8001/mcp"},
+    }
+    remote, local = split_mcp_config(config)
+    assert list(remote) == ["search"]
+    assert list(local) == ["math"]
+
+
+def test_math_tools_keep_mcp_names_and_schemas():
+    tools = asyncio.run(load_inprocess_tools({"math": inprocess_entry("agent_tools.tool_math")}))
+    by_name = {tool.name: tool for tool in tools}
+    assert set(by_name) == {"add", "multiply"}
+    assert by_name["add"].args == {"a": {"type": "number"}, "b": {"type": "number"}}
+    assert by_name["add"].description == "Add two numbers (supports int and float)"
+
+    # Same text result the MCP adapter returns over HTTP
+    assert asyncio.run(by_name["add"].ainvoke({"a": 1, "b": 2.5})) == "3.5"
+    assert asyncio.run(by_name["multiply"].ainvoke({"a": "3", "b": 2})) == "6.0"
+
+
+def test_tool_errors_are_returned_as_text():
+    server = FastMCP("Errors")
+
+    @server.tool()
+    def reject(reason: str) -> str:
+        raise ToolError(f"rejected: {reason}")
+
+    @server.tool()
+    def crash() -> str:
+        raise RuntimeError("boom")
+
+    tools = {name: _wrap_tool(tool) for name, tool in asyncio.run(server.get_tools()).items()}
+    # Same error text the MCP adapter gets back from the server over HTTP
+    assert asyncio.run(tools["reject"].ainvoke({"reason": "closed"})) == "rejected: closed"
+    assert asyncio.run(tools["crash"].ainvoke({})) == "Error calling tool 'crash': boom"
+
+
+def test_trade_and_price_tools_load():
+    tools = asyncio.run(load_inprocess_tools({
+        "trade": inprocess_entry("agent_tools.tool_trade"),
+        "stock_local": inprocess_entry("agent_tools.tool_get_price_local"),
+    }))
+    names = {tool.name for tool in tools}
+    assert {"buy", "sell", "get_price_local"} <= names
+
+
+def test_search_tools_load():
+    tools = asyncio.run(load_inprocess_tools({"search": inprocess_entry(INPROCESS_MODULES["search"])}))
+    assert {"get_market_news", "get_news_article"} <= {tool.name for tool in tools}
+
+
+def test_unknown_server_raises():
+    with pytest.raises(ValueError):
+        asyncio.run(load_inprocess_tools({"unknown": {"transport": "inprocess"}}))
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from agent_tools.tool_jina_search import WebScrapingJinaTool
+
+
+class _Response:
+    def __init__(self, payload, status_code=200, headers=None):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class _SlowSession:
+    """Stands in for requests.Session: search returns the page URLs, each scrape sleeps for its delay"""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.timeouts = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.timeouts.append(timeout)
+        if url.startswith("https://s.jina.ai/"):
+            return _Response({"data": [{"url": page} for page in self.delays]})
+        page = url[len("https://r.jina.ai/"):]
+        time.sleep(self.delays[page])
+        return _Response({"data": {"url": page, "title": page, "description": "", "content": "text"}})
+
+
+def _tool(monkeypatch, delays, **kwargs):
+    monkeypatch.setenv("JINA_API_KEY", "test")
+    monkeypatch.setenv("PAGE_CACHE", "false")
+    tool = WebScrapingJinaTool(**kwargs)
+    tool.session = _SlowSession(delays)
+    return tool
+
+
+def test_pages_are_scraped_concurrently(monkeypatch):
+    tool = _tool(monkeypatch, {"a": 0.3, "b": 0.3, "c": 0.3}, max_pages=3, timeout=5, deadline=5)
+    start = time.monotonic()
+    results = tool("query")
+    assert sorted(r["url"] for r in results) == ["a", "b", "c"]
+    assert time.monotonic() - start < 0.8
+    assert all(timeout is not None and timeout <= 5 for timeout in tool.session.timeouts)
+
+
+def test_deadline_returns_partial_results(monkeypatch):
+    tool = _tool(monkeypatch, {"fast": 0.05, "slow": 2.0}, max_pages=2, timeout=5, deadline=0.5)
+    start = time.monotonic()
+    results = tool("query")
+    assert [r["url"] for r in results] == ["fast"]
+    assert time.monotonic() - start < 1.0
+    # Requests never get a timeout beyond the remaining deadline
+    assert max(tool.session.timeouts) <= 0.5
+
+
+class _ReaderSession:
+    """Jina reader stand-in that counts downloads and honours If-None-Match"""
+
+    def __init__(self, published="2025-10-01T08:00:00+00:00"):
+        self.published = published
+        self.downloads = 0
+        self.not_modified = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        if headers.get("If-None-Match") == '"v1"':
+            self.not_modified += 1
+            return _Response(None, status_code=304)
+        self.downloads += 1
+        page = url[len("https://r.jina.ai/"):]
+        data = {"url": page, "title": "t", "description": "", "content": "text", "publishedTime": self.published}
+        return _Response({"data": data}, headers={"ETag": '"v1"'})
+
+
+def _cached_tool(tmp_path, monkeypatch, session, today="2025-10-05"):
+    monkeypatch.setenv("JINA_API_KEY", "test")
+    monkeypatch.setenv("PAGE_CACHE_DIR", str(tmp_path / "pages"))
+    runtime_env = tmp_path / "runtime_env.json"
+    runtime_env.write_text(json.dumps({"TODAY_DATE": today}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(runtime_env))
+    tool = WebScrapingJinaTool()
+    tool.session = session
+    return tool
+
+
+def test_scraped_pages_are_cached_and_revalidated(tmp_path, monkeypatch):
+    session = _ReaderSession()
+    tool = _cached_tool(tmp_path, monkeypatch, session)
+    first = tool._jina_scrape("https://example.com/a")
+    assert tool._jina_scrape("https://example.com/a") == first
+    assert session.downloads == 1
+
+    # Once the TTL has passed the entry is revalidated instead of downloaded again
+    from tools.page_cache import get_page_cache
+    get_page_cache().ttl = 0
+    assert tool._jina_scrape("https://example.com/a") == first
+    assert (session.downloads, session.not_modified) == (1, 1)
+
+
+def test_cached_pages_published_after_today_are_hidden(tmp_path, monkeypatch):
+    session = _ReaderSession(published="2025-10-08T08:00:00+00:00")
+    tool = _cached_tool(tmp_path, monkeypatch, session, today="2025-10-10")
+    assert "error" not in tool._jina_scrape("https://example.com/b")
+
+    # A later backtest date reuses the cache; an earlier one must not see the page
+    tool = _cached_tool(tmp_path, monkeypatch, session, today="2025-10-05")
+    result = tool._jina_scrape("https://example.com/b")
+    assert "error" in result and result["content"] == ""
+    assert session.downloads == 1
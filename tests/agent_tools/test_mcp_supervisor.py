@@ -0,0 +1,81 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from agent_tools.mcp_supervisor import MCPSupervisor, _percentile
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Manager:
+    """Minimal MCPServiceManager: runs tool_math.py on a free port"""
+
+    def __init__(self, port):
+        self.services = {}
+        self.service_configs = {
+            "math": {"script": os.path.join(project_root, "agent_tools", "tool_math.py"), "name": "Math", "port": port}
+        }
+        self.starts = 0
+
+    def start_service(self, service_id, config):
+        env = dict(os.environ, MATH_HTTP_PORT=str(config["port"]))
+        process = subprocess.Popen(
+            [sys.executable, config["script"]], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.services[service_id] = {"process": process, "name": config["name"], "port": config["port"]}
+        self.starts += 1
+        return True
+
+    def stop(self):
+        for service in self.services.values():
+            service["process"].terminate()
+            service["process"].wait(timeout=10)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert _percentile(values, 0.5) == 51
+    assert _percentile(values, 0.99) == 99
+    assert _percentile([], 0.5) is None
+
+
+def test_supervisor_probes_restarts_and_publishes(tmp_path, monkeypatch):
+    status_path = tmp_path / "mcp_status.json"
+    monkeypatch.setenv("MCP_STATUS_FILE", str(status_path))
+    monkeypatch.setenv("MCP_RESTART_MAX_BACKOFF", "0")
+    manager = _Manager(_free_port())
+    supervisor = MCPSupervisor(manager)
+    manager.start_service("math", manager.service_configs["math"])
+    try:
+        if not supervisor.wait_until_ready(timeout=30, interval=0.2):
+            pytest.skip("math MCP server did not become ready")
+
+        status = json.loads(status_path.read_text())["services"]["math"]
+        assert status["state"] == "ready"
+        assert status["urls"] == [f"http://localhost:{manager.service_configs['math']['port']}/mcp"]
+        assert status["p50_ms"] is not None
+
+        # A crashed service is restarted and becomes ready again
+        manager.services["math"]["process"].kill()
+        manager.services["math"]["process"].wait()
+        supervisor.check()
+        assert manager.starts == 2
+        assert supervisor.health["math"].restarts == 1
+        assert supervisor.wait_until_ready(timeout=30, interval=0.2)
+
+        supervisor.clear_status()
+        assert not status_path.exists()
+    finally:
+        manager.stop()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from agent_tools.mcp_workers import get_worker_count
+from agent_tools.tool_trade import sell
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_worker_count(monkeypatch):
+    monkeypatch.delenv("MCP_WORKERS", raising=False)
+    assert get_worker_count() == 1
+    monkeypatch.setenv("MCP_WORKERS", "4")
+    assert get_worker_count() == 4
+    monkeypatch.setenv("MCP_WORKERS", "many")
+    assert get_worker_count() == 1
+
+
+def test_sell_writes_position_while_holding_lock():
+    held = {"value": False, "during_read": None, "during_write": None}
+
+    class _Lock:
+        def __enter__(self):
+            held["value"] = True
+
+        def __exit__(self, *exc):
+            held["value"] = False
+
+    def latest_position(today_date, signature):
+        held["during_read"] = held["value"]
+        return {"CASH": 0, "AAPL": 10}, 1
+
+    def fake_open(*args, **kwargs):
+        held["during_write"] = held["value"]
+        return MagicMock()
+
+    config = {"SIGNATURE": "test_agent", "TODAY_DATE": "2023-01-02", "LOG_PATH": "./data/agent_data"}
+    with patch("agent_tools.tool_trade.get_config_value", side_effect=lambda k, d=None: config.get(k, d)), \
+         patch("agent_tools.tool_trade.write_config_value"), \
+         patch("agent_tools.tool_trade.get_latest_position", side_effect=latest_position), \
+         patch("agent_tools.tool_trade.get_open_prices", return_value={"AAPL_price": 10.0}), \
+         patch("agent_tools.tool_trade._position_lock", return_value=_Lock()), \
+         patch("builtins.open", side_effect=fake_open):
+        result = sell.fn("AAPL", 5)
+
+    assert result == {"CASH": 50.0, "AAPL": 5}
+    assert held["during_read"] is True
+    assert held["during_write"] is True
+
+
+def test_price_server_with_worker_pool(tmp_path):
+    with open(os.path.join(project_root, "data", "A_stock", "merged.jsonl"), encoding="utf-8") as f:
+        doc = json.loads(f.readline())
+    symbol = doc["Meta Data"]["2. Symbol"]
+    dates = sorted(doc["Time Series (Daily)"])
+
+    runtime_env = tmp_path / "runtime_env.json"
+    runtime_env.write_text(json.dumps({"TODAY_DATE": dates[-1]}))
+    port = _free_port()
+    env = dict(os.environ, MCP_WORKERS="2", GETPRICE_HTTP_PORT=str(port), RUNTIME_ENV_PATH=str(runtime_env))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(project_root, "agent_tools", "tool_get_price_local.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            with socket.socket() as sock:
+                if sock.connect_ex(("127.0.0.1", port)) == 0:
+                    break
+            time.sleep(0.1)
+        else:
+            pytest.skip("price MCP server did not start")
+
+        async def run():
+            client = MultiServerMCPClient(
+                {"price": {"transport": "streamable_http", "url": f"http://localhost:{port}/mcp"}}
+            )
+            tools = {tool.name: tool for tool in await client.get_tools()}
+            calls = [tools["get_price_local"].ainvoke({"symbol": symbol, "date": d}) for d in dates[:8]]
+            return await asyncio.gather(*calls)
+
+        results = [json.loads(r) for r in asyncio.run(run())]
+        assert [r["date"] for r in results] == dates[:8]
+        assert all(r["symbol"] == symbol and "ohlcv" in r for r in results)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,180 @@
+"""
+Experiment grid runner tests
+"""
+import asyncio
+import json
+import sys
+
+import pytest
+
+import main_grid
+
+
+@pytest.fixture
+def spec(tmp_path):
+    return {
+        "name": "test-sweep",
+        "output_dir": str(tmp_path / "grid"),
+        "max_workers": 3,
+        "provider_limits": {"deepseek": 1},
+        "base_config": {
+            "agent_type": "BaseAgent",
+            "date_range": {"init_date": "2025-10-01", "end_date": "2025-10-03"},
+            "models": [],
+            "agent_config": {"max_steps": 10},
+        },
+        "grid": {
+            "models": [
+                {"name": "deepseek-chat", "basemodel": "deepseek-chat", "signature": "ds"},
+                {"name": "gpt-5", "basemodel": "gpt-5", "signature": "gpt"},
+            ],
+            "agent_config.max_steps": [5, 20],
+        },
+    }
+
+
+def test_expand_jobs_builds_isolated_configs(spec):
+    jobs = main_grid.expand_jobs(spec)
+    assert len(jobs) == 4
+    assert len({job["job_id"] for job in jobs}) == 4
+    assert len({job["config"]["log_config"]["log_path"] for job in jobs}) == 4
+
+    steps = sorted(job["config"]["agent_config"]["max_steps"] for job in jobs)
+    assert steps == [5, 5, 20, 20]
+    assert {job["provider"] for job in jobs} == {"deepseek", "default"}
+    # Expansion is deterministic so manifests can be resumed
+    assert [job["job_id"] for job in jobs] == [job["job_id"] for job in main_grid.expand_jobs(spec)]
+
+
+def test_each_job_runs_exactly_one_model(spec):
+    spec["grid"] = {"agent_config.max_steps": [5]}
+    with pytest.raises(ValueError):
+        main_grid.expand_jobs(spec)
+
+
+def _fake_job_command(tracker_dir):
+    """Command that records overlap per provider and writes a position file like main.py would"""
+    script = f"""
+import json, os, sys, time
+from pathlib import Path
+config = json.load(open(sys.argv[1]))
+model = config["models"][0]
+marker = Path({str(tracker_dir)!r}) / (model["signature"] + "-" + str(os.getpid()))
+marker.parent.mkdir(parents=True, exist_ok=True)
+marker.touch()
+overlap = [p.name for p in marker.parent.iterdir() if p.name.startswith(model["signature"] + "-")]
+time.sleep(0.3)
+marker.unlink()
+with open(marker.parent / "overlap.log", "a") as f:
+    f.write(model["signature"] + " " + str(len(overlap)) + " " + os.environ["RUNTIME_ENV_PATH"] + "\\n")
+pos = Path(config["log_config"]["log_path"]) / model["signature"] / "position" / "position.jsonl"
+pos.parent.mkdir(parents=True, exist_ok=True)
+pos.write_text(json.dumps({{"date": "2025-10-01", "id": 0, "positions": {{"CASH": 10000.0}}}}) + "\\n")
+"""
+    return lambda config_file: [sys.executable, "-c", script, str(config_file)]
+
+
+def _trading_job_command():
+    """Command that registers and trades like main.py, through the tools the job's transport selects"""
+    script = f"""
+import asyncio, json, sys
+from pathlib import Path
+sys.path.insert(0, {str(main_grid.PROJECT_ROOT)!r})
+from agent_tools.inprocess_tools import INPROCESS_MODULES, get_transport_mode, inprocess_entry, load_inprocess_tools
+from tools.general_tools import write_config_value
+import agent_tools.tool_trade as tool_trade
+
+config = json.load(open(sys.argv[1]))
+signature = config["models"][0]["signature"]
+log_path = config["log_config"]["log_path"]
+write_config_value("SIGNATURE", signature)
+write_config_value("LOG_PATH", log_path)
+write_config_value("TODAY_DATE", "2025-10-01")
+pos = Path(log_path) / signature / "position" / "position.jsonl"
+pos.parent.mkdir(parents=True, exist_ok=True)
+pos.write_text(json.dumps({{"date": "2025-10-01", "id": 0, "positions": {{"CASH": 10000.0, "AAPL": 0}}}}) + "\\n")
+
+# Fixed open price instead of the repository's merged.jsonl
+tool_trade.get_open_prices = lambda date, symbols, market="us": {{s + "_price": 100.0 for s in symbols}}
+assert get_transport_mode() == "inprocess"
+tools = asyncio.run(load_inprocess_tools({{"trade": inprocess_entry(INPROCESS_MODULES["trade"])}}))
+buy = next(tool for tool in tools if tool.name == "buy")
+asyncio.run(buy.ainvoke({{"symbol": "AAPL", "amount": config["agent_config"]["max_steps"]}}))
+"""
+    return lambda config_file: [sys.executable, "-c", script, str(config_file)]
+
+
+def test_jobs_trade_into_their_own_ledgers(spec, monkeypatch):
+    spec["grid"]["models"] = spec["grid"]["models"][:1]
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "http")
+    monkeypatch.setattr(main_grid, "_job_command", _trading_job_command())
+
+    manifest = asyncio.run(main_grid.run_grid(spec))
+    assert {entry["status"] for entry in manifest.data["jobs"].values()} == {"done"}
+
+    jobs = main_grid.expand_jobs(spec)
+    assert len({main_grid._position_file(job) for job in jobs}) == 2
+    for job in jobs:
+        records = [json.loads(line) for line in main_grid._position_file(job).read_text().splitlines()]
+        assert len(records) == 2
+        assert records[-1]["positions"]["AAPL"] == job["config"]["agent_config"]["max_steps"]
+
+
+@pytest.mark.parametrize("agent_module, agent_class", [
+    ("agent.base_agent.base_agent", "BaseAgent"),
+    ("agent.base_agent_astock.base_agent_astock", "BaseAgentAStock"),
+    ("agent.base_agent_crypto.base_agent_crypto", "BaseAgentCrypto"),
+])
+def test_job_env_loads_every_date_dependent_tool_in_process(spec, monkeypatch, agent_module, agent_class):
+    """Search filters by TODAY_DATE too, so no tool may be served from a shared process"""
+    cls = getattr(pytest.importorskip(agent_module), agent_class)
+    job = main_grid.expand_jobs(spec)[0]
+    for key in ("MCP_TRANSPORT_MODE", "MCP_INPROCESS_SEARCH", "MCP_SERVER_MODE"):
+        monkeypatch.delenv(key, raising=False)
+    for key, value in main_grid._job_env(job).items():
+        if key.startswith("MCP_"):
+            monkeypatch.setenv(key, value)
+
+    config = cls._get_default_mcp_config(None)
+    assert {entry["transport"] for entry in config.values()} == {"inprocess"}
+    assert config["search"]["module"] == "agent_tools.tool_alphavantage_news"
+
+
+def test_run_grid_respects_provider_caps_and_resumes(spec, tmp_path, monkeypatch):
+    tracker = tmp_path / "tracker"
+    monkeypatch.setattr(main_grid, "_job_command", _fake_job_command(tracker))
+
+    manifest = asyncio.run(main_grid.run_grid(spec))
+    assert {entry["status"] for entry in manifest.data["jobs"].values()} == {"done"}
+
+    lines = (tracker / "overlap.log").read_text().splitlines()
+    assert len(lines) == 4
+    # deepseek is capped at one concurrent job
+    assert all(int(line.split()[1]) == 1 for line in lines if line.startswith("ds "))
+    # every job used its own runtime env file
+    assert len({line.split()[2] for line in lines}) == 4
+
+    # A second run skips everything that is already complete
+    asyncio.run(main_grid.run_grid(spec))
+    assert len((tracker / "overlap.log").read_text().splitlines()) == 4
+
+
+def test_failed_jobs_are_retried_on_resume(spec, tmp_path, monkeypatch):
+    monkeypatch.setattr(main_grid, "_job_command", lambda config_file: [sys.executable, "-c", "raise SystemExit(1)"])
+    manifest = asyncio.run(main_grid.run_grid(spec))
+    assert {entry["status"] for entry in manifest.data["jobs"].values()} == {"failed"}
+
+    monkeypatch.setattr(main_grid, "_job_command", _fake_job_command(tmp_path / "tracker"))
+    manifest = asyncio.run(main_grid.run_grid(spec))
+    assert {entry["status"] for entry in manifest.data["jobs"].values()} == {"done"}
+    with open(manifest.path, "r", encoding="utf-8") as f:
+        assert len(json.load(f)["jobs"]) == 4
+
+
+def test_results_table_lists_every_job(spec, tmp_path, monkeypatch):
+    monkeypatch.setattr(main_grid, "_job_command", _fake_job_command(tmp_path / "tracker"))
+    asyncio.run(main_grid.run_grid(spec))
+    table = main_grid.build_results_table(spec)
+    assert len(table) == 4
+    assert set(table["status"]) == {"done"}
+    assert (tmp_path / "grid" / "results.csv").exists()
@@ -0,0 +1,208 @@
+"""
+Frontend cache precompute tests
+"""
+import gzip
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "precompute_frontend_cache", Path(__file__).resolve().parents[1] / "scripts" / "precompute_frontend_cache.py"
+)
+precompute = importlib.util.module_from_spec(_spec)
+# Registered so worker processes can unpickle its functions
+sys.modules[_spec.name] = precompute
+_spec.loader.exec_module(precompute)
+
+
+def _ledger(data_dir, folder, positions):
+    path = data_dir / "agents" / folder / "position" / "position.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for entry in positions:
+            f.write(json.dumps(entry) + "\n")
+    return path
+
+
+@pytest.fixture
+def market(tmp_path, monkeypatch):
+    monkeypatch.setattr(precompute, "DATA_DIR", tmp_path)
+    with open(tmp_path / "Ahourly_prices_AAPL.json", "w") as f:
+        json.dump({"Time Series (60min)": {
+            "2025-10-01 10:00:00": {"4. close": "100"},
+            "2025-10-01 11:00:00": {"4. close": "110"},
+            "2025-10-02 10:00:00": {"4. close": "120"},
+        }}, f)
+    # Daily-only file: hourly ledger timestamps match on the date part
+    with open(tmp_path / "daily_prices_MSFT.json", "w") as f:
+        json.dump({"Time Series (Daily)": {"2025-10-01": {"4. close": "50"}}}, f)
+
+    for folder in ("alpha", "beta"):
+        _ledger(tmp_path, folder, [
+            {"date": "2025-10-01 10:00:00", "id": 0, "positions": {"CASH": 1000.0, "AAPL": 0, "MSFT": 0}},
+            {"date": "2025-10-01 11:00:00", "id": 1, "positions": {"CASH": 790.0, "AAPL": 1, "MSFT": 2}},
+        ])
+    market_config = {
+        "data_dir": "agents",
+        "benchmark_file": "missing.json",
+        "agents": [{"folder": "alpha"}, {"folder": "beta"}, {"folder": "off", "enabled": False}],
+    }
+    monkeypatch.setattr(precompute, "load_config", lambda: {"markets": {"us": market_config}})
+    return tmp_path
+
+
+def _cache(data_dir):
+    return precompute.load_cache("us")
+
+
+def test_values_hourly_ledger_against_daily_prices(market):
+    precompute.main(["--workers", "1"])
+    history = _cache(market)["agentsData"]["alpha"]["assetHistory"]
+    assert [point["value"] for point in history] == [1000.0, 790.0 + 110.0 + 100.0]
+
+
+def test_only_changed_agents_are_reprocessed(market, monkeypatch):
+    precompute.main(["--workers", "1"])
+    manifest = json.loads((market / "us_cache.manifest.json").read_text())
+    assert set(manifest["agents"]) == {"alpha", "beta"}
+
+    calls = []
+    original = precompute.process_agent
+    monkeypatch.setattr(precompute, "process_agent", lambda *args: calls.append(args[1]["folder"]) or original(*args))
+
+    precompute.main(["--workers", "1"])
+    assert calls == []
+
+    with open(market / "agents" / "beta" / "position" / "position.jsonl", "a") as f:
+        f.write(json.dumps({"date": "2025-10-02 10:00:00", "id": 2,
+                            "positions": {"CASH": 790.0, "AAPL": 1, "MSFT": 2}}) + "\n")
+    precompute.main(["--workers", "1"])
+    assert calls == ["beta"]
+    agents = _cache(market)["agentsData"]
+    assert list(agents) == ["alpha", "beta"]
+    # No MSFT bar on 2025-10-02: the US exact lookup leaves it unvalued
+    assert agents["beta"]["currentValue"] == 790.0 + 120.0
+    assert len(agents["alpha"]["assetHistory"]) == 2
+
+    precompute.main(["--workers", "1", "--full"])
+    assert calls == ["beta", "alpha", "beta"]
+
+
+def test_output_options_invalidate_reused_entries(market, monkeypatch):
+    precompute.main(["--workers", "1"])
+    calls = []
+    original = precompute.process_agent
+    monkeypatch.setattr(precompute, "process_agent", lambda *args: calls.append(args[1]["folder"]) or original(*args))
+
+    monkeypatch.setitem(precompute.DEFAULT_OUTPUT, "precision", 4)
+    precompute.main(["--workers", "1"])
+    assert calls == ["alpha", "beta"]
+    precompute.main(["--workers", "1", "--no-compact"])
+    assert calls == ["alpha", "beta"] * 2
+    precompute.main(["--workers", "1", "--no-compact"])
+    assert len(calls) == 4
+
+
+def test_process_pool_matches_serial_run(market):
+    precompute.main(["--workers", "1", "--full"])
+    serial = _cache(market)["agentsData"]
+    precompute.main(["--workers", "2", "--full"])
+    assert _cache(market)["agentsData"] == serial
+
+
+def _append_point(data_dir, folder, entry):
+    with open(data_dir / "agents" / folder / "position" / "position.jsonl", "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def _apply_delta(agents, delta):
+    """Python mirror of CacheManager.applyDelta"""
+    result = {}
+    for name in delta["order"]:
+        if name in delta["replace"]:
+            entry = dict(delta["replace"][name])
+            entry["assetHistory"] = precompute.decode_history(entry["assetHistory"])
+            result[name] = entry
+            continue
+        entry = dict(agents[name])
+        change = delta["append"].get(name)
+        if change:
+            for field, items in change["append"].items():
+                items = precompute.decode_history(items) if field == "assetHistory" else items
+                entry[field] = entry.get(field, []) + items
+            entry.update(change["set"])
+        result[name] = entry
+    return result
+
+
+def test_compact_encoding_and_compressed_siblings(market):
+    precompute.main(["--workers", "1"])
+    raw = json.loads((market / "us_cache.json").read_text())
+    assert raw["encoding"] == "columnar"
+    assert raw["agentsData"]["alpha"]["assetHistory"]["value"] == [1000.0, 1000.0]
+
+    with gzip.open(market / "us_cache.json.gz", "rt") as f:
+        assert json.load(f) == raw
+    meta = json.loads((market / "us_cache.meta.json").read_text())
+    assert meta["version"] == raw["version"]
+    assert meta["files"] == {"json": "us_cache.json", "gzip": "us_cache.json.gz"}
+
+    precompute.main(["--workers", "1", "--full", "--no-compact", "--compress", "none"])
+    raw_rows = json.loads((market / "us_cache.json").read_text())
+    assert raw_rows["encoding"] == "rows"
+    assert raw_rows["agentsData"]["alpha"]["assetHistory"][1]["value"] == 1000.0
+    assert json.loads((market / "us_cache.meta.json").read_text())["files"] == {"json": "us_cache.json"}
+
+
+def test_delta_chain_rebuilds_each_version(market, monkeypatch):
+    versions = iter(["a", "b", "c"])
+    monkeypatch.setattr(precompute, "get_data_version_hash", lambda market_config: next(versions))
+    precompute.main(["--workers", "1"])
+    first = precompute.load_cache("us")
+
+    _append_point(market, "beta", {"date": "2025-10-02 10:00:00", "id": 2,
+                                   "positions": {"CASH": 790.0, "AAPL": 1, "MSFT": 0}})
+    precompute.main(["--workers", "1"])
+    _ledger(market, "alpha", [{"date": "2025-10-01 11:00:00", "id": 0, "positions": {"CASH": 500.0}}])
+    precompute.main(["--workers", "1"])
+    latest = precompute.load_cache("us")
+
+    meta = json.loads((market / "us_cache.meta.json").read_text())
+    assert [(d["from"], d["to"]) for d in meta["deltas"]] == [("v4_a", "v4_b"), ("v4_b", "v4_c")]
+
+    agents = first["agentsData"]
+    deltas = []
+    for step in meta["deltas"]:
+        with gzip.open(market / step["files"]["gzip"], "rt") as f:
+            deltas.append(json.load(f))
+        agents = _apply_delta(agents, deltas[-1])
+    assert agents == latest["agentsData"]
+    assert set(deltas[0]["append"]) == {"beta"} and not deltas[0]["replace"]
+    assert len(precompute.decode_history(deltas[0]["append"]["beta"]["append"]["assetHistory"])) == 1
+    assert set(deltas[1]["replace"]) == {"alpha"}
+
+    monkeypatch.setattr(precompute, "get_data_version_hash", lambda market_config: "d")
+    precompute.main(["--workers", "1", "--delta-history", "1"])
+    meta = json.loads((market / "us_cache.meta.json").read_text())
+    assert [d["to"] for d in meta["deltas"]] == ["v4_d"]
+    assert sorted(p.name for p in (market / "deltas").glob("*.json")) == ["us_delta_v4_c_v4_d.json"]
+
+
+def test_chart_resolutions(market):
+    _ledger(market, "alpha", [
+        {"date": f"2025-10-{1 + i // 24:02d} {i % 24:02d}:00:00", "id": i,
+         "positions": {"CASH": 1000.0 + (i % 7) * 10}}
+        for i in range(50)
+    ])
+    precompute.main(["--workers", "1", "--downsample", "10,20,100"])
+    alpha = precompute.load_cache("us")["agentsData"]["alpha"]
+    assert sorted(alpha["resolutions"]) == ["10", "20"]
+    assert alpha["resolutions"]["10"][0] == 0 and alpha["resolutions"]["10"][-1] == 49
+    assert precompute.load_cache("us")["agentsData"]["beta"]["resolutions"] == {}
+
+    # Reused entries lose their resolutions once downsampling is turned off
+    precompute.main(["--workers", "1", "--downsample", "none"])
+    assert "resolutions" not in precompute.load_cache("us")["agentsData"]["alpha"]
@@ -0,0 +1,150 @@
+"""
+Alpha Vantage request scheduler tests (against a local stub server)
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from tools.alphavantage_client import (BULK, INTERACTIVE, AlphaVantageError,
+                                       AlphaVantageScheduler)
+from tools.rate_limiter import ProviderRateLimiter
+
+
+class _StubServer:
+    """Alpha Vantage stand-in recording the symbol of every request it serves"""
+
+    def __init__(self, delay=0.0, throttle_first=0):
+        self.delay = delay
+        self.throttle_left = throttle_first
+        self.served = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+                time.sleep(stub.delay)
+                if stub.throttle_left > 0:
+                    stub.throttle_left -= 1
+                    body = {"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}
+                elif params.get("tickers") is not None:
+                    stub.served.append(params.get("tickers"))
+                    body = {"feed": []}
+                elif params.get("symbol") == "BAD":
+                    body = {"Error Message": "Invalid API call."}
+                else:
+                    stub.served.append(params.get("symbol"))
+                    body = {"symbol": params.get("symbol"), "apikey": params.get("apikey")}
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/query"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def make_scheduler(tmp_path):
+    servers = []
+
+    def make(rate_per_minute=6000, burst=10, **server_kwargs):
+        server = _StubServer(**server_kwargs)
+        servers.append(server)
+        limiter = ProviderRateLimiter(f"alphavantage:{server.url}", rate_per_minute=rate_per_minute, burst=burst,
+                                      state_dir=str(tmp_path))
+        return server, AlphaVantageScheduler(api_key="demo", base_url=server.url, limiter=limiter, max_retries=2)
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def _run_threads(targets):
+    results = [None] * len(targets)
+
+    def run(i, target):
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i, t)) for i, t in enumerate(targets)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+def test_identical_requests_in_flight_are_coalesced(make_scheduler):
+    server, scheduler = make_scheduler(delay=0.3)
+    params = {"function": "NEWS_SENTIMENT", "symbol": "AAPL"}
+    results = _run_threads([lambda: scheduler.request(params)] * 5)
+    assert server.served == ["AAPL"]
+    assert results == [{"symbol": "AAPL", "apikey": "demo"}] * 5
+    assert scheduler.coalesced == 4
+
+
+def test_interactive_requests_overtake_queued_bulk(make_scheduler):
+    # One token every 0.2s and no burst: requests are admitted strictly one at a time
+    server, scheduler = make_scheduler(rate_per_minute=300, burst=1)
+    scheduler.request({"symbol": "WARMUP"})
+    targets = [lambda s=s: scheduler.request({"symbol": s}, priority=BULK) for s in ("B1", "B2", "B3")]
+    targets.append(lambda: scheduler.request({"symbol": "I1"}, priority=INTERACTIVE))
+    _run_threads(targets)
+    assert server.served[0] == "WARMUP"
+    assert server.served.index("I1") < server.served.index("B3")
+    assert sorted(server.served[1:]) == ["B1", "B2", "B3", "I1"]
+
+
+def test_throttled_requests_are_retried_after_bucket_drains(make_scheduler):
+    server, scheduler = make_scheduler(rate_per_minute=600, burst=5, throttle_first=1)
+    start = time.monotonic()
+    assert scheduler.request({"symbol": "AAPL"})["symbol"] == "AAPL"
+    # The note drained the shared bucket: the retry waited for a refill (0.1s per token)
+    assert time.monotonic() - start >= 0.09
+    assert scheduler.sent == 2
+
+
+def test_concurrent_news_tool_calls_are_coalesced(make_scheduler, tmp_path, monkeypatch):
+    from agent_tools import tool_alphavantage_news
+    from agent_tools.inprocess_tools import INPROCESS_MODULES, inprocess_entry, load_inprocess_tools
+
+    server, scheduler = make_scheduler(delay=0.3)
+    monkeypatch.setattr(tool_alphavantage_news, "get_alphavantage_scheduler", lambda base_url: scheduler)
+    monkeypatch.setenv("ALPHAADVANTAGE_API_KEY", "demo")
+    monkeypatch.setenv("NEWS_STORE_MODE", "off")
+    monkeypatch.setenv("TOOL_CACHE", "false")
+    runtime_env = tmp_path / "runtime_env.json"
+    runtime_env.write_text(json.dumps({"TODAY_DATE": "2025-10-10"}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(runtime_env))
+
+    async def run():
+        tools = await load_inprocess_tools({"search": inprocess_entry(INPROCESS_MODULES["search"])})
+        news = next(tool for tool in tools if tool.name == "get_market_news")
+        return await asyncio.gather(*(news.ainvoke({"query": "earnings", "tickers": "AAPL"}) for _ in range(3)))
+
+    results = asyncio.run(run())
+    # The calls overlap on the server's event loop, so the scheduler sends the query once
+    assert server.served == ["AAPL"]
+    assert scheduler.coalesced == 2
+    assert all(result.startswith("⚠️ No news articles found") for result in results)
+
+
+def test_error_messages_raise(make_scheduler):
+    server, scheduler = make_scheduler()
+    with pytest.raises(AlphaVantageError):
+        scheduler.request({"symbol": "BAD"})
@@ -0,0 +1,89 @@
+"""
+As-of price join tests
+"""
+import numpy as np
+
+from tools.asof_join import (CLOSE_FIELDS, CRYPTO_FIELDS, AsOfSeries, asof_matrix, cached_series,
+                             previous_timestamp, sorted_timestamps)
+
+HOURLY = {
+    "2025-10-02 10:00:00": {"4. close": "200"},
+    "2025-10-02 11:00:00": {"4. close": "201"},
+    "2025-10-03 9:30:00": {"4. close": "N/A"},
+    "2025-10-03 10:30:00": {"4. close": "203"},
+}
+DAILY = {
+    "2025-10-01": {"4. close": "100"},
+    "2025-10-02": {"4. close": "102"},
+    "2025-10-06": {"4. sell price": "110"},
+}
+
+
+def test_asof_mode_on_intraday_series():
+    series = AsOfSeries.from_bars(HOURLY)
+    assert series.intraday
+    assert series.price_at("2025-10-02 10:59:00") == 200.0
+    assert series.price_at("2025-10-02 11:00:00") == 201.0
+    assert series.price_at("2025-10-02 11:00:00", strict=True) == 200.0
+    assert series.price_at("2025-10-02") is None
+    assert series.price_at("2025-10-03") == 201.0
+    # Single-digit hours sort by time, and an unparseable price is missing rather than skipped
+    assert series.price_at("2025-10-03 09:45:00") is None
+    assert series.price_at("2025-10-09 00:00:00") == 203.0
+
+
+def test_daily_series_matches_on_date_part():
+    series = AsOfSeries.from_bars(DAILY)
+    assert not series.intraday
+    assert series.price_at("2025-10-02 15:00:00") == 102.0
+    assert series.price_at("2025-10-05 10:00:00") == 102.0
+    assert series.price_at("2025-10-06") == 110.0
+    assert series.price_at("2025-09-30") is None
+    assert series.price_at("2025-10-02 15:00:00", mode="exact") == 102.0
+    assert series.price_at("2025-10-05", mode="exact") is None
+
+
+def test_same_day_and_exact_modes():
+    series = AsOfSeries.from_bars(HOURLY)
+    assert series.price_at("2025-10-02", mode="same_day") == 201.0
+    assert series.price_at("2025-10-02 10:30:00", mode="same_day") == 200.0
+    assert series.price_at("2025-10-02 09:00:00", mode="same_day") is None
+    assert series.price_at("2025-10-04", mode="same_day") is None
+    assert series.price_at("2025-10-02 10:00:00", mode="exact") == 200.0
+    assert series.price_at("2025-10-02 10:30:00", mode="exact") is None
+    assert series.price_at("2025-10-04 10:30:00", mode="exact") is None
+
+    daily = AsOfSeries.from_bars(DAILY)
+    assert daily.price_at("2025-10-02 12:00:00", mode="same_day") == 102.0
+    assert daily.price_at("2025-10-05", mode="same_day") is None
+
+
+def test_field_preference():
+    bars = {"2025-10-01": {"4. sell price": "50000", "4. close": "49000"}}
+    assert AsOfSeries.from_bars(bars, CLOSE_FIELDS).price_at("2025-10-01") == 49000.0
+    assert AsOfSeries.from_bars(bars, CRYPTO_FIELDS).price_at("2025-10-01") == 50000.0
+    assert AsOfSeries.from_bars(bars, ("4. close",)).price_at("2025-10-01") == 49000.0
+    assert AsOfSeries.from_bars(DAILY, ("4. close",)).price_at("2025-10-06") is None
+
+
+def test_price_file_and_matrix():
+    doc = {"Meta Data": {}, "Time Series (Daily)": DAILY}
+    series = cached_series(doc)
+    assert series is cached_series(doc)
+    assert cached_series({"Meta Data": {}}) is None
+
+    queries = ["2025-09-30", "2025-10-02 10:30:00", "2025-10-06 10:00:00"]
+    matrix = asof_matrix({"A": series, "B": AsOfSeries.from_bars(HOURLY)}, ["A", "B", "C"], queries)
+    expected = np.array([[np.nan, np.nan, np.nan], [102.0, 200.0, np.nan], [110.0, 203.0, np.nan]])
+    assert np.allclose(matrix, expected, equal_nan=True)
+
+
+def test_previous_timestamp():
+    timestamps = frozenset(["2025-10-02 11:00:00", "2025-10-02 9:30:00", "2025-10-01", "2025-10-03 10:00:00"])
+    intraday = sorted_timestamps(timestamps, intraday_only=True)
+    assert list(intraday) == ["2025-10-02 09:30:00", "2025-10-02 11:00:00", "2025-10-03 10:00:00"]
+    assert previous_timestamp(intraday, "2025-10-03 10:00:00") == "2025-10-02 11:00:00"
+    assert previous_timestamp(intraday, "2025-10-03") == "2025-10-02 11:00:00"
+    assert previous_timestamp(intraday, "2025-10-02 10:00:00") == "2025-10-02 09:30:00"
+    assert previous_timestamp(intraday, "2025-10-02 09:30:00") is None
+    assert previous_timestamp(sorted_timestamps(timestamps), "2025-10-02 09:00:00") == "2025-10-01"
@@ -0,0 +1,90 @@
+"""
+Portfolio valuation tests
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from tools.calculate_metrics import calculate_portfolio_values, get_price_at_date
+
+
+def _reference_values(positions, price_data, is_crypto=False):
+    """Per-entry, per-symbol valuation with get_price_at_date"""
+    totals = []
+    for entry in positions:
+        pos = entry['positions']
+        stock_value = 0.0
+        for symbol, amount in pos.items():
+            if symbol == 'CASH' or amount == 0:
+                continue
+            price = get_price_at_date(price_data, symbol, entry['date'], is_crypto)
+            if price is not None:
+                stock_value += amount * price
+        totals.append(pos.get('CASH', 0) + stock_value)
+    return totals
+
+
+def _daily(prices):
+    return {"Time Series (Daily)": {date: {"4. close": str(price)} for date, price in prices.items()}}
+
+
+PRICE_DATA = {
+    "AAPL": _daily({"2025-10-01": 100, "2025-10-02": 102, "2025-10-06": 110}),
+    "MSFT": {"Time Series (60min)": {
+        "2025-10-02 10:00:00": {"4. close": "200"},
+        "2025-10-02 11:00:00": {"4. close": "201"},
+        "2025-10-03 10:00:00": {"4. close": ""},
+    }},
+    "BTC": {"Time Series (Daily)": {"2025-10-01": {"1. buy price": "1", "4. sell price": "50000", "4. close": "49000"}}},
+}
+
+POSITIONS = [
+    {"date": "2025-09-30 10:00:00", "positions": {"CASH": 1000.0, "AAPL": 1}},
+    {"date": "2025-10-01 10:00:00", "positions": {"CASH": 900.0, "AAPL": 1, "MSFT": 0}},
+    {"date": "2025-10-02 10:30:00", "positions": {"CASH": 500.0, "AAPL": 2, "MSFT": 1}},
+    {"date": "2025-10-03 12:00:00", "positions": {"CASH": 500.0, "AAPL": 2, "MSFT": 1, "NOPE": 3}},
+    {"date": "2025-10-05 10:00:00", "positions": {"CASH": 300.0, "AAPL": 4, "MSFT": 1}},
+]
+
+
+def test_matches_per_symbol_lookup():
+    df = calculate_portfolio_values(POSITIONS, PRICE_DATA, verbose=False)
+    assert list(df.columns) == ['date', 'cash', 'stock_value', 'total_value']
+    assert np.allclose(df['total_value'], _reference_values(POSITIONS, PRICE_DATA))
+    assert df['date'].iloc[2] == pd.Timestamp("2025-10-02 10:30:00")
+
+
+def test_crypto_uses_sell_price():
+    positions = [{"date": "2025-10-02", "positions": {"CASH": 0.0, "BTC": 2}}]
+    df = calculate_portfolio_values(positions, PRICE_DATA, is_crypto=True, verbose=False)
+    assert df['total_value'].tolist() == [100000.0]
+    assert df['total_value'].tolist() == _reference_values(positions, PRICE_DATA, is_crypto=True)
+
+
+def test_missing_prices_are_reported(capsys):
+    calculate_portfolio_values(POSITIONS, PRICE_DATA, verbose=True)
+    out = capsys.readouterr().out
+    assert "No price found for AAPL on 2025-09-30 10:00:00" in out
+    assert "No price found for NOPE on 2025-10-03 12:00:00" in out
+    assert "No price found for MSFT on 2025-10-03 12:00:00" in out
+
+
+def test_year_of_hourly_history_is_fast():
+    rng = np.random.default_rng(0)
+    hours = pd.date_range("2025-01-01", periods=24 * 365, freq="h").strftime("%Y-%m-%d %H:%M:%S").tolist()
+    symbols = [f"S{i}" for i in range(100)]
+    price_data = {
+        symbol: {"Time Series (60min)": {h: {"4. close": f"{100 + rng.random():.4f}"} for h in hours}}
+        for symbol in symbols
+    }
+    positions = [
+        {"date": h, "positions": {"CASH": 1000.0, **{s: int(rng.integers(0, 5)) for s in symbols}}}
+        for h in hours[::5]
+    ]
+    start = time.perf_counter()
+    df = calculate_portfolio_values(positions, price_data, verbose=False)
+    elapsed = time.perf_counter() - start
+    assert len(df) == len(positions)
+    assert np.allclose(df['total_value'][:20], _reference_values(positions[:20], price_data))
+    assert elapsed < 5.0
@@ -0,0 +1,82 @@
+"""
+Next-date market context prefetch tests
+"""
+import pytest
+
+from tools import context_prefetch
+from tools.context_prefetch import MarketContextPrefetcher, context_matches
+
+
+@pytest.fixture
+def fake_prices(monkeypatch):
+    """Price loaders that record which dates were requested"""
+    calls = []
+
+    def fake_yesterday(today_date, symbols, market="us"):
+        calls.append(("yesterday", today_date))
+        return ({f"{s}_price": 1.0 for s in symbols}, {f"{s}_price": 2.0 for s in symbols})
+
+    def fake_open(today_date, symbols, market="us"):
+        calls.append(("open", today_date))
+        return {f"{s}_price": float(today_date[-2:]) for s in symbols}
+
+    monkeypatch.setattr(context_prefetch, "get_yesterday_open_and_close_price", fake_yesterday)
+    monkeypatch.setattr(context_prefetch, "get_open_prices", fake_open)
+    return calls
+
+
+def test_take_returns_context_for_exact_date(fake_prices):
+    prefetcher = MarketContextPrefetcher(enabled=True)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+    context = prefetcher.take("2025-10-02", ["AAPL"], "us")
+    prefetcher.shutdown()
+
+    assert context["today_buy_price"] == {"AAPL_price": 2.0}
+    assert context_matches(context, "2025-10-02", "us", ["AAPL"])
+
+
+def test_next_date_context_is_never_handed_to_current_date(fake_prices):
+    prefetcher = MarketContextPrefetcher(enabled=True)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+
+    assert prefetcher.take("2025-10-01", ["AAPL"], "us") is None
+    # Still available for the date it was loaded for
+    assert prefetcher.take("2025-10-02", ["AAPL"], "us")["date"] == "2025-10-02"
+    prefetcher.shutdown()
+
+
+def test_symbol_or_market_mismatch_is_a_miss(fake_prices):
+    prefetcher = MarketContextPrefetcher(enabled=True)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+    assert prefetcher.take("2025-10-02", ["AAPL", "MSFT"], "us") is None
+    prefetcher.shutdown()
+
+    context = context_prefetch.load_market_context("2025-10-02", ["AAPL"], "us")
+    assert not context_matches(context, "2025-10-02", "cn", ["AAPL"])
+    assert not context_matches(None, "2025-10-02", "us", ["AAPL"])
+
+
+def test_stale_dates_are_dropped(fake_prices):
+    prefetcher = MarketContextPrefetcher(enabled=True)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+    prefetcher.take("2025-10-03", ["AAPL"], "us")
+    assert prefetcher.take("2025-10-02", ["AAPL"], "us") is None
+    prefetcher.shutdown()
+
+
+def test_disabled_prefetcher_never_loads(fake_prices):
+    prefetcher = MarketContextPrefetcher(enabled=False)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+    assert prefetcher.take("2025-10-02", ["AAPL"], "us") is None
+    assert fake_prices == []
+
+
+def test_failed_prefetch_falls_back(monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("merged.jsonl unavailable")
+
+    monkeypatch.setattr(context_prefetch, "get_yesterday_open_and_close_price", broken)
+    prefetcher = MarketContextPrefetcher(enabled=True)
+    prefetcher.schedule("2025-10-02", ["AAPL"], "us")
+    assert prefetcher.take("2025-10-02", ["AAPL"], "us") is None
+    prefetcher.shutdown()
@@ -0,0 +1,54 @@
+"""
+LTTB downsampling tests
+"""
+import numpy as np
+
+from tools.downsample import lttb_indices, resolution_levels
+
+
+def _reference_lttb(x, y, threshold):
+    """Point-by-point LTTB as originally described (Steinarsson, 2013)"""
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        avg_start, avg_end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        best, best_area = None, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(7)
+    y = np.cumsum(rng.normal(0, 1, 1000))
+    x = np.cumsum(rng.uniform(1, 3, 1000))
+    for threshold in (3, 10, 97, 500):
+        assert lttb_indices(y, threshold, x).tolist() == _reference_lttb(x, y, threshold)
+    assert lttb_indices(y, 50).tolist() == _reference_lttb(np.arange(1000.0), y, 50)
+
+
+def test_keeps_extremes_and_endpoints():
+    y = np.zeros(1000)
+    y[333], y[777] = 50.0, -40.0
+    indices = lttb_indices(y, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 333 in indices and 777 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_short_series_and_missing_values():
+    assert lttb_indices([1.0, 2.0, 3.0], 10).tolist() == [0, 1, 2]
+    y = [float(v) for v in range(100)]
+    y[10:20] = [None] * 10
+    levels = resolution_levels(y, [50, 10, 200])
+    assert list(levels) == ["10", "50"]
+    assert len(levels["10"]) == 10
+    assert not set(levels["10"]) & set(range(10, 20))
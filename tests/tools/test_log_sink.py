@@ -0,0 +1,71 @@
+"""
+Buffered session log writer tests
+"""
+import asyncio
+import json
+
+import pytest
+
+from tools import log_sink
+from tools.log_sink import SessionLogSink, read_log_entries
+
+
+def test_entries_are_buffered_until_flush(tmp_path):
+    log_file = str(tmp_path / "log.jsonl")
+    sink = SessionLogSink(log_file, compression="")
+    sink.write({"signature": "a", "new_messages": [{"role": "user", "content": "hi"}]})
+    assert not (tmp_path / "log.jsonl").exists()
+
+    sink.close()
+    lines = (tmp_path / "log.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["signature"] for line in lines] == ["a"]
+
+
+def test_background_task_flushes_in_event_loop(tmp_path):
+    log_file = str(tmp_path / "log.jsonl")
+
+    async def run():
+        sink = SessionLogSink(log_file, compression="", flush_interval=0.01)
+        sink.write({"n": 1})
+        await asyncio.sleep(0.1)
+        flushed = read_log_entries(log_file)
+        sink.write({"n": 2})
+        await sink.aclose()
+        return flushed
+
+    flushed = asyncio.run(run())
+    assert flushed == [{"n": 1}]
+    assert read_log_entries(log_file) == [{"n": 1}, {"n": 2}]
+
+
+def test_gzip_appends_across_sessions(tmp_path):
+    log_file = str(tmp_path / "log.jsonl")
+    for n in range(2):
+        with SessionLogSink(log_file, compression="gzip") as sink:
+            sink.write({"n": n, "content": "持仓"})
+    assert sink.path.endswith(".gz")
+    assert read_log_entries(sink.path) == [{"n": 0, "content": "持仓"}, {"n": 1, "content": "持仓"}]
+
+
+@pytest.mark.skipif(log_sink.zstandard is None, reason="zstandard not installed")
+def test_zstd_round_trip(tmp_path):
+    log_file = str(tmp_path / "log.jsonl")
+    with SessionLogSink(log_file, compression="zstd") as sink:
+        sink.write({"n": 1})
+    assert read_log_entries(log_file + ".zst") == [{"n": 1}]
+
+
+def test_atexit_hook_flushes_open_sinks(tmp_path):
+    log_file = str(tmp_path / "log.jsonl")
+    sink = SessionLogSink(log_file, compression="")
+    sink.write({"n": 1})
+    log_sink._flush_open_sinks()
+    assert sink.closed
+    assert read_log_entries(log_file) == [{"n": 1}]
+
+
+def test_write_after_close_raises(tmp_path):
+    sink = SessionLogSink(str(tmp_path / "log.jsonl"), compression="")
+    sink.close()
+    with pytest.raises(ValueError):
+        sink.write({"n": 1})
@@ -0,0 +1,167 @@
+"""
+Pooled MCP client session tests
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tools import mcp_client_pool
+from tools.mcp_client_pool import MCPClientPool
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class _FakeSession:
+    """Minimal ClientSession stand-in that counts connections and calls"""
+
+    opened = 0
+    schema_version = 1
+    fail_next_call = False
+    fail_next_list = False
+    calls = 0
+
+    async def initialize(self):
+        pass
+
+    async def list_tools(self, cursor=None):
+        if _FakeSession.fail_next_list:
+            _FakeSession.fail_next_list = False
+            raise ConnectionResetError("server went away")
+        schema = {"type": "object", "properties": {"a": {"type": "number"}}}
+        if _FakeSession.schema_version > 1:
+            schema["properties"]["b"] = {"type": "number"}
+        tool = SimpleNamespace(name="echo", description="Echo", inputSchema=schema, annotations=None, meta=None)
+        return SimpleNamespace(tools=[tool], nextCursor=None)
+
+    async def call_tool(self, name, arguments, **kwargs):
+        _FakeSession.calls += 1
+        if _FakeSession.fail_next_call:
+            _FakeSession.fail_next_call = False
+            raise ConnectionResetError("server went away")
+        from mcp.types import CallToolResult, TextContent
+        return CallToolResult(content=[TextContent(type="text", text=str(arguments["a"]))], isError=False)
+
+
+@asynccontextmanager
+async def _fake_create_session(connection, **kwargs):
+    _FakeSession.opened += 1
+    yield _FakeSession()
+
+
+@pytest.fixture
+def fake_sessions(monkeypatch):
+    monkeypatch.setattr(mcp_client_pool, "create_session", _fake_create_session)
+    _FakeSession.opened = 0
+    _FakeSession.schema_version = 1
+    _FakeSession.fail_next_call = False
+    _FakeSession.fail_next_list = False
+    _FakeSession.calls = 0
+    return _FakeSession
+
+
+CONFIG = {"echo": {"transport": "streamable_http", "url": "http://localhost:1/mcp"}}
+
+
+def test_agents_share_one_session_and_schema(fake_sessions):
+    async def run():
+        pool = MCPClientPool(schema_ttl=300)
+        first = await pool.get_tools(CONFIG)
+        second = await pool.get_tools(dict(CONFIG))
+        results = [await first[0].ainvoke({"a": i}) for i in range(5)]
+        await pool.close()
+        return first, second, results
+
+    first, second, results = asyncio.run(run())
+    assert first[0] is second[0]
+    assert results == [str(i) for i in range(5)]
+    assert fake_sessions.opened == 1
+
+
+def test_schema_change_is_detected_after_ttl(fake_sessions):
+    async def run():
+        pool = MCPClientPool(schema_ttl=0)
+        before = await pool.get_tools(CONFIG)
+        unchanged = await pool.get_tools(CONFIG)
+        fake_sessions.schema_version = 2
+        after = await pool.get_tools(CONFIG)
+        await pool.close()
+        return before, unchanged, after
+
+    before, unchanged, after = asyncio.run(run())
+    assert before[0] is unchanged[0]
+    assert after[0] is not before[0]
+    assert "b" in after[0].args
+
+
+def test_failed_tool_call_reconnects_without_resending(fake_sessions):
+    async def run():
+        pool = MCPClientPool()
+        tools = await pool.get_tools(CONFIG)
+        fake_sessions.fail_next_call = True
+        with pytest.raises(ConnectionError):
+            await tools[0].ainvoke({"a": 7})
+        # The call reached the server once and was not sent again
+        assert fake_sessions.calls == 1
+        result = await tools[0].ainvoke({"a": 8})
+        await pool.close()
+        return result
+
+    assert asyncio.run(run()) == "8"
+    assert fake_sessions.opened == 2
+
+
+def test_failed_list_tools_is_retried_once(fake_sessions):
+    async def run():
+        pool = MCPClientPool()
+        fake_sessions.fail_next_list = True
+        tools = await pool.get_tools(CONFIG)
+        await pool.close()
+        return tools
+
+    assert [tool.name for tool in asyncio.run(run())] == ["echo"]
+    assert fake_sessions.opened == 2
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_pooled_session_against_real_math_server():
+    port = _free_port()
+    env = dict(os.environ, MATH_HTTP_PORT=str(port))
+    proc = subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "agent_tools" / "tool_math.py")],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            with socket.socket() as sock:
+                if sock.connect_ex(("127.0.0.1", port)) == 0:
+                    break
+            time.sleep(0.1)
+        else:
+            pytest.skip("math MCP server did not start")
+
+        async def run():
+            pool = MCPClientPool()
+            config = {"math": {"transport": "streamable_http", "url": f"http://localhost:{port}/mcp"}}
+            tools = {tool.name: tool for tool in await pool.get_tools(config)}
+            results = await asyncio.gather(*(tools["add"].ainvoke({"a": i, "b": 1}) for i in range(3)))
+            await pool.close()
+            return results
+
+        assert asyncio.run(run()) == ["1.0", "2.0", "3.0"]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,53 @@
+"""
+MCP service status file tests
+"""
+import asyncio
+import time
+
+import pytest
+
+from tools.mcp_status import pending_services, read_status, wait_for_mcp_services, write_status
+
+URL = "http://localhost:8002/mcp"
+CONFIG = {"trade": {"transport": "streamable_http", "url": URL}}
+
+
+@pytest.fixture(autouse=True)
+def status_file(tmp_path, monkeypatch):
+    path = tmp_path / "mcp_status.json"
+    monkeypatch.setenv("MCP_STATUS_FILE", str(path))
+    return path
+
+
+def _status(state, url=URL):
+    return {"updated_at": time.time(), "services": {"trade": {"name": "TradeTools", "state": state, "urls": [url]}}}
+
+
+def test_pending_services_only_covers_supervised_urls():
+    status = _status("starting", url="http://127.0.0.1:8002/mcp/")
+    assert pending_services(status, [URL, "http://example.com/mcp"]) == [URL]
+    assert pending_services(_status("degraded"), [URL]) == []
+
+
+def test_no_or_stale_status_file_does_not_wait(status_file):
+    assert asyncio.run(wait_for_mcp_services(CONFIG, timeout=0.1))
+    stale = _status("starting")
+    stale["updated_at"] = time.time() - 3600
+    write_status(stale)
+    assert asyncio.run(wait_for_mcp_services(CONFIG, timeout=0.1))
+
+
+def test_waits_until_ready_and_times_out():
+    write_status(_status("starting"))
+    assert read_status()["services"]["trade"]["state"] == "starting"
+    assert asyncio.run(wait_for_mcp_services(CONFIG, timeout=0.2, poll_interval=0.05)) is False
+
+    async def run():
+        async def mark_ready():
+            await asyncio.sleep(0.1)
+            write_status(_status("ready"))
+
+        ready, _ = await asyncio.gather(wait_for_mcp_services(CONFIG, timeout=5, poll_interval=0.02), mark_ready())
+        return ready
+
+    assert asyncio.run(run())
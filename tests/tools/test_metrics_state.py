@@ -0,0 +1,109 @@
+"""
+Incremental ledger metrics tests
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from tools.calculate_metrics import calculate_metrics, calculate_portfolio_values
+from tools.metrics_state import MetricsState, leaderboard, load_state, update_from_ledger
+
+PRICE_DATA = {
+    "AAPL": {"Time Series (Daily)": {
+        f"2025-10-{day:02d}": {"4. close": str(price)}
+        for day, price in zip(range(1, 11), [100, 98, 103, 101, 95, 97, 104, 104, 99, 108])
+    }},
+}
+
+
+def _positions(n, start_day=1):
+    return [
+        {"date": f"2025-10-{day:02d} 10:00:00", "id": day, "positions": {"CASH": 500.0 + day, "AAPL": 1 + day % 3}}
+        for day in range(start_day, start_day + n)
+    ]
+
+
+def _write(path, positions, mode="a"):
+    with open(path, mode) as f:
+        for entry in positions:
+            f.write(json.dumps(entry) + "\n")
+
+
+def _assert_same(incremental, full):
+    assert incremental.keys() == full.keys()
+    for key, value in full.items():
+        if isinstance(value, str):
+            assert incremental[key] == value, key
+        else:
+            assert np.isclose(incremental[key], value, rtol=1e-9, atol=1e-12), key
+
+
+def test_running_state_matches_full_recomputation():
+    rng = np.random.default_rng(1)
+    values = 10000 * np.cumprod(1 + rng.normal(0, 0.02, 300))
+    values[50] = values[49]
+    dates = pd.date_range("2025-01-01", periods=len(values), freq="h").strftime("%Y-%m-%d %H:%M:%S")
+    state = MetricsState()
+    for date, value in zip(dates, values):
+        state.update(date, value)
+
+    df = pd.DataFrame({"date": pd.to_datetime(dates), "total_value": values})
+    for periods in (252, 252 * 6.5):
+        _assert_same(state.metrics(periods, 0.02), calculate_metrics(df, periods, 0.02))
+
+    restored = MetricsState.from_dict(json.loads(json.dumps(state.to_dict())))
+    _assert_same(restored.metrics(), state.metrics())
+
+
+def test_no_losses_gives_infinite_sortino():
+    state = MetricsState()
+    assert state.metrics() is None
+    for day, value in enumerate([100, 101, 103]):
+        state.update(f"2025-10-0{day + 1}", value)
+    assert state.metrics()["SR"] == float("inf")
+    assert state.metrics()["MDD"] == 0.0
+
+
+def test_ledger_appends_are_folded_in(tmp_path):
+    ledger = tmp_path / "sig" / "position" / "position.jsonl"
+    ledger.parent.mkdir(parents=True)
+    _write(ledger, _positions(4))
+    update_from_ledger(ledger, PRICE_DATA)
+
+    _write(ledger, _positions(5, start_day=5))
+    with open(ledger, "a") as f:
+        f.write('{"date": "2025-10-10 10:00:00", "positi')
+    state = update_from_ledger(ledger, PRICE_DATA)
+    assert state.count == 9
+    assert load_state(ledger).offset == state.offset
+
+    full = calculate_portfolio_values(_positions(9), PRICE_DATA, verbose=False)
+    _assert_same(state.metrics(), calculate_metrics(full))
+
+
+def test_rewritten_ledger_is_rescored(tmp_path):
+    ledger = tmp_path / "sig" / "position" / "position.jsonl"
+    ledger.parent.mkdir(parents=True)
+    _write(ledger, _positions(6))
+    update_from_ledger(ledger, PRICE_DATA)
+
+    _write(ledger, _positions(3, start_day=2), mode="w")
+    state = update_from_ledger(ledger, PRICE_DATA)
+    assert state.count == 3
+    full = calculate_portfolio_values(_positions(3, start_day=2), PRICE_DATA, verbose=False)
+    _assert_same(state.metrics(), calculate_metrics(full))
+
+
+def test_leaderboard_orders_by_cumulative_return(tmp_path):
+    for signature, positions in (("flat", [{"date": f"2025-10-0{d} 10:00:00", "positions": {"CASH": 1000.0}}
+                                           for d in range(1, 4)]),
+                                 ("long", _positions(9))):
+        ledger = tmp_path / signature / "position" / "position.jsonl"
+        ledger.parent.mkdir(parents=True)
+        _write(ledger, positions)
+
+    rows = leaderboard(tmp_path, PRICE_DATA)
+    assert [signature for signature, _ in rows] == ["flat", "long"]
+    assert rows[0][1]["CR"] == 0.0 > rows[1][1]["CR"]
+    assert (tmp_path / "long" / "position" / "metrics_state.json").exists()
@@ -0,0 +1,87 @@
+"""
+News condensation tests
+"""
+import json
+
+from tools import news_condense, news_store
+from tools.news_condense import (article_id, condense_articles,
+                                 estimate_tokens, find_article)
+from tools.news_store import NewsStore
+from tools.tool_cache import ToolResultCache
+
+
+def _article(url, published, relevance, sentiment, summary="word " * 200):
+    return {
+        "url": url,
+        "title": f"Title {url}",
+        "summary": summary,
+        "source": "Wire",
+        "time_published": published,
+        "ticker_sentiment": [
+            {"ticker": "AAPL", "relevance_score": str(relevance), "ticker_sentiment_score": str(sentiment),
+             "ticker_sentiment_label": "Bullish" if sentiment > 0 else "Bearish"},
+            {"ticker": "MSFT", "relevance_score": "0.9", "ticker_sentiment_score": "0.9"},
+        ],
+    }
+
+
+ARTICLES = [
+    _article("weak", "20251001T090000", relevance=0.1, sentiment=0.0),
+    _article("strong", "20251002T090000", relevance=0.8, sentiment=-0.6),
+    _article("medium", "20251003T090000", relevance=0.5, sentiment=0.2),
+]
+
+
+def test_rows_are_ranked_by_ticker_relevance_and_sentiment():
+    table = condense_articles(ARTICLES, tickers="AAPL", token_budget=10_000, summary_chars=50)
+    rows = table.splitlines()[1:-1]
+    assert [row.split(" | ")[0] for row in rows] == [article_id(ARTICLES[i]) for i in (1, 2, 0)]
+    assert "AAPL Bearish" in rows[0] and "MSFT" not in rows[0]
+    assert rows[0].endswith("…") and len(rows[0].split(" — ")[1]) <= 51
+
+
+def test_token_budget_limits_rows():
+    table = condense_articles(ARTICLES, tickers="AAPL", token_budget=120, summary_chars=200)
+    assert estimate_tokens(table) <= 150
+    assert len(table.splitlines()) == 3
+    assert table.splitlines()[-1].startswith("1 articles shown, 2 omitted")
+
+
+def test_find_article_from_store(tmp_path, monkeypatch):
+    store = NewsStore(str(tmp_path / "news.sqlite"))
+    store.add_articles(ARTICLES)
+    assert find_article(article_id(ARTICLES[1]), store)["url"] == "strong"
+    assert find_article("20251002-000000", store) is None
+    assert find_article("garbage", store) is None
+    store.close()
+
+
+def test_shown_articles_are_found_by_another_worker(tmp_path, monkeypatch):
+    # With a news store the table's articles are written to it
+    store = NewsStore(str(tmp_path / "news.sqlite"))
+    condense_articles(ARTICLES[1:2], token_budget=10_000, store=store)
+    assert find_article(article_id(ARTICLES[1]), store)["url"] == "strong"
+    store.close()
+
+    # Without one they go to the tool cache, whose disk tier every worker shares
+    monkeypatch.setattr(news_condense, "TOOL_CACHE", ToolResultCache(cache_dir=str(tmp_path / "cache")))
+    condense_articles(ARTICLES[2:], token_budget=10_000)
+    monkeypatch.setattr(news_condense, "TOOL_CACHE", ToolResultCache(cache_dir=str(tmp_path / "cache")))
+    assert find_article(article_id(ARTICLES[2]))["url"] == "medium"
+    assert find_article(article_id(ARTICLES[0])) is None
+
+
+def test_get_news_article_respects_today_date(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEWS_STORE_PATH", str(tmp_path / "news.sqlite"))
+    monkeypatch.setenv("TOOL_CACHE", "false")
+    runtime_env = tmp_path / "runtime_env.json"
+    runtime_env.write_text(json.dumps({"TODAY_DATE": "2025-10-03"}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(runtime_env))
+    monkeypatch.setattr(news_store, "_stores", {})
+    news_store.get_news_store().add_articles(ARTICLES)
+
+    from agent_tools.tool_alphavantage_news import get_news_article
+
+    detail = get_news_article.fn(article_id(ARTICLES[1]))
+    assert "URL: strong" in detail and "AAPL: relevance=0.8" in detail
+    assert "not available" in get_news_article.fn(article_id(ARTICLES[2]))
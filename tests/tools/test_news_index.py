@@ -0,0 +1,97 @@
+"""
+Local news index tests
+"""
+import json
+
+import pytest
+
+from tools import news_index, news_store
+from tools.news_index import NewsIndex, rank_articles
+from tools.news_store import NewsStore
+
+
+def _article(url, published, title, summary="", tickers=()):
+    return {
+        "url": url,
+        "title": title,
+        "summary": summary,
+        "time_published": published,
+        "ticker_sentiment": [{"ticker": t} for t in tickers],
+    }
+
+
+ARTICLES = [
+    _article("chips", "20251001T090000", "Nvidia chip demand soars", "AI chip orders", tickers=["NVDA"]),
+    _article("iphone", "20251002T090000", "Apple iPhone sales", "iPhone demand in China", tickers=["AAPL"]),
+    _article("chips-2", "20251003T090000", "Chip stocks rally", "Semiconductor chip makers gain", tickers=["NVDA", "AMD"]),
+    _article("future", "20251010T120000", "Chip export ban", "chip chip chip", tickers=["NVDA"]),
+]
+
+
+def test_search_ranks_by_relevance_within_window():
+    index = NewsIndex()
+    index.add_articles(ARTICLES)
+    urls = lambda articles: [a["url"] for a in articles]
+    assert urls(index.search("chip demand", time_to="20251005T0000")) == ["chips", "chips-2", "iphone"]
+    assert urls(index.search("chip", time_to="20251005T0000", time_from="20251002T0000")) == ["chips-2"]
+    assert urls(index.search("chip", time_to="20251005T0000", tickers="AMD")) == ["chips-2"]
+    assert index.search("the of", time_to="20251005T0000") == []
+
+
+def test_search_never_sees_articles_after_cutoff():
+    index = NewsIndex()
+    index.add_articles(ARTICLES)
+    before = index.search("chip", time_to="20251010T115900")
+    assert "future" not in [a["url"] for a in before]
+    # Statistics at the cutoff match an index that never contained the later article
+    reference = NewsIndex()
+    reference.add_articles(ARTICLES[:3])
+    assert before == reference.search("chip")
+    assert index.search("chip", time_to="20251010T120000")[0]["url"] == "future"
+
+
+def test_index_refreshes_from_store(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite"))
+    index = NewsIndex(store)
+    store.add_articles(ARTICLES[:2])
+    assert [a["url"] for a in index.search("iphone")] == ["iphone"]
+    store.add_articles(ARTICLES[2:])
+    assert len(index.search("chip")) == 3
+    assert index.refresh() == 0 and len(index) == 4
+    store.close()
+
+
+def test_rank_articles_keeps_unmatched_articles():
+    ranked = rank_articles("iphone", ARTICLES[:3])
+    assert [a["url"] for a in ranked] == ["iphone", "chips", "chips-2"]
+
+
+@pytest.fixture
+def runtime_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEWS_STORE_PATH", str(tmp_path / "news.sqlite"))
+    path = tmp_path / "runtime_env.json"
+    path.write_text(json.dumps({"TODAY_DATE": "2025-10-05"}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(path))
+    monkeypatch.setattr(news_store, "_stores", {})
+    monkeypatch.setattr(news_index, "_indexes", {})
+    news_store.get_news_store().add_articles(ARTICLES)
+
+
+def test_get_information_answers_from_local_index(runtime_env, monkeypatch):
+    from agent_tools import tool_jina_search
+
+    monkeypatch.delenv("JINA_API_KEY", raising=False)
+    monkeypatch.setenv("TOOL_CACHE", "false")
+    output = tool_jina_search.get_information.fn("chip export")
+    assert "Chip stocks rally" in output
+    assert "Chip export ban" not in output
+
+
+def test_market_news_ranks_store_results_by_query(runtime_env, monkeypatch):
+    from agent_tools.tool_alphavantage_news import AlphaVantageNewsTool
+
+    monkeypatch.setenv("NEWS_STORE_MODE", "offline")
+    tool = AlphaVantageNewsTool()
+    assert [a["url"] for a in tool(query="semiconductor rally", tickers="NVDA")] == ["chips-2"]
+    # No term matches: latest articles in the window
+    assert [a["url"] for a in tool(query="bonds", tickers="NVDA")] == ["chips-2", "chips"]
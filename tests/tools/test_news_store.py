@@ -0,0 +1,125 @@
+"""
+Offline news store tests
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from tools import news_store
+from tools.news_store import NewsStore, ingest
+
+
+def _article(url, published, tickers=(), topics=()):
+    return {
+        "url": url,
+        "title": f"title {url}",
+        "summary": "summary",
+        "source": "test",
+        "time_published": published,
+        "ticker_sentiment": [{"ticker": t} for t in tickers],
+        "topics": [{"topic": t} for t in topics],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite"))
+    yield store
+    store.close()
+
+
+def test_query_filters_by_ticker_topic_and_window(store):
+    store.add_articles([
+        _article("a", "20251001T090000", tickers=["AAPL"], topics=["technology"]),
+        _article("b", "20251002T090000", tickers=["AAPL", "MSFT"]),
+        _article("c", "20251003T090000", tickers=["MSFT"], topics=["technology"]),
+        _article("d", "20251010T090000", tickers=["AAPL"]),
+    ])
+    urls = lambda articles: [a["url"] for a in articles]
+    assert urls(store.query(tickers="AAPL", time_from="20251001T0000", time_to="20251005T0000")) == ["b", "a"]
+    assert urls(store.query(tickers="AAPL,MSFT")) == ["b"]
+    assert urls(store.query(topics="technology", sort="EARLIEST")) == ["a", "c"]
+    assert urls(store.query(limit=2)) == ["d", "c"]
+
+
+def test_coverage_requires_every_scope_and_contiguous_windows(store):
+    store.mark_covered("AAPL", None, "20251001T0000", "20251008T0000")
+    store.mark_covered("AAPL", None, "20251008T0000", "20251015T0000")
+    assert store.covers("AAPL", None, "20251002T0000", "20251012T0000")
+    assert not store.covers("AAPL", None, "20250930T0000", "20251012T0000")
+    assert not store.covers("AAPL,MSFT", None, "20251002T0000", "20251012T0000")
+    assert not store.covers(None, None, "20251002T0000", "20251012T0000")
+
+    store.mark_covered("AAPL", None, "20251020T0000", "20251030T0000")
+    assert not store.covers("AAPL", None, "20251010T0000", "20251025T0000")
+
+
+def test_ingest_splits_windows_that_hit_the_limit(store):
+    requests = []
+
+    def fetch(tickers, topics, time_from, time_to, sort, limit):
+        requests.append((time_from, time_to))
+        start = datetime.strptime(time_from, "%Y%m%dT%H%M")
+        end = datetime.strptime(time_to, "%Y%m%dT%H%M")
+        # Pretend there is one article per day; more than `limit` days overflow
+        days = (end - start).days
+        return [_article(f"{tickers}-{time_from}-{i}", time_from + "00", tickers=[tickers]) for i in range(min(days, limit))]
+
+    ingest(store, fetch, ["AAPL"], datetime(2025, 10, 1), datetime(2025, 10, 15), chunk_days=7, limit=4)
+    assert requests[0] == ("20251001T0000", "20251008T0000")
+    assert ("20251001T0000", "20251004T1200") in requests
+    assert store.covers("AAPL", None, "20251001T0000", "20251015T0000")
+
+
+def test_ingest_covers_only_windows_answered_with_a_feed(store, monkeypatch):
+    from agent_tools import tool_alphavantage_news
+    from tools.alphavantage_client import AlphaVantageError
+
+    responses = {
+        "20251001T0000": {"feed": []},
+        "20251008T0000": {"Information": "This is a premium endpoint."},
+    }
+
+    class _Scheduler:
+        def request(self, params, priority=None):
+            return responses[params["time_from"]]
+
+    monkeypatch.setattr(tool_alphavantage_news, "get_alphavantage_scheduler", lambda base_url: _Scheduler())
+    monkeypatch.setenv("ALPHAADVANTAGE_API_KEY", "test")
+    tool = tool_alphavantage_news.AlphaVantageNewsTool()
+    with pytest.raises(AlphaVantageError):
+        tool._fetch_news(time_from="20251008T0000")
+
+    ingest(store, tool._fetch_news, ["AAPL"], datetime(2025, 10, 1), datetime(2025, 10, 15), chunk_days=7)
+    assert store.covers("AAPL", None, "20251001T0000", "20251008T0000")
+    assert not store.covers("AAPL", None, "20251008T0000", "20251015T0000")
+
+
+def test_news_tool_serves_covered_windows_offline(tmp_path, monkeypatch):
+    monkeypatch.setenv("NEWS_STORE_PATH", str(tmp_path / "news.sqlite"))
+    monkeypatch.setenv("ALPHAADVANTAGE_API_KEY", "test")
+    runtime_env = tmp_path / "runtime_env.json"
+    runtime_env.write_text(json.dumps({"TODAY_DATE": "2025-10-10"}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(runtime_env))
+    monkeypatch.setattr(news_store, "_stores", {})
+
+    from agent_tools.tool_alphavantage_news import AlphaVantageNewsTool
+
+    store = news_store.get_news_store()
+    store.add_articles([
+        _article("old", "20251005T090000", tickers=["AAPL"]),
+        _article("future", "20251011T090000", tickers=["AAPL"]),
+    ])
+    store.mark_covered("AAPL", None, "20250901T0000", "20251031T0000")
+
+    tool = AlphaVantageNewsTool()
+    live_calls = []
+    monkeypatch.setattr(tool, "_fetch_news", lambda **kwargs: live_calls.append(kwargs) or [])
+    assert [a["url"] for a in tool(query="apple", tickers="AAPL")] == ["old"]
+    assert live_calls == []
+
+    # Uncovered ticker: falls back to the live API and writes the result through
+    monkeypatch.setattr(tool, "_fetch_news", lambda **kwargs: [_article("live", "20251009T090000", tickers=["MSFT"])])
+    assert [a["url"] for a in tool(query="msft", tickers="MSFT")] == ["live"]
+    assert [a["url"] for a in store.query(tickers="MSFT")] == ["live"]
@@ -0,0 +1,30 @@
+"""
+Scraped page cache tests
+"""
+from tools.page_cache import PageCache
+
+PAGE = {"url": "https://example.com", "title": "t", "description": "", "content": "body", "publish_time": "unknown"}
+
+
+def test_entries_share_content_blobs(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=60)
+    assert cache.get("https://example.com/a") is None
+    page_a = dict(PAGE, url="https://example.com/a")
+    page_b = dict(PAGE, url="https://example.com/b?utm_source=feed", publish_time="2025-10-01")
+    assert cache.put("https://example.com/a", page_a, etag='"x"') == cache.put("https://example.com/b", page_b)
+    entry = cache.get("https://example.com/a")
+    assert entry["page"] == page_a and entry["fresh"] and entry["etag"] == '"x"'
+    assert cache.get("https://example.com/b")["page"] == page_b
+    assert cache.stats() == {"entries": 2, "blobs": 1}
+
+    cache.put("https://example.com/c", dict(page_a, content="other body"))
+    assert cache.stats() == {"entries": 3, "blobs": 2}
+
+
+def test_stale_entries_need_revalidation(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=0)
+    cache.put("https://example.com/a", PAGE)
+    assert not cache.get("https://example.com/a")["fresh"]
+    cache.ttl = 60
+    cache.touch("https://example.com/a")
+    assert cache.get("https://example.com/a")["fresh"]
@@ -0,0 +1,69 @@
+"""
+Rolling plot metrics tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("seaborn")
+
+from tools.plot_metrics import calculate_rolling_metrics, plot_points
+
+
+def _reference_sortino(values, i, min_periods, periods_per_year):
+    """Sortino of returns[1..i] as computed point by point"""
+    returns = pd.Series(values).pct_change().iloc[1:i + 1].dropna()
+    if i < min_periods or len(returns) < min_periods:
+        return np.nan
+    negative = returns[returns < 0]
+    if len(negative) == 0:
+        return 20 if returns.mean() > 0 else 0
+    downside_std = max(negative.std(), 0.0001)
+    return np.clip(returns.mean() / downside_std * np.sqrt(periods_per_year), -20, 20)
+
+
+@pytest.mark.parametrize("is_hourly", [True, False])
+def test_matches_pointwise_expanding_metrics(is_hourly):
+    rng = np.random.default_rng(3)
+    values = 10000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 200))
+    values[:12] = np.linspace(10000, 10100, 12)
+    values[40:44] = values[39]
+    df = calculate_rolling_metrics(pd.DataFrame({
+        'date': pd.date_range("2025-01-01", periods=len(values), freq="h"),
+        'total_value': values,
+    }), is_hourly=is_hourly)
+
+    periods_per_year = 252 * 6.5 if is_hourly else 252
+    min_periods = 10 if is_hourly else 3
+    expected_sr = [_reference_sortino(values, i, min_periods, periods_per_year) for i in range(len(values))]
+    assert np.allclose(df['SR'], expected_sr, equal_nan=True)
+
+    returns = pd.Series(values).pct_change()
+    expected_vol = [returns.iloc[1:i + 1].std() * np.sqrt(periods_per_year) * 100 if i >= 2 else np.nan
+                    for i in range(len(values))]
+    assert np.allclose(df['Vol'], expected_vol, equal_nan=True)
+    assert np.allclose(df['CR'], (values - values[0]) / values[0] * 100)
+    assert df['MDD'].max() == 0.0
+
+
+def test_single_negative_return_leaves_sortino_undefined():
+    values = np.r_[np.linspace(100, 110, 6), 105.0, np.linspace(106, 112, 4)]
+    df = calculate_rolling_metrics(pd.DataFrame({
+        'date': pd.date_range("2025-01-01", periods=len(values)),
+        'total_value': values,
+    }), is_hourly=False)
+    assert df['SR'].iloc[3:6].tolist() == [20, 20, 20]
+    assert df['SR'].iloc[6:].isna().all()
+
+
+def test_plot_points_are_downsampled():
+    df = pd.DataFrame({
+        'date': pd.date_range("2025-01-01", periods=5000, freq="h"),
+        'CR': np.r_[np.nan, np.sin(np.arange(4999) / 50)],
+    })
+    points = plot_points(df, 'CR', max_points=400)
+    assert len(points) == 400
+    assert points['date'].iloc[0] == df['date'].iloc[1]
+    assert points['date'].iloc[-1] == df['date'].iloc[-1]
+    assert len(plot_points(df, 'CR', max_points=0)) == 4999
@@ -0,0 +1,88 @@
+"""
+Shared price store tests
+"""
+import json
+import os
+
+from tools.price_store import PriceStore
+from tools.price_tools import get_open_prices, get_yesterday_open_and_close_price
+
+
+def _write_prices(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for symbol, series in rows.items():
+            f.write(json.dumps({"Meta Data": {"2. Symbol": symbol}, "Time Series (Daily)": series}) + "\n")
+
+
+def _bar(buy, sell):
+    return {"1. buy price": str(buy), "4. sell price": str(sell)}
+
+
+def test_file_is_parsed_once_and_reloaded_on_change(tmp_path):
+    path = tmp_path / "merged.jsonl"
+    _write_prices(path, {"AAA": {"2025-01-02": _bar(1, 2)}})
+    store = PriceStore()
+
+    first = store.load(path)
+    assert store.load(path) is first
+    assert store.get_series(path, "AAA")["2025-01-02"]["1. buy price"] == "1"
+    assert store.timestamps(path) == {"2025-01-02"}
+
+    _write_prices(path, {"AAA": {"2025-01-02": _bar(5, 6)}, "BBB": {"2025-01-03": _bar(7, 8)}})
+    os.utime(path, ns=(first.signature[1] + 10**9, first.signature[1] + 10**9))
+    assert store.get_series(path, "AAA")["2025-01-02"]["1. buy price"] == "5"
+    assert store.symbols(path) == ["AAA", "BBB"]
+
+
+def test_loaded_file_survives_in_place_truncation(tmp_path):
+    path = tmp_path / "merged.jsonl"
+    _write_prices(path, {"AAA": {"2025-01-02": _bar(1, 2)}, "BBB": {"2025-01-03": _bar(3, 4)}})
+    loaded = PriceStore(cache_size=1).load(path)
+
+    # A data script rewriting the file with open(path, "w"), caught mid-write
+    with open(path, "w", encoding="utf-8"):
+        assert loaded.get_document("BBB")["Time Series (Daily)"]["2025-01-03"]["4. sell price"] == "4"
+        assert loaded.get_document("AAA")["Meta Data"]["2. Symbol"] == "AAA"
+
+
+def test_missing_file_and_symbol(tmp_path):
+    store = PriceStore()
+    assert store.load(tmp_path / "missing.jsonl") is None
+    assert store.symbols(tmp_path / "missing.jsonl") == []
+    path = tmp_path / "merged.jsonl"
+    _write_prices(path, {"AAA": {}})
+    assert store.get_series(path, "ZZZ") is None
+
+
+def test_price_helpers_read_through_store(tmp_path):
+    path = tmp_path / "merged.jsonl"
+    _write_prices(path, {
+        "AAA": {"2025-01-02": _bar(10, 11), "2025-01-03": _bar(12, 13)},
+        "BBB": {"2025-01-03": _bar(20, 21)},
+    })
+    assert get_open_prices("2025-01-03", ["AAA", "BBB"], merged_path=str(path)) == {
+        "AAA_price": 12.0,
+        "BBB_price": 20.0,
+    }
+    buy, sell = get_yesterday_open_and_close_price("2025-01-03", ["AAA", "BBB"], merged_path=str(path))
+    assert buy == {"AAA_price": 10.0, "BBB_price": None}
+    assert sell == {"AAA_price": 11.0, "BBB_price": None}
+
+
+def test_parsed_documents_are_bounded_by_cache_size(tmp_path):
+    path = tmp_path / "merged.jsonl"
+    _write_prices(path, {f"S{i}": {"2025-01-02": _bar(i, i)} for i in range(5)})
+    store = PriceStore(cache_size=2)
+    for i in range(5):
+        assert store.get_series(path, f"S{i}")["2025-01-02"]["1. buy price"] == str(i)
+    loaded = store.load(path)
+    assert len(loaded._cache) == 2
+    assert len(loaded.offsets) == 5
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "merged.jsonl"
+    path.write_text("")
+    store = PriceStore()
+    assert store.symbols(path) == []
+    assert store.timestamps(path) == frozenset()
@@ -0,0 +1,162 @@
+"""
+Provider rate limiter / circuit breaker tests
+"""
+import asyncio
+import time
+
+import pytest
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from tools.rate_limiter import (ProviderCallLimiter, ProviderRateLimiter,
+                                backoff_delay, is_provider_error,
+                                is_rate_limit_error)
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    """Limiter with a tiny bucket and a short cooldown"""
+    return ProviderRateLimiter(
+        "https://example.test/v1",
+        rate_per_minute=60,
+        burst=2,
+        failure_threshold=2,
+        cooldown=10,
+        state_dir=str(tmp_path),
+    )
+
+
+def test_bucket_allows_burst_then_waits(limiter):
+    now = time.time()
+    assert limiter.try_acquire(now) == 0.0
+    assert limiter.try_acquire(now) == 0.0
+    wait = limiter.try_acquire(now)
+    assert 0.9 < wait <= 1.0
+
+
+def test_reserve_leaves_tokens_for_other_callers(limiter):
+    now = time.time()
+    assert limiter.try_acquire(now, reserve=1) == 0.0
+    # One token left: a reserving caller waits, a normal caller still gets it
+    assert 0.9 < limiter.try_acquire(now, reserve=1) <= 1.0
+    assert limiter.try_acquire(now) == 0.0
+
+
+def test_state_is_shared_between_instances(limiter, tmp_path):
+    other = ProviderRateLimiter(limiter.key, rate_per_minute=60, burst=2, state_dir=str(tmp_path))
+    now = time.time()
+    limiter.try_acquire(now)
+    limiter.try_acquire(now)
+    assert other.try_acquire(now) > 0
+
+
+def test_circuit_opens_after_threshold(limiter):
+    now = time.time()
+    limiter.record_failure(RuntimeError("boom"), now=now)
+    assert limiter.try_acquire(now) == 0.0
+    limiter.record_failure(RuntimeError("boom"), now=now)
+    wait = limiter.try_acquire(now)
+    assert wait == pytest.approx(10, abs=0.01)
+
+
+def test_half_open_probe_and_doubling_cooldown(limiter):
+    now = time.time()
+    limiter.record_failure(now=now)
+    limiter.record_failure(now=now)
+
+    after = now + 11
+    # First caller after the cooldown probes, the second waits for it
+    assert limiter.try_acquire(after) == 0.0
+    assert limiter.try_acquire(after) > 0
+
+    # Failed probe re-opens the circuit for twice as long
+    limiter.record_failure(RuntimeError("still down"), now=after)
+    assert limiter.try_acquire(after) == pytest.approx(20, abs=0.01)
+
+
+def test_success_closes_circuit(limiter):
+    now = time.time()
+    limiter.record_failure(now=now)
+    limiter.record_failure(now=now)
+    limiter.record_success()
+    state = limiter.status()
+    assert state["trips"] == 0 and state["open_until"] == 0.0
+
+
+def test_rate_limit_error_drains_bucket(limiter):
+    now = time.time()
+    limiter.record_failure(RuntimeError("Error code: 429 - Too Many Requests"), now=now)
+    assert limiter.try_acquire(now) > 0
+
+
+def test_acquire_waits_for_refill(tmp_path):
+    fast = ProviderRateLimiter("fast", rate_per_minute=600, burst=1, state_dir=str(tmp_path))
+
+    async def run():
+        await fast.acquire()
+        return await fast.acquire()
+
+    waited = asyncio.run(run())
+    assert 0.05 < waited < 1.0
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(1, 6):
+        delay = backoff_delay(attempt, 1.0, max_delay=8.0)
+        cap = min(8.0, 2 ** (attempt - 1))
+        assert cap / 2 <= delay <= cap
+
+
+def test_is_rate_limit_error():
+    assert is_rate_limit_error(RuntimeError("Rate limit reached for requests"))
+    assert not is_rate_limit_error(ValueError("invalid schema"))
+
+
+class _StatusError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def test_is_provider_error():
+    assert is_provider_error(_StatusError("Service Unavailable", 503))
+    assert is_provider_error(_StatusError("Too Many Requests", 429))
+    assert is_provider_error(asyncio.TimeoutError())
+    assert is_provider_error(type("APITimeoutError", (Exception,), {})("Request timed out."))
+    assert not is_provider_error(_StatusError("Bad Request", 400))
+    assert not is_provider_error(KeyError("symbol"))
+
+    try:
+        try:
+            raise ConnectionError("reset by peer")
+        except ConnectionError as e:
+            raise RuntimeError("model call failed") from e
+    except RuntimeError as wrapped:
+        assert is_provider_error(wrapped)
+
+
+def test_callback_takes_a_token_per_model_call(tmp_path):
+    limiter = ProviderRateLimiter("calls", rate_per_minute=1, burst=10, state_dir=str(tmp_path))
+    model = FakeListChatModel(responses=["a", "b", "c"])
+
+    # One run that makes three model calls, like an agent loop with tool steps in between
+    async def agent_loop(messages, config):
+        for _ in range(3):
+            await model.ainvoke(messages, config)
+        return "done"
+
+    asyncio.run(RunnableLambda(agent_loop).ainvoke("hi", {"callbacks": [ProviderCallLimiter(limiter)]}))
+    assert limiter.status()["tokens"] == pytest.approx(7, abs=0.01)
+
+
+def test_callback_counts_only_provider_errors(limiter):
+    handler = ProviderCallLimiter(limiter)
+    asyncio.run(handler.on_llm_error(ValueError("could not parse tool call")))
+    asyncio.run(handler.on_llm_error(KeyError("tool")))
+    assert limiter.status()["failures"] == 0
+
+    asyncio.run(handler.on_llm_error(_StatusError("Bad Gateway", 502)))
+    assert limiter.status()["failures"] == 1
+    asyncio.run(handler.on_llm_end(None))
+    assert limiter.status()["failures"] == 0
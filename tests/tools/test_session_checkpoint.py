@@ -0,0 +1,92 @@
+"""
+Session checkpoint / resume tests
+"""
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from tools.session_checkpoint import SessionCheckpoint
+
+
+def test_save_load_clear_round_trip(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path), enabled=True)
+    assert checkpoint.load() is None
+
+    messages = [{"role": "user", "content": "请分析并更新今日的持仓。"}]
+    checkpoint.save("system", messages, 1)
+    state = checkpoint.load()
+    assert state["messages"] == messages
+    assert state["step"] == 1 and state["finished"] is False
+
+    checkpoint.clear()
+    assert not os.path.exists(checkpoint.path)
+
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path), enabled=True)
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert checkpoint.load() is None
+
+
+def test_disabled_checkpoint_writes_nothing(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path), enabled=False)
+    checkpoint.save("system", [], 0)
+    assert not os.path.exists(checkpoint.path)
+
+
+class _FlakyAgent:
+    """Fake LangChain agent that fails once on its second call"""
+
+    def __init__(self):
+        self.calls = []
+        self.failed = False
+
+    async def ainvoke(self, payload, config):
+        self.calls.append([m["content"] for m in payload["messages"]])
+        if len(self.calls) == 2 and not self.failed:
+            self.failed = True
+            raise RuntimeError("connection reset")
+        step = len(self.calls)
+        return {"final": "<FINISH_SIGNAL>" if step >= 4 else f"step {step}"}
+
+
+def test_session_resumes_from_last_completed_step(tmp_path, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_DIR", str(tmp_path / "limits"))
+    monkeypatch.setenv("SESSION_CHECKPOINT", "true")
+    from agent.base_agent import base_agent as module
+
+    agent = module.BaseAgent(
+        "checkpoint-test",
+        "fake-model",
+        stock_symbols=["AAPL"],
+        log_path=str(tmp_path),
+        max_steps=5,
+        max_retries=1,
+        openai_base_url="http://checkpoint-test.invalid/v1",
+    )
+    fake = _FlakyAgent()
+    build_prompt = patch.object(module, "get_agent_system_prompt", return_value="system prompt").start()
+    patch.object(module, "create_agent", return_value=fake).start()
+    patch.object(module, "write_config_value").start()
+    patch.object(module, "extract_conversation", side_effect=lambda response, kind: response["final"]).start()
+    patch.object(module, "extract_tool_messages", return_value=[]).start()
+    agent._handle_trading_result = AsyncMock()
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(agent.run_trading_session("2025-10-02"))
+        checkpoint = SessionCheckpoint(str(tmp_path / "checkpoint-test" / "log" / "2025-10-02"))
+        assert checkpoint.load()["step"] == 1
+
+        asyncio.run(agent.run_trading_session("2025-10-02"))
+    finally:
+        patch.stopall()
+
+    # The prompt was built once and the retried call continued the step-1 conversation
+    assert build_prompt.call_count == 1
+    assert fake.calls[2][-2:] == ["step 1", "Tool results: "]
+    assert len(fake.calls) == 4
+    assert not os.path.exists(checkpoint.path)
+    agent._handle_trading_result.assert_awaited_once()
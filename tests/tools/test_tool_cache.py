@@ -0,0 +1,102 @@
+"""
+Point-in-time tool result cache tests
+"""
+import json
+
+import pytest
+
+from tools import tool_cache
+from tools.tool_cache import ToolResultCache, cached_tool
+
+
+@pytest.fixture
+def runtime_env(tmp_path, monkeypatch):
+    path = tmp_path / "runtime_env.json"
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(path))
+
+    def set_today(date):
+        path.write_text(json.dumps({"TODAY_DATE": date}))
+
+    set_today("2025-01-02")
+    return set_today
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ToolResultCache(max_entries=16)
+    monkeypatch.setattr(tool_cache, "TOOL_CACHE", cache)
+    return cache
+
+
+def _counting_tool():
+    calls = []
+
+    @cached_tool
+    def get_price(symbol: str, date: str = "latest") -> dict:
+        """Price lookup"""
+        calls.append((symbol, date))
+        if symbol == "BAD":
+            return {"error": "not found"}
+        return {"symbol": symbol, "date": date}
+
+    return get_price, calls
+
+
+def test_same_arguments_and_date_hit_the_cache(runtime_env, cache):
+    get_price, calls = _counting_tool()
+    assert get_price("AAPL") == {"symbol": "AAPL", "date": "latest"}
+    assert get_price(symbol="AAPL", date="latest") == {"symbol": "AAPL", "date": "latest"}
+    assert len(calls) == 1
+
+    # A hit must not hand out the cached object itself
+    get_price("AAPL")["symbol"] = "changed"
+    assert get_price("AAPL")["symbol"] == "AAPL"
+
+    runtime_env("2025-01-03")
+    get_price("AAPL")
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 3
+
+
+def test_errors_are_not_cached(runtime_env, cache):
+    get_price, calls = _counting_tool()
+    get_price("BAD")
+    get_price("BAD")
+    assert len(calls) == 2
+
+    @cached_tool
+    def search(query: str) -> str:
+        calls.append(query)
+        return "❌ Search tool execution failed: timeout"
+
+    search("q")
+    search("q")
+    assert calls[-2:] == ["q", "q"]
+
+
+def test_lru_eviction(runtime_env, monkeypatch):
+    monkeypatch.setattr(tool_cache, "TOOL_CACHE", ToolResultCache(max_entries=2))
+    get_price, calls = _counting_tool()
+    for symbol in ("A", "B", "C", "A"):
+        get_price(symbol)
+    assert calls == [("A", "latest"), ("B", "latest"), ("C", "latest"), ("A", "latest")]
+
+
+def test_disk_tier_survives_a_new_process_cache(runtime_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_cache, "TOOL_CACHE", ToolResultCache(cache_dir=str(tmp_path / "cache")))
+    get_price, calls = _counting_tool()
+    get_price("AAPL")
+
+    fresh = ToolResultCache(cache_dir=str(tmp_path / "cache"))
+    monkeypatch.setattr(tool_cache, "TOOL_CACHE", fresh)
+    assert get_price("AAPL") == {"symbol": "AAPL", "date": "latest"}
+    assert len(calls) == 1
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_cache_can_be_disabled(runtime_env, cache, monkeypatch):
+    monkeypatch.setenv("TOOL_CACHE", "false")
+    get_price, calls = _counting_tool()
+    get_price("AAPL")
+    get_price("AAPL")
+    assert len(calls) == 2
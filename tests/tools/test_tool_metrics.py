@@ -0,0 +1,87 @@
+"""
+Per-tool metrics tests
+"""
+import asyncio
+import json
+
+import pytest
+from fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from tools.tool_metrics import TOOL_METRICS, ToolMetrics, instrument_tool, register_metrics_route
+
+
+@pytest.fixture(autouse=True)
+def runtime_env(tmp_path, monkeypatch):
+    path = tmp_path / "runtime_env.json"
+    path.write_text(json.dumps({"SIGNATURE": "model-a"}))
+    monkeypatch.setenv("RUNTIME_ENV_PATH", str(path))
+    TOOL_METRICS.reset()
+    yield
+    TOOL_METRICS.reset()
+
+
+def test_calls_errors_and_histogram_are_recorded():
+    @instrument_tool
+    def lookup(symbol: str) -> dict:
+        """Look up a symbol"""
+        if symbol == "BAD":
+            return {"error": "unknown symbol"}
+        if symbol == "BOOM":
+            raise RuntimeError("boom")
+        return {"symbol": symbol}
+
+    assert lookup("AAPL") == {"symbol": "AAPL"}
+    assert lookup("BAD")["error"]
+    with pytest.raises(RuntimeError):
+        lookup("BOOM")
+
+    series = TOOL_METRICS.snapshot()[("lookup", "model-a")]
+    assert series["calls"] == 3
+    assert series["errors"] == 2
+    assert series["buckets"][-1] == 3
+    assert lookup.__name__ == "lookup" and lookup.__doc__ == "Look up a symbol"
+
+
+def test_async_tools_are_instrumented():
+    @instrument_tool
+    async def fetch(query: str) -> str:
+        await asyncio.sleep(0)
+        return query
+
+    assert asyncio.run(fetch("news")) == "news"
+    assert TOOL_METRICS.snapshot()[("fetch", "model-a")]["calls"] == 1
+
+
+def test_prometheus_rendering():
+    metrics = ToolMetrics()
+    metrics.observe("buy", 'sig"1', 0.02, error=False)
+    metrics.observe("buy", 'sig"1', 3.0, error=True)
+    text = metrics.render_prometheus()
+    labels = 'tool="buy",signature="sig\\"1"'
+    assert f"mcp_tool_calls_total{{{labels}}} 2" in text
+    assert f"mcp_tool_errors_total{{{labels}}} 1" in text
+    assert f'mcp_tool_latency_seconds_bucket{{{labels},le="0.025"}} 1' in text
+    assert f'mcp_tool_latency_seconds_bucket{{{labels},le="5.0"}} 2' in text
+    assert f'mcp_tool_latency_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"mcp_tool_latency_seconds_count{{{labels}}} 2" in text
+
+
+def test_metrics_route_and_unchanged_tool_schema():
+    mcp = FastMCP("Test")
+    register_metrics_route(mcp)
+
+    @mcp.tool()
+    @instrument_tool
+    def add(a: float, b: float) -> float:
+        """Add two numbers"""
+        return a + b
+
+    tool = asyncio.run(mcp.get_tools())["add"]
+    assert set(tool.parameters["properties"]) == {"a", "b"}
+    assert tool.description == "Add two numbers"
+    asyncio.run(tool.run({"a": 1, "b": 2}))
+
+    response = TestClient(mcp.http_app(path="/mcp")).get("/metrics")
+    assert response.status_code == 200
+    assert 'mcp_tool_calls_total{tool="add",signature="model-a"} 1' in response.text
@@ -0,0 +1,243 @@
+"""
+Shared request scheduler for Alpha Vantage API calls.
+
+The news tool, the news store ingest and the A-share price fetcher all call Alpha Vantage
+with one API key, so they share one quota. AlphaVantageScheduler sends every request
+through a cross-process token bucket (tools/rate_limiter.py, state under RATE_LIMIT_DIR)
+and adds:
+
+    - Coalescing: identical requests (same parameters) in flight in this process are sent
+      once and every caller receives the same response.
+    - Priority classes: "interactive" (agent tool calls) are admitted before "bulk"
+      (backfills) waiting in the same process; bulk callers also leave
+      ALPHAVANTAGE_BULK_RESERVE tokens in the shared bucket for interactive calls of
+      other processes.
+
+Coalescing and in-process priority need concurrent callers, i.e. requests made from
+several threads: the news tool runs its requests in worker threads for that reason. A
+single-threaded caller only gets the cross-process token bucket and throttle handling.
+    - Throttling: HTTP 429 or an Alpha Vantage rate limit "Note"/"Information" drains the
+      shared bucket for every process and the request is retried.
+
+Configuration (environment variables):
+    ALPHAVANTAGE_RPM: Requests per minute for the API key (default 5)
+    ALPHAVANTAGE_BURST: Bucket capacity (default 2)
+    ALPHAVANTAGE_BULK_RESERVE: Tokens bulk requests leave for interactive ones (default 1)
+    ALPHAVANTAGE_MAX_RETRIES: Retries after throttling or network errors (default 2)
+    ALPHAVANTAGE_TIMEOUT: Seconds per HTTP request (default 30)
+"""
+
+import copy
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from tools.rate_limiter import ProviderRateLimiter, backoff_delay
+
+ALPHAVANTAGE_URL = "https://www.alphavantage.co/query"
+INTERACTIVE = "interactive"
+BULK = "bulk"
+_PRIORITY_RANK = {INTERACTIVE: 0, BULK: 1}
+
+
+class AlphaVantageError(Exception):
+    """Alpha Vantage answered with an error message"""
+
+
+class AlphaVantageRateLimitError(AlphaVantageError):
+    """Alpha Vantage throttled the request (HTTP 429 or a rate limit note)"""
+
+    status_code = 429
+
+
+def _rate_limit_message(data: Dict[str, Any]) -> Optional[str]:
+    """Throttling message hidden in a 200 response, if any"""
+    if "Note" in data:
+        return str(data["Note"])
+    message = str(data.get("Information", ""))
+    lowered = message.lower()
+    if "rate limit" in lowered or "call frequency" in lowered or "requests per" in lowered:
+        return message
+    return None
+
+
+class _Request:
+    """One in-flight request: its waiters share the future, the best priority wins"""
+
+    __slots__ = ("future", "rank", "seq")
+
+    def __init__(self, rank: int, seq: int):
+        self.future: Future = Future()
+        self.rank = rank
+        self.seq = seq
+
+
+class AlphaVantageScheduler:
+    """Rate limited, coalescing, prioritized Alpha Vantage client"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = ALPHAVANTAGE_URL,
+        limiter: Optional[ProviderRateLimiter] = None,
+        bulk_reserve: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Initialize AlphaVantageScheduler
+
+        Args:
+            api_key: API key; defaults to ALPHAADVANTAGE_API_KEY
+            base_url: Query endpoint
+            limiter: Shared token bucket; defaults to one keyed by base_url from ALPHAVANTAGE_RPM/BURST
+            bulk_reserve: Tokens bulk requests leave in the bucket; defaults to ALPHAVANTAGE_BULK_RESERVE (1)
+            max_retries: Retries after throttling/network errors; defaults to ALPHAVANTAGE_MAX_RETRIES (2)
+            timeout: Seconds per HTTP request; defaults to ALPHAVANTAGE_TIMEOUT (30)
+        """
+        self.api_key = api_key if api_key is not None else os.environ.get("ALPHAADVANTAGE_API_KEY")
+        self.base_url = base_url
+        if limiter is None:
+            limiter = ProviderRateLimiter(
+                f"alphavantage:{base_url}",
+                rate_per_minute=float(os.getenv("ALPHAVANTAGE_RPM", "5")),
+                burst=int(os.getenv("ALPHAVANTAGE_BURST", "2")),
+            )
+        self.limiter = limiter
+        self.bulk_reserve = float(os.getenv("ALPHAVANTAGE_BULK_RESERVE", "1")) if bulk_reserve is None else bulk_reserve
+        self.max_retries = int(os.getenv("ALPHAVANTAGE_MAX_RETRIES", "2")) if max_retries is None else max_retries
+        self.timeout = float(os.getenv("ALPHAVANTAGE_TIMEOUT", "30")) if timeout is None else timeout
+        self.session = requests.Session()
+        self._inflight: Dict[str, _Request] = {}
+        self._waiting: List[_Request] = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self.sent = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def request_key(params: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in params.items() if k != "apikey"}, sort_keys=True, default=str)
+
+    def request(self, params: Dict[str, Any], priority: str = INTERACTIVE,
+                max_wait: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send one query (or join an identical one in flight) and return the decoded JSON.
+
+        Args:
+            params: Query parameters, e.g. {"function": "NEWS_SENTIMENT", ...}; apikey defaults to the scheduler's
+            priority: "interactive" or "bulk"
+            max_wait: Optional cap on the time spent waiting for the rate limiter
+
+        Returns:
+            Response JSON
+
+        Raises:
+            AlphaVantageError: Alpha Vantage returned an error, or kept throttling after all retries
+            TimeoutError: The rate limiter did not admit the request within max_wait
+            requests.RequestException: The request kept failing after all retries
+        """
+        rank = _PRIORITY_RANK[priority]
+        key = self.request_key(params)
+        with self._cond:
+            entry = self._inflight.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._inflight[key] = _Request(rank, next(self._seq))
+            else:
+                # An interactive caller joining a queued bulk request promotes it
+                entry.rank = min(entry.rank, rank)
+                self.coalesced += 1
+                self._cond.notify_all()
+
+        if not owner:
+            return copy.deepcopy(entry.future.result())
+
+        try:
+            result = self._execute(params, entry, max_wait)
+        except BaseException as e:
+            entry.future.set_exception(e)
+            raise
+        else:
+            entry.future.set_result(result)
+            return copy.deepcopy(result)
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+
+    def _admit(self, entry: _Request, max_wait: Optional[float]) -> None:
+        """Block until entry is the best waiting request and the shared bucket has a token for it"""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting.append(entry)
+            self._cond.notify_all()
+            try:
+                while True:
+                    head = min(self._waiting, key=lambda w: (w.rank, w.seq))
+                    if head is entry:
+                        reserve = self.bulk_reserve if entry.rank > 0 else 0.0
+                        wait = self.limiter.try_acquire(reserve=reserve)
+                        if wait <= 0:
+                            return
+                    else:
+                        wait = 1.0
+                    if max_wait is not None and time.monotonic() - start + min(wait, 1.0) > max_wait:
+                        raise TimeoutError(f"Alpha Vantage scheduler did not admit a request within {max_wait}s")
+                    # Woken early when the head leaves or a better request arrives
+                    self._cond.wait(timeout=min(wait, 1.0))
+            finally:
+                self._waiting.remove(entry)
+                self._cond.notify_all()
+
+    def _execute(self, params: Dict[str, Any], entry: _Request, max_wait: Optional[float]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(entry, max_wait)
+            try:
+                self.sent += 1
+                response = self.session.get(self.base_url, params={"apikey": self.api_key, **params},
+                                            timeout=self.timeout)
+                if response.status_code == 429:
+                    raise AlphaVantageRateLimitError("Alpha Vantage rate limit: HTTP 429")
+                response.raise_for_status()
+                data = response.json()
+                message = _rate_limit_message(data)
+                if message:
+                    raise AlphaVantageRateLimitError(f"Alpha Vantage rate limit: {message}")
+            except AlphaVantageRateLimitError as e:
+                # Drains the shared bucket, so the retry (and every other process) waits for a refill
+                self.limiter.record_failure(e)
+                if attempt > self.max_retries:
+                    raise
+                print(f"⚠️ {e}; retrying ({attempt}/{self.max_retries})")
+                continue
+            except requests.RequestException as e:
+                self.limiter.record_failure(e)
+                if attempt > self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt, 1.0, max_delay=10.0))
+                continue
+
+            self.limiter.record_success()
+            if "Error Message" in data:
+                raise AlphaVantageError(f"Alpha Vantage API error: {data['Error Message']}")
+            return data
+
+
+_schedulers: Dict[str, AlphaVantageScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_alphavantage_scheduler(base_url: str = ALPHAVANTAGE_URL) -> AlphaVantageScheduler:
+    """Process-wide scheduler for an Alpha Vantage endpoint"""
+    with _schedulers_lock:
+        if base_url not in _schedulers:
+            _schedulers[base_url] = AlphaVantageScheduler(base_url=base_url)
+        return _schedulers[base_url]
@@ -0,0 +1,204 @@
+"""
+As-of ("closest earlier") price lookups shared by the analytics scripts and price tools.
+
+Price files store bars as {timestamp: {"1. buy price", "4. close" | "4. sell price", ...}}
+under one of PRICE_SERIES_KEYS. AsOfSeries turns one symbol's bars into sorted timestamp
+and price arrays once; queries are then resolved for many timestamps at a time with
+np.searchsorted instead of sorting the keys per lookup.
+
+Query matching:
+    - Intraday series are matched on the full timestamp, daily series on the date part,
+      so hourly ledgers can be valued against daily files and vice versa.
+    - mode="asof": last bar at or before the query (strict=True: strictly before).
+    - mode="same_day": like asof, but only bars of the query's calendar day; a date-only
+      query takes the last bar of that day.
+    - mode="exact": only a bar with exactly the query timestamp.
+
+Prices use the first field of `fields` with a non-empty value ("4. close" first by
+default, "4. sell price" for crypto files); unparseable values ("N/A") become NaN.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PRICE_SERIES_KEYS = ("Time Series (60min)", "Time Series (Daily)", "Time Series (Hourly)")
+CLOSE_FIELDS = ("4. close", "4. sell price")
+CRYPTO_FIELDS = ("4. sell price", "4. close")
+# A date-only query in same_day mode means the end of that day
+_END_OF_DAY = " 99:99:99"
+
+_CACHE_SIZE = 2048
+_cache: Dict[Tuple[int, Any], Tuple[Any, Any]] = {}
+
+
+def _memoized(obj: Any, extra: Any, build):
+    """Memoize build() per (object identity, extra); keeps obj referenced so its id stays unique"""
+    key = (id(obj), extra)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] is obj:
+        return cached[1]
+    value = build()
+    _cache[key] = (obj, value)
+    while len(_cache) > _CACHE_SIZE:
+        _cache.pop(next(iter(_cache)))
+    return value
+
+
+def normalize_timestamp(ts: str) -> str:
+    """Zero-pad the hour of 'YYYY-MM-DD H:MM:SS' so string order equals time order"""
+    if " " not in ts:
+        return ts
+    date_part, time_part = ts.split(" ", 1)
+    if len(time_part) == 7 and time_part[1] == ":":
+        return f"{date_part} 0{time_part}"
+    return ts
+
+
+def _price(bar: Any, fields: Sequence[str]) -> float:
+    if not isinstance(bar, dict):
+        return np.nan
+    for field in fields:
+        value = bar.get(field)
+        if value not in (None, ""):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+    return np.nan
+
+
+class AsOfSeries:
+    """Sorted timestamps and prices of one symbol"""
+
+    __slots__ = ("timestamps", "prices", "intraday")
+
+    def __init__(self, timestamps: np.ndarray, prices: np.ndarray, intraday: bool):
+        self.timestamps = timestamps
+        self.prices = prices
+        self.intraday = intraday
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_bars(cls, bars: Dict[str, Any], fields: Sequence[str] = CLOSE_FIELDS,
+                  intraday: Optional[bool] = None) -> "AsOfSeries":
+        """
+        Build from a {timestamp: bar} dict.
+
+        Args:
+            bars: Bars keyed by 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'
+            fields: Price fields in order of preference
+            intraday: Whether bars are intraday; inferred from the timestamps if None
+        """
+        keys = sorted(bars, key=normalize_timestamp)
+        timestamps = np.array([normalize_timestamp(k) for k in keys], dtype=str)
+        prices = np.array([_price(bars[k], fields) for k in keys], dtype=float)
+        if intraday is None:
+            intraday = any(" " in k for k in keys)
+        return cls(timestamps, prices, intraday)
+
+    @classmethod
+    def from_price_file(cls, doc: Dict[str, Any], fields: Sequence[str] = CLOSE_FIELDS) -> Optional["AsOfSeries"]:
+        """Build from a loaded price file (first of PRICE_SERIES_KEYS present); None if it has none"""
+        key = next((k for k in PRICE_SERIES_KEYS if k in doc), None)
+        if key is None:
+            return None
+        return cls.from_bars(doc[key], fields, intraday="min" in key or "Hourly" in key)
+
+    def _query_keys(self, queries: Iterable[str], mode: str) -> np.ndarray:
+        keys = []
+        for query in queries:
+            query = normalize_timestamp(query)
+            if not self.intraday:
+                query = query.split(" ", 1)[0]
+            elif mode == "same_day" and " " not in query:
+                query += _END_OF_DAY
+            keys.append(query)
+        return np.array(keys, dtype=str)
+
+    def indices(self, queries: Sequence[str], mode: str = "asof", strict: bool = False) -> np.ndarray:
+        """Index of the matching bar for every query, -1 where there is none"""
+        if len(self.timestamps) == 0 or len(queries) == 0:
+            return np.full(len(queries), -1, dtype=np.int64)
+        keys = self._query_keys(queries, mode)
+        if mode == "exact":
+            idx = np.searchsorted(self.timestamps, keys, side="left")
+            found = idx < len(self.timestamps)
+            found[found] = self.timestamps[idx[found]] == keys[found]
+            return np.where(found, idx, -1)
+        idx = np.searchsorted(self.timestamps, keys, side="left" if strict else "right") - 1
+        if mode == "same_day":
+            found = idx >= 0
+            days = np.array([k[:10] for k in keys], dtype=str)
+            found[found] = np.array([t[:10] for t in self.timestamps[idx[found]]], dtype=str) == days[found]
+            idx = np.where(found, idx, -1)
+        return idx
+
+    def prices_at(self, queries: Sequence[str], mode: str = "asof", strict: bool = False) -> np.ndarray:
+        """Matched price for every query (NaN where there is no bar or no price)"""
+        idx = self.indices(queries, mode, strict)
+        out = np.full(len(idx), np.nan)
+        found = idx >= 0
+        out[found] = self.prices[idx[found]]
+        return out
+
+    def price_at(self, query: str, mode: str = "asof", strict: bool = False) -> Optional[float]:
+        """Single-query convenience: matched price, or None"""
+        price = self.prices_at([query], mode, strict)[0]
+        return None if np.isnan(price) else float(price)
+
+
+def cached_series(source: Dict[str, Any], fields: Sequence[str] = CLOSE_FIELDS,
+                  price_file: bool = True) -> Optional[AsOfSeries]:
+    """
+    AsOfSeries for a loaded price file (price_file=True) or bars dict, built once per object.
+
+    Callers that look up the same loaded data repeatedly pay the sort/parse only once.
+    """
+    fields = tuple(fields)
+    if price_file:
+        return _memoized(source, ("file", fields), lambda: AsOfSeries.from_price_file(source, fields))
+    return _memoized(source, ("bars", fields), lambda: AsOfSeries.from_bars(source, fields))
+
+
+def asof_matrix(series_by_symbol: Dict[str, Optional[AsOfSeries]], symbols: Sequence[str],
+                queries: Sequence[str], mode: str = "asof") -> np.ndarray:
+    """
+    (query x symbol) price matrix; NaN where a symbol has no series or no matching bar.
+
+    Args:
+        series_by_symbol: AsOfSeries per symbol (missing/None symbols give NaN columns)
+        symbols: Column order
+        queries: Row timestamps
+        mode: "asof", "same_day" or "exact"
+    """
+    prices = np.full((len(queries), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        series = series_by_symbol.get(symbol)
+        if series is not None and len(series):
+            prices[:, j] = series.prices_at(queries, mode)
+    return prices
+
+
+def sorted_timestamps(timestamps: Iterable[str], intraday_only: bool = False) -> np.ndarray:
+    """
+    Normalized, sorted array of a timestamp collection (memoized per collection object).
+
+    Args:
+        timestamps: Collection of 'YYYY-MM-DD' / 'YYYY-MM-DD HH:MM:SS' strings
+        intraday_only: Keep only timestamps with a time part
+    """
+    return _memoized(
+        timestamps, ("sorted", intraday_only),
+        lambda: np.array(
+            sorted(normalize_timestamp(ts) for ts in timestamps if not intraday_only or " " in ts), dtype=str
+        ),
+    )
+
+
+def previous_timestamp(timestamps: np.ndarray, query: str) -> Optional[str]:
+    """Latest timestamp strictly before query in a sorted array, or None"""
+    idx = int(np.searchsorted(timestamps, normalize_timestamp(query), side="left")) - 1
+    return str(timestamps[idx]) if idx >= 0 else None
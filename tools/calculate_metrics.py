@@ -15,6 +15,12 @@ import pandas as pd
 from datetime import datetime
 from pathlib import Path
 import argparse
+import sys
+
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from tools.asof_join import CRYPTO_FIELDS, asof_matrix, cached_series
 
 
 def load_position_data(position_file):
@@ -37,6 +43,9 @@ def get_price_at_date(price_data, symbol, date_str, is_crypto=False):
     """
     Get the price for a symbol at a specific date/datetime.
 
+    Uses the last bar at or before date_str: intraday series are matched on the full
+    timestamp, daily series on the date part (see tools/asof_join.py).
+
     Args:
         price_data: Dict of symbol -> price data
         symbol: Stock/crypto symbol
@@ -49,53 +58,14 @@ def get_price_at_date(price_data, symbol, date_str, is_crypto=False):
     if symbol not in price_data:
         return None
 
-    symbol_data = price_data[symbol]
-
-    # Determine the time series key (could be hourly, daily, etc.)
-    time_series_key = None
-    for key in ['Time Series (60min)', 'Time Series (Daily)', 'Time Series (Hourly)']:
-        if key in symbol_data:
-            time_series_key = key
-            break
-
-    if not time_series_key:
+    series = cached_series(price_data[symbol], _price_fields(is_crypto))
+    if series is None:
         return None
+    return series.price_at(date_str)
 
-    time_series = symbol_data[time_series_key]
-
-    # For hourly data, try exact timestamp match first
-    if 'min' in time_series_key or 'Hourly' in time_series_key:
-        if date_str in time_series:
-            price_str = time_series[date_str].get('4. sell price' if is_crypto else '4. close',
-                                                    time_series[date_str].get('4. close'))
-            return float(price_str) if price_str else None
-
-        # Try to find the closest previous timestamp
-        available_dates = sorted([d for d in time_series.keys() if d <= date_str], reverse=True)
-        if available_dates:
-            closest_date = available_dates[0]
-            price_str = time_series[closest_date].get('4. sell price' if is_crypto else '4. close',
-                                                        time_series[closest_date].get('4. close'))
-            return float(price_str) if price_str else None
-    else:
-        # For daily data, extract just the date part
-        date_only = date_str.split(' ')[0]
-
-        # Try exact match first
-        if date_only in time_series:
-            price_str = time_series[date_only].get('4. sell price' if is_crypto else '4. close',
-                                                     time_series[date_only].get('4. close'))
-            return float(price_str) if price_str else None
 
-        # Try to find the closest previous date
-        available_dates = sorted([d for d in time_series.keys() if d <= date_only], reverse=True)
-        if available_dates:
-            closest_date = available_dates[0]
-            price_str = time_series[closest_date].get('4. sell price' if is_crypto else '4. close',
-                                                        time_series[closest_date].get('4. close'))
-            return float(price_str) if price_str else None
-
-    return None
+def _price_fields(is_crypto):
+    return CRYPTO_FIELDS if is_crypto else ('4. close',)
 
 
 def load_all_price_files(data_dir, is_crypto=False, is_astock=False):
@@ -143,46 +113,68 @@ def load_all_price_files(data_dir, is_crypto=False, is_astock=False):
     return price_data
 
 
-def calculate_portfolio_values(positions, price_data, is_crypto=False, verbose=True):
+def build_share_matrix(positions):
     """
-    Calculate portfolio value at each timestamp.
+    Align position records into a (time x symbol) share matrix.
 
     Returns:
-        DataFrame with columns: date, cash, stock_value, total_value
+        (dates, symbols, cash vector, shares matrix)
     """
-    portfolio_values = []
-    missing_prices = set()
-
-    for entry in positions:
-        date = entry['date']
-        pos = entry['positions']
+    dates = [entry['date'] for entry in positions]
+    symbols = list(dict.fromkeys(
+        symbol for entry in positions for symbol in entry['positions'] if symbol != 'CASH'
+    ))
+    column = {symbol: j for j, symbol in enumerate(symbols)}
+    cash = np.zeros(len(positions))
+    shares = np.zeros((len(positions), len(symbols)))
+    for i, entry in enumerate(positions):
+        for symbol, amount in entry['positions'].items():
+            if symbol == 'CASH':
+                cash[i] = amount
+            elif amount:
+                shares[i, column[symbol]] = amount
+    return dates, symbols, cash, shares
+
+
+def build_price_matrix(price_data, symbols, dates, is_crypto=False):
+    """
+    As-of price matrix matching build_share_matrix: entry (t, s) is the last price of
+    symbol s at or before dates[t] (NaN if there is none), as in get_price_at_date.
+    """
+    fields = _price_fields(is_crypto)
+    series = {symbol: cached_series(price_data[symbol], fields) for symbol in symbols if symbol in price_data}
+    return asof_matrix(series, symbols, dates)
 
-        cash = pos.get('CASH', 0)
-        stock_value = 0
 
-        # Calculate value of all stock holdings
-        for symbol, amount in pos.items():
-            if symbol == 'CASH' or amount == 0:
-                continue
+def calculate_portfolio_values(positions, price_data, is_crypto=False, verbose=True):
+    """
+    Calculate portfolio value at each timestamp.
 
-            price = get_price_at_date(price_data, symbol, date, is_crypto)
-            if price is not None:
-                stock_value += amount * price
-            else:
-                if verbose and (symbol, date) not in missing_prices:
-                    print(f"Warning: No price found for {symbol} on {date}")
-                    missing_prices.add((symbol, date))
+    Holdings are aligned into a (time x symbol) share matrix and valued against an as-of
+    price matrix in one vectorized pass; held symbols without a price count as 0.
 
-        total_value = cash + stock_value
+    Returns:
+        DataFrame with columns: date, cash, stock_value, total_value
+    """
+    dates, symbols, cash, shares = build_share_matrix(positions)
+    prices = build_price_matrix(price_data, symbols, dates, is_crypto)
 
-        portfolio_values.append({
-            'date': date,
-            'cash': cash,
-            'stock_value': stock_value,
-            'total_value': total_value
-        })
+    held = shares != 0
+    missing = held & np.isnan(prices)
+    stock_value = np.einsum('ts,ts->t', shares, np.where(held & ~missing, prices, 0.0))
 
-    df = pd.DataFrame(portfolio_values)
+    missing_prices = set()
+    for i, j in np.argwhere(missing):
+        if verbose and (symbols[j], dates[i]) not in missing_prices:
+            print(f"Warning: No price found for {symbols[j]} on {dates[i]}")
+        missing_prices.add((symbols[j], dates[i]))
+
+    df = pd.DataFrame({
+        'date': dates,
+        'cash': cash,
+        'stock_value': stock_value,
+        'total_value': cash + stock_value,
+    })
     df['date'] = pd.to_datetime(df['date'])
 
     if not verbose and missing_prices:
@@ -0,0 +1,132 @@
+"""
+Prefetch of the next trading date's market context.
+
+The system prompt of every session needs the previous bar's buy/sell prices and the
+current bar's buy prices, which means scanning merged.jsonl several times. These values
+only depend on the price files, so while the LLM works on date N a background thread
+can already load them for date N+1.
+
+Isolation rules:
+    - Contexts are keyed by (date, market, symbols) and handed out only for an exact match,
+      so a date-N session can never receive N+1 data.
+    - Positions are NOT prefetched: they depend on the trades made during date N and are
+      always read when the session starts.
+
+Set PREFETCH_NEXT_DATE=false to disable prefetching.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.price_tools import (all_nasdaq_100_symbols, all_sse_50_symbols,
+                               get_open_prices,
+                               get_yesterday_open_and_close_price)
+
+ContextKey = Tuple[str, str, Tuple[str, ...]]
+
+
+def _resolve_symbols(market: str, symbols: Optional[List[str]]) -> List[str]:
+    """Apply the same default symbol lists as the prompt builders"""
+    if symbols is not None:
+        return list(symbols)
+    return list(all_sse_50_symbols if market == "cn" else all_nasdaq_100_symbols)
+
+
+def _context_key(today_date: str, market: str, symbols: Optional[List[str]]) -> ContextKey:
+    return (today_date, market, tuple(_resolve_symbols(market, symbols)))
+
+
+def load_market_context(today_date: str, symbols: Optional[List[str]] = None, market: str = "us") -> Dict[str, Any]:
+    """
+    Load the price context used by the system prompt for one trading date/time.
+
+    Args:
+        today_date: Trading date (YYYY-MM-DD) or timestamp (YYYY-MM-DD HH:MM:SS)
+        symbols: Symbols to load; None uses the market's default list
+        market: "us", "cn" or "crypto"
+
+    Returns:
+        Dict with the key fields (date, market, symbols) and the three price dicts
+    """
+    symbols = _resolve_symbols(market, symbols)
+    yesterday_buy_prices, yesterday_sell_prices = get_yesterday_open_and_close_price(
+        today_date, symbols, market=market
+    )
+    today_buy_price = get_open_prices(today_date, symbols, market=market)
+    return {
+        "date": today_date,
+        "market": market,
+        "symbols": tuple(symbols),
+        "yesterday_buy_prices": yesterday_buy_prices,
+        "yesterday_sell_prices": yesterday_sell_prices,
+        "today_buy_price": today_buy_price,
+    }
+
+
+def context_matches(
+    market_context: Optional[Dict[str, Any]], today_date: str, market: str, symbols: Optional[List[str]]
+) -> bool:
+    """Check that a (pre)loaded context belongs to exactly this date, market and symbol list"""
+    if not market_context:
+        return False
+    key = _context_key(today_date, market, symbols)
+    return (market_context.get("date"), market_context.get("market"), tuple(market_context.get("symbols", ()))) == key
+
+
+class MarketContextPrefetcher:
+    """Loads market context for upcoming dates in a single background thread"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Initialize MarketContextPrefetcher
+
+        Args:
+            enabled: Whether to prefetch; defaults to PREFETCH_NEXT_DATE (true)
+        """
+        if enabled is None:
+            enabled = os.getenv("PREFETCH_NEXT_DATE", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[ContextKey, Future] = {}
+
+    def schedule(self, today_date: str, symbols: Optional[List[str]] = None, market: str = "us") -> None:
+        """Start loading the context for a future date (no-op if disabled or already scheduled)"""
+        if not self.enabled:
+            return
+        key = _context_key(today_date, market, symbols)
+        if key in self._pending:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context-prefetch")
+        self._pending[key] = self._executor.submit(load_market_context, today_date, symbols, market)
+
+    def take(self, today_date: str, symbols: Optional[List[str]] = None, market: str = "us") -> Optional[Dict[str, Any]]:
+        """
+        Hand out the prefetched context for exactly this date.
+
+        Waits for an in-flight load (it is already doing the work the session needs) and
+        drops contexts scheduled for any other date. Returns None on a miss or if the
+        background load failed, so callers fall back to loading synchronously.
+        """
+        key = _context_key(today_date, market, symbols)
+        future = self._pending.pop(key, None)
+        for stale_key in [k for k in self._pending if k[0] == today_date or k[0] < today_date]:
+            self._pending.pop(stale_key).cancel()
+        if future is None:
+            return None
+        try:
+            context = future.result()
+        except Exception as e:
+            print(f"⚠️ Prefetched context for {today_date} failed, loading synchronously: {e}")
+            return None
+        return context if context_matches(context, today_date, market, symbols) else None
+
+    def shutdown(self) -> None:
+        """Drop pending loads and stop the worker thread"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,72 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling of value series.
+
+Hourly asset histories hold far more points than a chart is wide. LTTB keeps the first and
+last point and, from each of threshold - 2 equal buckets in between, the point forming the
+largest triangle with the previously kept point and the average of the next bucket, which
+preserves peaks and troughs that plain decimation drops.
+
+    lttb_indices(y, threshold, x=None)   indices of the kept points
+    resolution_levels(y, levels, x=None) {"<points>": indices} per target point count
+"""
+
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+def lttb_indices(y: Sequence[float], threshold: int, x: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps.
+
+    Args:
+        y: Values (NaN/None points are never preferred over valid ones)
+        threshold: Target number of points; series of this length or shorter are kept whole
+        x: Point positions (e.g. epoch seconds); defaults to evenly spaced (the point index)
+
+    Returns:
+        Sorted int array of at most threshold indices, always including the first and last
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bucket boundaries over the inner points 1 .. n-2
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = np.nanmean(y[next_start:next_end]) if np.any(~np.isnan(y[next_start:next_end])) else y[a]
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        area = np.where(np.isnan(area), -1.0, area)
+        selected[i + 1] = start + int(np.argmax(area))
+        # An all-NaN bucket still yields a point, but never becomes the next anchor
+        if not np.isnan(y[selected[i + 1]]):
+            a = selected[i + 1]
+    return selected
+
+
+def resolution_levels(y: Sequence[float], levels: Iterable[int],
+                      x: Optional[Sequence[float]] = None) -> Dict[str, list]:
+    """
+    LTTB indices per target point count, for the levels the series is longer than.
+
+    Returns:
+        {"<points>": [indices]}; empty if the series is short enough to be drawn whole
+    """
+    y = np.asarray([np.nan if v is None else v for v in y], dtype=float)
+    return {
+        str(level): lttb_indices(y, level, x).tolist()
+        for level in sorted(set(int(level) for level in levels))
+        if 3 <= level < len(y)
+    }
@@ -0,0 +1,201 @@
+"""
+Buffered session log writer.
+
+Trading sessions emit a log entry after every agent step. Opening log.jsonl, writing a
+line and closing it again for each entry blocks the event loop on file I/O, so sessions
+write through a SessionLogSink instead: entries are serialized into an in-memory buffer
+and a background task flushes them through a single open handle.
+
+Configuration (environment variables):
+    LOG_COMPRESSION: "" (plain log.jsonl, default), "gzip" (log.jsonl.gz) or
+                     "zstd" (log.jsonl.zst, requires the optional `zstandard` package).
+                     The web frontend only reads plain log.jsonl files.
+    LOG_FLUSH_INTERVAL: Seconds between background flushes (default 1.0)
+"""
+
+import asyncio
+import atexit
+import gzip
+import io
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+# Flush immediately once this many entries are pending, even before the interval elapses
+MAX_BUFFERED_ENTRIES = 256
+
+_OPEN_SINKS: Set["SessionLogSink"] = set()
+
+
+class SessionLogSink:
+    """Append-only JSONL writer with an in-memory buffer and one open handle per session"""
+
+    def __init__(self, log_file: str, compression: Optional[str] = None, flush_interval: Optional[float] = None):
+        """
+        Initialize SessionLogSink
+
+        Args:
+            log_file: Plain log path (e.g. .../log/2025-10-01/log.jsonl); a suffix is added
+                      when compression is enabled
+            compression: None/"" for plain text, "gzip" or "zstd"; defaults to LOG_COMPRESSION
+            flush_interval: Seconds between background flushes; defaults to LOG_FLUSH_INTERVAL
+        """
+        if compression is None:
+            compression = os.getenv("LOG_COMPRESSION", "")
+        compression = (compression or "").strip().lower()
+        if compression == "zstd" and zstandard is None:
+            print("⚠️ LOG_COMPRESSION=zstd requested but zstandard is not installed, falling back to gzip")
+            compression = "gzip"
+        if compression not in ("", "gzip", "zstd"):
+            raise ValueError(f"Unsupported log compression: {compression}")
+
+        self.log_file = log_file
+        self.compression = compression
+        self.path = log_file + {"": "", "gzip": ".gz", "zstd": ".zst"}[compression]
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+
+        self._buffer: List[str] = []
+        self._buffer_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._handle = None
+        self._raw_handle = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.closed = False
+
+        _OPEN_SINKS.add(self)
+
+    def _open(self) -> None:
+        """Open the underlying handle on first flush"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.compression == "gzip":
+            # Appending starts a new gzip member; multi-member files decompress as one stream
+            self._handle = gzip.open(self.path, "at", encoding="utf-8")
+        elif self.compression == "zstd":
+            self._raw_handle = open(self.path, "ab")
+            writer = zstandard.ZstdCompressor().stream_writer(self._raw_handle, closefd=False)
+            self._handle = io.TextIOWrapper(writer, encoding="utf-8")
+        else:
+            self._handle = open(self.path, "a", encoding="utf-8")
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Queue one log entry; never blocks on disk I/O"""
+        if self.closed:
+            raise ValueError(f"Log sink for {self.path} is closed")
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._buffer_lock:
+            self._buffer.append(line)
+            pending = len(self._buffer)
+
+        if self._task is None:
+            self._start_background_flush()
+        if self._task is None:
+            # No running event loop: behave like a plain buffered writer
+            if pending >= MAX_BUFFERED_ENTRIES:
+                self.flush()
+        elif pending >= MAX_BUFFERED_ENTRIES and self._wakeup is not None:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all buffered entries to disk"""
+        with self._buffer_lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        with self._io_lock:
+            if self._handle is None:
+                self._open()
+            self._handle.write("".join(lines))
+            self._handle.flush()
+
+    def _start_background_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await asyncio.to_thread(self.flush)
+
+    def close(self) -> None:
+        """Flush remaining entries and close the handle (safe to call more than once)"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            self.flush()
+        finally:
+            with self._io_lock:
+                if self._handle is not None:
+                    self._handle.close()
+                    self._handle = None
+                if self._raw_handle is not None:
+                    self._raw_handle.close()
+                    self._raw_handle = None
+            _OPEN_SINKS.discard(self)
+
+    async def aclose(self) -> None:
+        """Close from async code without blocking the event loop on the final flush"""
+        if self.closed:
+            return
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.close)
+
+    def __enter__(self) -> "SessionLogSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "SessionLogSink":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def read_log_entries(path: str) -> List[Dict[str, Any]]:
+    """Read entries back from a plain, gzip or zstd session log"""
+    if path.endswith(".gz"):
+        f = gzip.open(path, "rt", encoding="utf-8")
+    elif path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst logs")
+        f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True), encoding="utf-8")
+    else:
+        f = open(path, "r", encoding="utf-8")
+    with f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@atexit.register
+def _flush_open_sinks() -> None:
+    """Make sure buffered entries reach disk if the process exits mid-session"""
+    for sink in list(_OPEN_SINKS):
+        try:
+            sink.close()
+        except Exception as e:
+            print(f"⚠️ Failed to flush session log {sink.path}: {e}")
@@ -0,0 +1,200 @@
+"""
+Process-level pool of MCP client sessions.
+
+MultiServerMCPClient.get_tools() returns tools that open a brand-new MCP session
+(HTTP connect + initialize handshake) for every single tool call, and every agent
+re-fetches the tool schemas on initialize. The pool instead keeps one long-lived
+session per server connection (URL/transport/headers) and hands out LangChain tools
+bound to it, so all agents in the process share keep-alive connections and schemas.
+
+Tool schemas are cached per server; after MCP_TOOL_SCHEMA_TTL seconds (default 300)
+the next get_tools() lists the server's tools again and only rebuilds the LangChain
+tools when the schema fingerprint changed. A session that fails at the transport
+level is reconnected; read-only requests (list_tools) are then retried once, while a
+failed call_tool is re-raised, since the server may already have executed it (a
+trade must not run twice).
+
+Set MCP_CLIENT_POOL=false to fall back to MultiServerMCPClient's per-call sessions.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp.shared.exceptions import McpError
+
+
+def is_pool_enabled() -> bool:
+    return os.getenv("MCP_CLIENT_POOL", "true").lower() not in ("0", "false", "no")
+
+
+def _connection_key(connection: Dict[str, Any]) -> str:
+    return json.dumps(connection, sort_keys=True, default=str)
+
+
+def _schema_fingerprint(tools: List[Any]) -> str:
+    """Stable hash over tool names, descriptions and input schemas"""
+    payload = sorted(
+        (tool.name, tool.description or "", json.dumps(tool.inputSchema, sort_keys=True)) for tool in tools
+    )
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+class PooledServer:
+    """
+    One persistent MCP session for a server connection.
+
+    The session is opened and closed inside a dedicated background task (the MCP
+    transports use anyio cancel scopes that must be exited by the task that entered
+    them). The object itself duck-types the ClientSession methods used by
+    langchain-mcp-adapters, so tools built from it survive reconnects.
+    """
+
+    def __init__(self, name: str, connection: Dict[str, Any]):
+        self.name = name
+        self.connection = connection
+        self.session = None
+        self.tools: Optional[List[BaseTool]] = None
+        self.fingerprint: Optional[str] = None
+        self.checked_at = 0.0
+        self._runner: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._error: Optional[BaseException] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def _run_session(self) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def connect(self) -> None:
+        """Open the session if it is not open yet"""
+        async with self._connect_lock:
+            if self.session is not None and self._runner is not None and not self._runner.done():
+                return
+            self._ready = asyncio.Event()
+            self._closing = asyncio.Event()
+            self._error = None
+            self._runner = asyncio.create_task(self._run_session())
+            await self._ready.wait()
+            if self.session is None:
+                raise ConnectionError(f"Could not connect to MCP server '{self.name}': {self._error}")
+
+    async def reconnect(self) -> None:
+        await self.close()
+        await self.connect()
+
+    async def close(self) -> None:
+        """Close the session and wait for its task to finish"""
+        if self._runner is None:
+            return
+        self._closing.set()
+        try:
+            await self._runner
+        except BaseException:
+            pass
+        self._runner = None
+        self.session = None
+
+    async def _with_session(self, method: str, *args: Any, retry: bool = False, **kwargs: Any) -> Any:
+        await self.connect()
+        try:
+            return await getattr(self.session, method)(*args, **kwargs)
+        except McpError:
+            raise
+        except Exception as e:
+            # Transport failure (server restarted, connection dropped): continue on a fresh session
+            print(f"⚠️ MCP session to '{self.name}' failed ({e}), reconnecting...")
+            await self.reconnect()
+            if not retry:
+                raise ConnectionError(
+                    f"MCP {method} on '{self.name}' failed ({e}); not retried, it may already have run"
+                ) from e
+            return await getattr(self.session, method)(*args, **kwargs)
+
+    async def list_tools(self, *args: Any, **kwargs: Any) -> Any:
+        return await self._with_session("list_tools", *args, retry=True, **kwargs)
+
+    async def call_tool(self, *args: Any, **kwargs: Any) -> Any:
+        # Not retried: the request may have reached the server (e.g. a buy) before the connection dropped
+        return await self._with_session("call_tool", *args, **kwargs)
+
+    async def get_tools(self, ttl: float) -> List[BaseTool]:
+        """LangChain tools for this server, re-validated against the server schema after ttl seconds"""
+        now = time.monotonic()
+        if self.tools is not None and now - self.checked_at < ttl:
+            return self.tools
+
+        listed = await self.list_tools()
+        fingerprint = _schema_fingerprint(listed.tools)
+        if self.tools is None or fingerprint != self.fingerprint:
+            if self.tools is not None:
+                print(f"🔄 Tool schemas changed on MCP server '{self.name}', reloading")
+            self.tools = await load_mcp_tools(self)
+            self.fingerprint = fingerprint
+        self.checked_at = now
+        return self.tools
+
+
+class MCPClientPool:
+    """Shares PooledServer sessions between all agents of one event loop"""
+
+    def __init__(self, schema_ttl: Optional[float] = None):
+        self.schema_ttl = schema_ttl if schema_ttl is not None else float(os.getenv("MCP_TOOL_SCHEMA_TTL", "300"))
+        self._servers: Dict[str, PooledServer] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def server(self, name: str, connection: Dict[str, Any]) -> PooledServer:
+        key = _connection_key(connection)
+        if key not in self._servers:
+            self._servers[key] = PooledServer(name, connection)
+        return self._servers[key]
+
+    async def get_tools(self, mcp_config: Dict[str, Dict[str, Any]]) -> List[BaseTool]:
+        """
+        Get tools for every server in an MCP config, reusing pooled sessions.
+
+        Args:
+            mcp_config: MultiServerMCPClient-style {name: connection} mapping
+
+        Returns:
+            All tools, in config order
+        """
+        servers = [self.server(name, connection) for name, connection in mcp_config.items()]
+        tool_lists = await asyncio.gather(*(server.get_tools(self.schema_ttl) for server in servers))
+        return [tool for tools in tool_lists for tool in tools]
+
+    async def close(self) -> None:
+        """Close all pooled sessions"""
+        for server in self._servers.values():
+            await server.close()
+        self._servers.clear()
+
+
+_POOLS: Dict[int, MCPClientPool] = {}
+
+
+def get_mcp_client_pool() -> MCPClientPool:
+    """Process-level pool for the running event loop (sessions cannot cross event loops)"""
+    loop = asyncio.get_running_loop()
+    pool = _POOLS.get(id(loop))
+    if pool is None or pool._loop is not loop:
+        pool = MCPClientPool()
+        pool._loop = loop
+        _POOLS[id(loop)] = pool
+    return pool
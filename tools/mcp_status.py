@@ -0,0 +1,125 @@
+"""
+Shared MCP service status file.
+
+agent_tools/mcp_supervisor.py probes every MCP service with a real list_tools call and
+publishes the result to a JSON status file (MCP_STATUS_FILE, default
+data/.mcp_status.json). Agents wait on that file before connecting, so a cold start
+waits exactly until the services are ready instead of failing in initialize().
+
+Layout:
+    {
+        "updated_at": <unix time>,
+        "services": {
+            "<service id>": {
+                "name": "TradeTools", "state": "ready" | "starting" | "degraded" | "down",
+                "urls": ["http://localhost:8002/mcp"], "pid": 1234, "p50_ms": 3.1,
+                "p99_ms": 8.0, "restarts": 0, "last_error": null, "updated_at": <unix time>
+            }
+        }
+    }
+
+If there is no status file, or it has not been refreshed for MCP_STATUS_STALE seconds
+(no supervisor running), agents do not wait at all.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+READY_STATES = ("ready", "degraded")
+
+
+def get_status_path() -> Path:
+    """Location of the status file; relative paths resolve from the project root"""
+    path = Path(os.getenv("MCP_STATUS_FILE", "data/.mcp_status.json"))
+    if not path.is_absolute():
+        path = Path(__file__).resolve().parents[1] / path
+    return path
+
+
+def write_status(status: Dict[str, Any], path: Optional[Path] = None) -> None:
+    """Atomically replace the status file"""
+    path = path or get_status_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_status(path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Read the status file, or None if it is missing or unreadable"""
+    path = path or get_status_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return status if isinstance(status, dict) else None
+
+
+def _normalize_url(url: str) -> str:
+    return url.rstrip("/").replace("://127.0.0.1", "://localhost")
+
+
+def pending_services(status: Dict[str, Any], urls: List[str]) -> List[str]:
+    """
+    URLs that a supervised service serves but that are not ready yet.
+
+    URLs not known to the supervisor (e.g. external servers) are never pending.
+    """
+    by_url = {}
+    for service in status.get("services", {}).values():
+        for url in service.get("urls", []):
+            by_url[_normalize_url(url)] = service
+    pending = []
+    for url in urls:
+        service = by_url.get(_normalize_url(url))
+        if service is not None and service.get("state") not in READY_STATES:
+            pending.append(url)
+    return pending
+
+
+async def wait_for_mcp_services(
+    mcp_config: Dict[str, Dict[str, Any]],
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.2,
+) -> bool:
+    """
+    Wait until the supervisor reports every HTTP service of an MCP config as ready.
+
+    Args:
+        mcp_config: MultiServerMCPClient-style {name: connection} mapping
+        timeout: Seconds to wait at most; defaults to MCP_READY_TIMEOUT (60)
+        poll_interval: Seconds between status file reads
+
+    Returns:
+        True if the services are ready (or nothing is supervised), False on timeout
+    """
+    if timeout is None:
+        timeout = float(os.getenv("MCP_READY_TIMEOUT", "60"))
+    stale_after = float(os.getenv("MCP_STATUS_STALE", "30"))
+    urls = [entry["url"] for entry in mcp_config.values() if entry.get("url")]
+    if not urls:
+        return True
+
+    deadline = time.monotonic() + timeout
+    announced = False
+    while True:
+        status = read_status()
+        if status is None or time.time() - status.get("updated_at", 0) > stale_after:
+            # No (live) supervisor: nothing to wait for
+            return True
+        pending = pending_services(status, urls)
+        if not pending:
+            return True
+        if time.monotonic() >= deadline:
+            print(f"⚠️ MCP services still not ready after {timeout:.0f}s: {', '.join(pending)}")
+            return False
+        if not announced:
+            print(f"⏳ Waiting for MCP services: {', '.join(pending)}")
+            announced = True
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Incremental performance metrics for position ledgers.
+
+calculate_metrics.py values and scores a whole position.jsonl on every run. MetricsState
+keeps the running aggregates those metrics are made of instead, so appending a position
+record costs O(1):
+
+    - Welford mean/M2 of the period returns (volatility, Sharpe, Sortino numerator)
+    - Welford mean/M2 of the negative returns (Sortino downside deviation)
+    - cumulative growth, its running max and the worst drawdown (MDD)
+    - win/loss counts and sums, trade count, first/last value and date
+
+The state is stored as metrics_state.json next to the ledger, together with the byte
+offset consumed so far; update_from_ledger values only the records appended since (and
+starts over if the ledger was rewritten). metrics() returns the same dict as
+calculate_metrics.calculate_metrics.
+
+Live leaderboard over all signatures of a run:
+
+    python tools/metrics_state.py data/agent_data --data-dir data [--is-hourly] [--watch 60]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from tools.calculate_metrics import calculate_portfolio_values, detect_market_type, load_all_price_files
+
+STATE_FILENAME = 'metrics_state.json'
+STATE_VERSION = 1
+
+
+class MetricsState:
+    """Running aggregates of one portfolio value series"""
+
+    _FIELDS = (
+        'count', 'first_value', 'last_value', 'first_date', 'last_date',
+        'n_returns', 'mean', 'm2', 'n_down', 'down_mean', 'down_m2',
+        'growth', 'peak', 'mdd', 'wins', 'win_sum', 'loss_sum', 'num_trades',
+        'offset', 'ledger_head',
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.first_value = None
+        self.last_value = None
+        self.first_date = None
+        self.last_date = None
+        self.n_returns = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.n_down = 0
+        self.down_mean = 0.0
+        self.down_m2 = 0.0
+        self.growth = 1.0
+        self.peak = None
+        self.mdd = 0.0
+        self.wins = 0
+        self.win_sum = 0.0
+        self.loss_sum = 0.0
+        self.num_trades = 0
+        # Ledger bookkeeping: bytes consumed and a hash of the first record
+        self.offset = 0
+        self.ledger_head = None
+
+    def update(self, date, total_value):
+        """
+        Add the next portfolio value.
+
+        Args:
+            date: Record date ('YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS')
+            total_value: Portfolio value at that date
+        """
+        total_value = float(total_value)
+        self.count += 1
+        self.last_date = date
+        if self.first_value is None:
+            self.first_value = self.last_value = total_value
+            self.first_date = date
+            return
+
+        ret = (total_value - self.last_value) / self.last_value
+        if total_value != self.last_value:
+            self.num_trades += 1
+        self.last_value = total_value
+
+        self.n_returns += 1
+        delta = ret - self.mean
+        self.mean += delta / self.n_returns
+        self.m2 += delta * (ret - self.mean)
+
+        if ret < 0:
+            self.n_down += 1
+            delta = ret - self.down_mean
+            self.down_mean += delta / self.n_down
+            self.down_m2 += delta * (ret - self.down_mean)
+
+        if ret > 0:
+            self.wins += 1
+            self.win_sum += ret
+        else:
+            self.loss_sum += ret
+
+        # Drawdown of cumulative growth against its running max (the first return sets the peak)
+        self.growth *= 1 + ret
+        self.peak = self.growth if self.peak is None else max(self.peak, self.growth)
+        self.mdd = min(self.mdd, (self.growth - self.peak) / self.peak)
+
+    def metrics(self, periods_per_year=252, risk_free_rate=0.0):
+        """
+        Metrics dict in the format of calculate_metrics.calculate_metrics.
+
+        Returns:
+            Dict with metrics, or None with fewer than two records
+        """
+        if self.n_returns == 0:
+            return None
+
+        cr = (self.last_value - self.first_value) / self.first_value
+        years = self.n_returns / periods_per_year
+        annualized_return = (1 + cr) ** (1 / years) - 1 if years > 0 else 0
+
+        std = math.sqrt(self.m2 / self.n_returns)
+        vol = std * math.sqrt(periods_per_year) if self.n_returns > 1 else 0
+        excess_return = self.mean - (risk_free_rate / periods_per_year)
+        sharpe = excess_return / std * math.sqrt(periods_per_year) if std > 0 else 0
+
+        if self.n_down > 0:
+            downside_std = math.sqrt(self.down_m2 / self.n_down)
+            sortino = excess_return / downside_std * math.sqrt(periods_per_year) if downside_std > 0 else 0
+        else:
+            sortino = float('inf') if self.mean > 0 else 0
+
+        losses = self.n_returns - self.wins
+        return {
+            'CR': cr,
+            'Annualized Return': annualized_return,
+            'SR': sortino,
+            'Sharpe Ratio': sharpe,
+            'Vol': vol,
+            'MDD': self.mdd,
+            'Calmar Ratio': annualized_return / abs(self.mdd) if self.mdd != 0 else 0,
+            'Win Rate': self.wins / self.n_returns,
+            'Average Win': self.win_sum / self.wins if self.wins else 0,
+            'Average Loss': self.loss_sum / losses if losses else 0,
+            'Initial Value': self.first_value,
+            'Final Value': self.last_value,
+            'Total Positions': self.count,
+            'Number of Trades': self.num_trades,
+            'Date Range': f"{pd.Timestamp(self.first_date)} to {pd.Timestamp(self.last_date)}",
+        }
+
+    def to_dict(self):
+        return {'version': STATE_VERSION, **{name: getattr(self, name) for name in self._FIELDS}}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        if data.get('version') == STATE_VERSION:
+            for name in cls._FIELDS:
+                if name in data:
+                    setattr(state, name, data[name])
+        return state
+
+
+def state_path(position_file):
+    return Path(position_file).parent / STATE_FILENAME
+
+
+def load_state(position_file):
+    """Persisted state of a ledger, or a fresh state if there is none (or it is unreadable)"""
+    try:
+        with open(state_path(position_file), 'r') as f:
+            return MetricsState.from_dict(json.load(f))
+    except (OSError, ValueError):
+        return MetricsState()
+
+
+def save_state(position_file, state):
+    path = state_path(position_file)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def _head_hash(line):
+    return hashlib.sha256(line).hexdigest()
+
+
+def update_from_ledger(position_file, price_data, is_crypto=False, state=None, save=True):
+    """
+    Fold the records appended to a ledger since the last update into its metrics state.
+
+    Only complete lines after the stored offset are read and valued; a ledger that shrank
+    or whose first record changed is rescored from the start.
+
+    Args:
+        position_file: Path to position.jsonl
+        price_data: Dict of symbol -> price data (see calculate_metrics.load_all_price_files)
+        is_crypto: Whether prices are crypto ('sell price' field)
+        state: State to update; defaults to the persisted one
+        save: Persist the updated state next to the ledger
+
+    Returns:
+        Updated MetricsState
+    """
+    if state is None:
+        state = load_state(position_file)
+
+    with open(position_file, 'rb') as f:
+        head = f.readline()
+        if state.ledger_head != _head_hash(head) or os.fstat(f.fileno()).st_size < state.offset:
+            state = MetricsState()
+            state.ledger_head = _head_hash(head)
+        f.seek(state.offset)
+        chunk = f.read()
+
+    # Skip a trailing record that is still being written
+    complete = chunk[:chunk.rfind(b'\n') + 1]
+    positions = [json.loads(line) for line in complete.splitlines() if line.strip()]
+    if positions:
+        values = calculate_portfolio_values(positions, price_data, is_crypto, verbose=False)
+        for entry, total_value in zip(positions, values['total_value']):
+            state.update(entry['date'], total_value)
+    state.offset += len(complete)
+
+    if save:
+        save_state(position_file, state)
+    return state
+
+
+def leaderboard(agent_data_dir, price_data, is_crypto=False, periods_per_year=252, risk_free_rate=0.0):
+    """
+    Incrementally updated metrics of every signature under agent_data_dir, best CR first.
+
+    Returns:
+        List of (signature, metrics dict)
+    """
+    rows = []
+    for position_file in sorted(Path(agent_data_dir).glob('*/position/position.jsonl')):
+        state = update_from_ledger(position_file, price_data, is_crypto)
+        metrics = state.metrics(periods_per_year, risk_free_rate)
+        if metrics is not None:
+            rows.append((position_file.parent.parent.name, metrics))
+    rows.sort(key=lambda row: row[1]['CR'], reverse=True)
+    return rows
+
+
+def print_leaderboard(rows):
+    print(f"{'Signature':<32} {'CR':>9} {'SR':>8} {'Vol':>8} {'MDD':>9} {'Positions':>10}  Last")
+    print("-" * 100)
+    for signature, m in rows:
+        print(f"{signature:<32} {m['CR']*100:>8.2f}% {m['SR']:>8.2f} {m['Vol']*100:>7.2f}% "
+              f"{m['MDD']*100:>8.2f}% {m['Total Positions']:>10}  {m['Date Range'].split(' to ')[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live leaderboard from incrementally updated ledger metrics')
+    parser.add_argument('agent_data_dir', help='Directory with <signature>/position/position.jsonl ledgers')
+    parser.add_argument('--data-dir', default='data', help='Directory containing price data')
+    parser.add_argument('--is-crypto', action='store_true', help='Force crypto mode')
+    parser.add_argument('--is-astock', action='store_true', help='Force A-stock mode')
+    parser.add_argument('--is-hourly', action='store_true', help='Use hourly trading periods (affects annualization)')
+    parser.add_argument('--risk-free-rate', type=float, default=0.0, help='Annual risk-free rate (default: 0.0)')
+    parser.add_argument('--watch', type=float, default=0, help='Refresh every N seconds (default: print once)')
+    args = parser.parse_args()
+
+    is_crypto = args.is_crypto
+    if not is_crypto:
+        for position_file in Path(args.agent_data_dir).glob('*/position/position.jsonl'):
+            with open(position_file, 'r') as f:
+                first = f.readline()
+            is_crypto = bool(first.strip()) and detect_market_type([json.loads(first)]) == 'crypto'
+            break
+    is_astock = args.is_astock or 'astock' in str(args.agent_data_dir).lower()
+    price_data = load_all_price_files(args.data_dir, is_crypto, is_astock)
+
+    if args.is_hourly:
+        periods_per_year = 252 * 6.5
+    elif is_crypto:
+        periods_per_year = 365
+    else:
+        periods_per_year = 252
+
+    while True:
+        print_leaderboard(leaderboard(args.agent_data_dir, price_data, is_crypto, periods_per_year,
+                                      args.risk_free_rate))
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+        print()
+
+
+if __name__ == '__main__':
+    main()
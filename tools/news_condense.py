@@ -0,0 +1,180 @@
+"""
+Token-budgeted condensation of news tool output.
+
+get_market_news used to paste every article's summary into the conversation, and those
+tokens are paid again at every later step of the session. condense_articles turns the
+articles into a compact table instead:
+
+    - Articles are ranked by Alpha Vantage ticker relevance and sentiment strength (for
+      the requested tickers), with the incoming query-relevance order as a tiebreak.
+    - Each row holds an article id, date, source, ticker sentiment and title plus a
+      summary cut to NEWS_SUMMARY_CHARS characters (default 200).
+    - Rows are added until NEWS_TOKEN_BUDGET estimated tokens (default 1500) are used.
+
+Article ids ("YYYYMMDD-<hash>") can be expanded with the get_news_article tool, so the
+model only pays for the full text of articles it asks for. That call may reach another
+MCP worker, or follow a table served from the disk tool cache, so shown articles are kept
+where every process can find them: in the SQLite news store, or with NEWS_STORE_MODE=off
+in the tool cache (shared between processes only when TOOL_CACHE_DIR is set).
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+from tools.news_store import NewsStore, _split, normalize_time
+from tools.tool_cache import _MISS, TOOL_CACHE
+
+# Rough English average; only used to stay under the budget, not for billing
+CHARS_PER_TOKEN = 4
+# Tool cache namespace of shown articles when there is no news store
+_ARTICLE_CACHE_TOOL = "news_article"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def article_id(article: Dict[str, Any]) -> str:
+    """Short stable id: publish day plus a hash of the URL"""
+    day = normalize_time(article.get("time_published") or "00000000T000000")[:8]
+    digest = hashlib.sha1((article.get("url") or article.get("title") or "").encode("utf-8")).hexdigest()[:6]
+    return f"{day}-{digest}"
+
+
+def _ticker_signal(article: Dict[str, Any], tickers: List[str]) -> Dict[str, float]:
+    """Best (relevance, |sentiment|) among the requested tickers, or among all tickers if none requested"""
+    best = {"relevance": 0.0, "sentiment": 0.0}
+    for entry in article.get("ticker_sentiment") or []:
+        if tickers and entry.get("ticker") not in tickers:
+            continue
+        try:
+            relevance = float(entry.get("relevance_score", 0) or 0)
+            sentiment = float(entry.get("ticker_sentiment_score", 0) or 0)
+        except (TypeError, ValueError):
+            continue
+        if relevance > best["relevance"]:
+            best = {"relevance": relevance, "sentiment": sentiment}
+    return best
+
+
+def rank_for_tickers(articles: List[Dict[str, Any]], tickers: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Order articles by relevance * (1 + |sentiment|) for the requested tickers.
+
+    The incoming position (e.g. query relevance) adds a small decaying bonus, so it
+    decides between articles with similar ticker signals.
+    """
+    wanted = _split(tickers)
+
+    def score(item):
+        position, article = item
+        signal = _ticker_signal(article, wanted)
+        return signal["relevance"] * (1 + abs(signal["sentiment"])) + 0.5 / (1 + position)
+
+    return [article for _, article in sorted(enumerate(articles), key=score, reverse=True)]
+
+
+def remember_articles(articles: List[Dict[str, Any]], store: Optional[NewsStore] = None) -> None:
+    """Keep shown articles for get_news_article, in the news store or else the tool cache"""
+    if store is not None:
+        store.add_articles(articles)
+        return
+    for article in articles:
+        TOOL_CACHE.put(_ARTICLE_CACHE_TOOL, article_id(article), article)
+
+
+def find_article(article_id_: str, store: Optional[NewsStore] = None) -> Optional[Dict[str, Any]]:
+    """Look up an article by id in the news store, or in the tool cache when there is no store"""
+    if store is None:
+        article = TOOL_CACHE.get(_ARTICLE_CACHE_TOOL, article_id_)
+        return None if article is _MISS else article
+    day = article_id_.split("-", 1)[0]
+    if len(day) != 8 or not day.isdigit():
+        return None
+    for article in store.query(time_from=f"{day}T000000", time_to=f"{day}T235959", limit=10000):
+        if article_id(article) == article_id_:
+            return article
+    return None
+
+
+def _cell(text: Any) -> str:
+    return " ".join(str(text).split()).replace("|", "/")
+
+
+def condense_articles(
+    articles: List[Dict[str, Any]],
+    tickers: Optional[str] = None,
+    token_budget: Optional[int] = None,
+    summary_chars: Optional[int] = None,
+    store: Optional[NewsStore] = None,
+) -> str:
+    """
+    Render articles as a compact table within a token budget.
+
+    Args:
+        articles: Article dicts in Alpha Vantage feed format
+        tickers: Requested tickers (comma separated) used for ranking and the sentiment column
+        token_budget: Estimated token limit; defaults to NEWS_TOKEN_BUDGET (1500)
+        summary_chars: Summary length per row; defaults to NEWS_SUMMARY_CHARS (200)
+        store: News store that keeps the shown articles for get_news_article; without one
+            they go to the tool cache
+
+    Returns:
+        Table text, ending with a note on omitted articles and how to read one in full
+    """
+    if token_budget is None:
+        token_budget = int(os.getenv("NEWS_TOKEN_BUDGET", "1500"))
+    if summary_chars is None:
+        summary_chars = int(os.getenv("NEWS_SUMMARY_CHARS", "200"))
+    wanted = _split(tickers)
+    ranked = rank_for_tickers(articles, tickers)
+
+    lines = ["id | date | source | sentiment | title — summary"]
+    used = estimate_tokens(lines[0])
+    shown = []
+    for article in ranked:
+        summary = _cell(article.get("summary") or "")
+        if len(summary) > summary_chars:
+            summary = summary[:summary_chars].rstrip() + "…"
+        sentiments = [
+            f"{entry.get('ticker')} {entry.get('ticker_sentiment_label', '')}".strip()
+            for entry in article.get("ticker_sentiment") or []
+            if not wanted or entry.get("ticker") in wanted
+        ]
+        sentiment = ", ".join(sentiments[:3]) or _cell(article.get("overall_sentiment_label", "N/A"))
+        date = normalize_time(article.get("time_published") or "")[:8]
+        row = (f"{article_id(article)} | {date} | {_cell(article.get('source', 'N/A'))} | {_cell(sentiment)} | "
+               f"{_cell(article.get('title', 'N/A'))} — {summary}")
+        cost = estimate_tokens(row) + 1
+        if shown and used + cost > token_budget:
+            break
+        lines.append(row)
+        used += cost
+        shown.append(article)
+
+    remember_articles(shown, store)
+    omitted = len(ranked) - len(shown)
+    footer = f"{len(shown)} articles shown"
+    if omitted:
+        footer += f", {omitted} omitted (token budget)"
+    lines.append(footer + ". Call get_news_article(article_id) for the full article.")
+    return "\n".join(lines)
+
+
+def format_article(article: Dict[str, Any]) -> str:
+    """Full article detail for get_news_article"""
+    ticker_parts = [
+        f"{entry.get('ticker', 'N/A')}: relevance={entry.get('relevance_score', 'N/A')}, "
+        f"sentiment={entry.get('ticker_sentiment_score', 'N/A')} ({entry.get('ticker_sentiment_label', 'N/A')})"
+        for entry in article.get("ticker_sentiment") or []
+    ]
+    topics = ", ".join(entry.get("topic", "") for entry in article.get("topics") or [])
+    return f"""Title: {article.get('title', 'N/A')}
+URL: {article.get('url', 'N/A')}
+Time Published: {article.get('time_published', 'unknown')}
+Source: {article.get('source', 'N/A')}
+Overall Sentiment: {article.get('overall_sentiment_label', 'N/A')} (score: {article.get('overall_sentiment_score', 'N/A')})
+Ticker Sentiment: {'; '.join(ticker_parts) or 'N/A'}
+Topics: {topics or 'N/A'}
+Summary: {article.get('summary', 'N/A')}"""
@@ -0,0 +1,253 @@
+"""
+Local full-text search over the offline news store.
+
+NewsIndex keeps an in-memory BM25 inverted index over the title and summary of every
+article in the news store (tools/news_store.py), partitioned by publish day. A search
+only touches the day partitions inside the requested window and never scores or counts
+an article published after the cutoff (the simulated TODAY_DATE): document frequencies
+and the average document length are computed over the articles visible at the cutoff,
+so later news cannot leak into the ranking either.
+
+The index is built from the store on first use and picks up newly written articles
+incrementally before each search. NEWS_INDEX=false disables local search.
+
+    NEWS_INDEX_K1 / NEWS_INDEX_B    BM25 parameters (default 1.2 / 0.75)
+"""
+
+import bisect
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from tools.news_store import NewsStore, _split, get_news_store, normalize_time
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def is_index_enabled() -> bool:
+    return os.getenv("NEWS_INDEX", "true").lower() not in ("0", "false", "no")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def cutoff_from_today(today_date: Optional[str]) -> Optional[str]:
+    """TODAY_DATE ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS") as a YYYYMMDDTHHMMSS cutoff"""
+    if not today_date:
+        return None
+    fmt = "%Y-%m-%d %H:%M:%S" if " " in today_date else "%Y-%m-%d"
+    return datetime.strptime(today_date, fmt).strftime("%Y%m%dT%H%M%S")
+
+
+class _Document:
+    __slots__ = ("article", "time_published", "length", "tickers", "topics")
+
+    def __init__(self, article: Dict[str, Any], time_published: str, length: int,
+                 tickers: FrozenSet[str], topics: FrozenSet[str]):
+        self.article = article
+        self.time_published = time_published
+        self.length = length
+        self.tickers = tickers
+        self.topics = topics
+
+
+class _Partition:
+    """Postings of the articles published on one day"""
+
+    __slots__ = ("doc_ids", "total_length", "postings")
+
+    def __init__(self):
+        self.doc_ids: List[int] = []
+        self.total_length = 0
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+
+
+class NewsIndex:
+    """Day-partitioned BM25 index with point-in-time search"""
+
+    def __init__(self, store: Optional[NewsStore] = None, k1: Optional[float] = None, b: Optional[float] = None):
+        """
+        Initialize NewsIndex
+
+        Args:
+            store: News store to index; None for a standalone index filled with add_articles
+            k1: BM25 term frequency saturation; defaults to NEWS_INDEX_K1 (1.2)
+            b: BM25 length normalization; defaults to NEWS_INDEX_B (0.75)
+        """
+        self.store = store
+        self.k1 = float(os.getenv("NEWS_INDEX_K1", "1.2")) if k1 is None else k1
+        self.b = float(os.getenv("NEWS_INDEX_B", "0.75")) if b is None else b
+        self._docs: List[_Document] = []
+        self._urls: Dict[str, int] = {}
+        self._partitions: Dict[str, _Partition] = {}
+        self._days: List[str] = []
+        self._last_rowid = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add_articles(self, articles: List[Dict[str, Any]]) -> int:
+        """Index articles (already indexed URLs are skipped); returns the number added"""
+        with self._lock:
+            return sum(self._add(article) for article in articles)
+
+    def _add(self, article: Dict[str, Any]) -> bool:
+        url = article.get("url")
+        published = article.get("time_published")
+        if not url or not published or url in self._urls:
+            return False
+        tokens = tokenize(f"{article.get('title') or ''} {article.get('summary') or ''}")
+        published = normalize_time(published)
+        doc_id = len(self._docs)
+        self._docs.append(_Document(
+            article,
+            published,
+            len(tokens),
+            frozenset(e["ticker"] for e in article.get("ticker_sentiment") or [] if e.get("ticker")),
+            frozenset(e["topic"] for e in article.get("topics") or [] if e.get("topic")),
+        ))
+        self._urls[url] = doc_id
+
+        day = published[:8]
+        partition = self._partitions.get(day)
+        if partition is None:
+            partition = self._partitions[day] = _Partition()
+            bisect.insort(self._days, day)
+        partition.doc_ids.append(doc_id)
+        partition.total_length += len(tokens)
+        for term, tf in Counter(tokens).items():
+            partition.postings.setdefault(term, []).append((doc_id, tf))
+        return True
+
+    def refresh(self) -> int:
+        """Index articles written to the store since the last refresh"""
+        if self.store is None:
+            return 0
+        added = 0
+        with self._lock:
+            while True:
+                rows = self.store.articles_after(self._last_rowid)
+                if not rows:
+                    return added
+                for rowid, article in rows:
+                    added += self._add(article)
+                    self._last_rowid = rowid
+
+    def _visible_stats(self, terms: List[str], cutoff: Optional[str]) -> Tuple[int, float, Dict[str, int]]:
+        """Document count, average length and document frequencies over articles up to cutoff"""
+        last = len(self._days) if cutoff is None else bisect.bisect_right(self._days, cutoff[:8])
+        count, total_length = 0, 0
+        df = dict.fromkeys(terms, 0)
+        for day in self._days[:last]:
+            partition = self._partitions[day]
+            if cutoff is not None and day == cutoff[:8]:
+                # Boundary day: count only the articles published up to the cutoff
+                visible = {d for d in partition.doc_ids if self._docs[d].time_published <= cutoff}
+                count += len(visible)
+                total_length += sum(self._docs[d].length for d in visible)
+                for term in terms:
+                    df[term] += sum(1 for d, _ in partition.postings.get(term, ()) if d in visible)
+                continue
+            count += len(partition.doc_ids)
+            total_length += partition.total_length
+            for term in terms:
+                df[term] += len(partition.postings.get(term, ()))
+        return count, (total_length / count if total_length else 1.0), df
+
+    def search(
+        self,
+        query: str,
+        time_to: Optional[str] = None,
+        time_from: Optional[str] = None,
+        tickers: Optional[str] = None,
+        topics: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Articles ranked by BM25 relevance to query, published within [time_from, time_to].
+
+        Args:
+            query: Free-text query
+            time_to: Cutoff (YYYYMMDDTHHMM[SS]), inclusive; nothing later is searched or counted
+            time_from: Window start (YYYYMMDDTHHMM[SS]), inclusive
+            tickers: Comma separated tickers (all must be mentioned)
+            topics: Comma separated topics (all must be tagged)
+            limit: Maximum number of articles
+
+        Returns:
+            Article dicts in Alpha Vantage feed format, most relevant first (ties: latest first)
+        """
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        cutoff = normalize_time(time_to) if time_to else None
+        start = normalize_time(time_from) if time_from else None
+        required_tickers, required_topics = set(_split(tickers)), set(_split(topics))
+
+        with self._lock:
+            count, avg_length, df = self._visible_stats(terms, cutoff)
+            if not count:
+                return []
+            idf = {term: math.log(1 + (count - n + 0.5) / (n + 0.5)) for term, n in df.items() if n}
+
+            first = 0 if start is None else bisect.bisect_left(self._days, start[:8])
+            last = len(self._days) if cutoff is None else bisect.bisect_right(self._days, cutoff[:8])
+            scores: Dict[int, float] = {}
+            for day in self._days[first:last]:
+                partition = self._partitions[day]
+                for term, weight in idf.items():
+                    for doc_id, tf in partition.postings.get(term, ()):
+                        doc = self._docs[doc_id]
+                        if cutoff is not None and doc.time_published > cutoff:
+                            continue
+                        if start is not None and doc.time_published < start:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * doc.length / avg_length)
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weight * tf * (self.k1 + 1) / (tf + norm)
+
+            if required_tickers or required_topics:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if required_tickers <= self._docs[doc_id].tickers and required_topics <= self._docs[doc_id].topics
+                }
+            best = heapq.nlargest(
+                limit, scores.items(), key=lambda item: (item[1], self._docs[item[0]].time_published)
+            )
+            return [dict(self._docs[doc_id].article) for doc_id, _ in best]
+
+
+def rank_articles(query: str, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reorder articles by BM25 relevance to query; articles matching no query term keep their order at the end"""
+    index = NewsIndex()
+    index.add_articles(articles)
+    ranked = index.search(query, limit=len(articles))
+    matched = {article.get("url") for article in ranked}
+    return ranked + [article for article in articles if article.get("url") not in matched]
+
+
+_indexes: Dict[str, NewsIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_news_index() -> Optional[NewsIndex]:
+    """Process-wide index over the news store, or None when NEWS_INDEX or the store is off"""
+    if not is_index_enabled():
+        return None
+    store = get_news_store()
+    if store is None:
+        return None
+    with _indexes_lock:
+        if store.path not in _indexes:
+            _indexes[store.path] = NewsIndex(store)
+        return _indexes[store.path]
@@ -0,0 +1,364 @@
+"""
+Offline store for Alpha Vantage NEWS_SENTIMENT articles.
+
+AlphaVantageNewsTool used to call the live API on every agent query, which is slow,
+heavily rate limited and not reproducible for backtests. The store keeps articles in a
+SQLite database (NEWS_STORE_PATH, default data/news/news_sentiment.sqlite) with
+(ticker, time) and (topic, time) indexes, so time_from/time_to filtering is an index
+range scan.
+
+The store also records which (ticker | topic | "all") windows have been ingested
+completely. A query is served offline only when every requested ticker/topic is covered
+for the whole window; otherwise the tool falls back to the live API and writes the
+returned articles through.
+
+Bulk ingest for a ticker universe and date window:
+
+    python tools/news_store.py --tickers AAPL,MSFT --start 2025-10-01 --end 2025-11-01
+    python tools/news_store.py --universe nasdaq100 --start 2025-10-01 --end 2025-11-01
+
+Ingest requests go through the shared Alpha Vantage scheduler (tools/alphavantage_client.py)
+at bulk priority, so they are paced by the API quota and yield to agent queries.
+
+NEWS_STORE_MODE: "prefer" (default, store first, live API on misses), "offline" (store
+only, never call the API) or "off" (always live, as before).
+"""
+
+import argparse
+import functools
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Article timestamps are YYYYMMDDTHHMMSS; API windows may omit seconds (YYYYMMDDTHHMM)
+TIME_FORMAT = "%Y%m%dT%H%M%S"
+ALL_SCOPE = "all"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    time_published TEXT NOT NULL,
+    title TEXT,
+    summary TEXT,
+    source TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_time ON articles(time_published);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    ticker TEXT NOT NULL,
+    time_published TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (ticker, url)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tickers_time ON article_tickers(ticker, time_published);
+CREATE TABLE IF NOT EXISTS article_topics (
+    topic TEXT NOT NULL,
+    time_published TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (topic, url)
+);
+CREATE INDEX IF NOT EXISTS idx_article_topics_time ON article_topics(topic, time_published);
+CREATE TABLE IF NOT EXISTS coverage (
+    scope TEXT NOT NULL,
+    time_from TEXT NOT NULL,
+    time_to TEXT NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_coverage_scope ON coverage(scope, time_from);
+"""
+
+
+def get_news_store_mode() -> str:
+    return os.getenv("NEWS_STORE_MODE", "prefer").strip().lower()
+
+
+def normalize_time(value: str) -> str:
+    """Normalize an Alpha Vantage timestamp/window bound to YYYYMMDDTHHMMSS"""
+    value = value.strip()
+    if len(value) == 13:  # YYYYMMDDTHHMM
+        return value + "00"
+    return value
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def _scopes(tickers: Optional[str], topics: Optional[str]) -> List[str]:
+    scopes = [f"ticker:{t}" for t in _split(tickers)] + [f"topic:{t}" for t in _split(topics)]
+    return scopes or [ALL_SCOPE]
+
+
+class NewsStore:
+    """SQLite-backed article store with indexed time-window queries"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize NewsStore
+
+        Args:
+            path: SQLite database file; defaults to NEWS_STORE_PATH
+        """
+        if path is None:
+            path = os.getenv("NEWS_STORE_PATH", "data/news/news_sentiment.sqlite")
+        if not os.path.isabs(path):
+            path = str(Path(__file__).resolve().parents[1] / path)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or update articles.
+
+        Returns:
+            Number of articles written
+        """
+        count = 0
+        with self._lock, self._conn:
+            for article in articles:
+                url = article.get("url")
+                published = article.get("time_published")
+                if not url or not published:
+                    continue
+                published = normalize_time(published)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO articles (url, time_published, title, summary, source, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, published, article.get("title"), article.get("summary"), article.get("source"),
+                     json.dumps(article, ensure_ascii=False)),
+                )
+                for entry in article.get("ticker_sentiment") or []:
+                    if entry.get("ticker"):
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO article_tickers (ticker, time_published, url) VALUES (?, ?, ?)",
+                            (entry["ticker"], published, url),
+                        )
+                for entry in article.get("topics") or []:
+                    if entry.get("topic"):
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO article_topics (topic, time_published, url) VALUES (?, ?, ?)",
+                            (entry["topic"], published, url),
+                        )
+                count += 1
+        return count
+
+    def mark_covered(self, tickers: Optional[str], topics: Optional[str], time_from: str, time_to: str) -> None:
+        """Record that every article for these filters in [time_from, time_to] has been ingested"""
+        with self._lock, self._conn:
+            for scope in _scopes(tickers, topics):
+                self._conn.execute(
+                    "INSERT INTO coverage (scope, time_from, time_to, ingested_at) VALUES (?, ?, ?, ?)",
+                    (scope, normalize_time(time_from), normalize_time(time_to), time.time()),
+                )
+
+    def _scope_covers(self, scope: str, time_from: str, time_to: str) -> bool:
+        rows = self._conn.execute(
+            "SELECT time_from, time_to FROM coverage WHERE scope = ? AND time_to >= ? AND time_from <= ? "
+            "ORDER BY time_from",
+            (scope, time_from, time_to),
+        ).fetchall()
+        reached = time_from
+        for start, end in rows:
+            if start > reached:
+                return False
+            reached = max(reached, end)
+            if reached >= time_to:
+                return True
+        return False
+
+    def covers(self, tickers: Optional[str], topics: Optional[str], time_from: str, time_to: str) -> bool:
+        """Whether a query can be answered completely from the store"""
+        time_from, time_to = normalize_time(time_from), normalize_time(time_to)
+        with self._lock:
+            return all(self._scope_covers(scope, time_from, time_to) for scope in _scopes(tickers, topics))
+
+    def query(
+        self,
+        tickers: Optional[str] = None,
+        topics: Optional[str] = None,
+        time_from: Optional[str] = None,
+        time_to: Optional[str] = None,
+        sort: str = "LATEST",
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Articles mentioning all given tickers and topics, published within the window.
+
+        Args:
+            tickers: Comma separated tickers (all must be mentioned)
+            topics: Comma separated topics (all must be tagged)
+            time_from: Window start (YYYYMMDDTHHMM[SS]), inclusive
+            time_to: Window end (YYYYMMDDTHHMM[SS]), inclusive
+            sort: "LATEST" or "EARLIEST"
+            limit: Maximum number of articles
+
+        Returns:
+            Article dicts in Alpha Vantage feed format
+        """
+        joins, params = [], []
+        for i, ticker in enumerate(_split(tickers)):
+            joins.append(f"JOIN article_tickers t{i} ON t{i}.url = a.url AND t{i}.ticker = ?")
+            params.append(ticker)
+        for i, topic in enumerate(_split(topics)):
+            joins.append(f"JOIN article_topics p{i} ON p{i}.url = a.url AND p{i}.topic = ?")
+            params.append(topic)
+        clauses = []
+        if time_from:
+            clauses.append("a.time_published >= ?")
+            params.append(normalize_time(time_from))
+        if time_to:
+            clauses.append("a.time_published <= ?")
+            params.append(normalize_time(time_to))
+        order = "ASC" if sort.upper() == "EARLIEST" else "DESC"
+        sql = f"SELECT a.payload FROM articles a {' '.join(joins)}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY a.time_published {order} LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def articles_after(self, rowid: int, limit: int = 5000) -> List[Tuple[int, Dict[str, Any]]]:
+        """(rowid, article) pairs written after rowid, oldest write first (for incremental indexing)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, payload FROM articles WHERE rowid > ? ORDER BY rowid LIMIT ?", (rowid, limit)
+            ).fetchall()
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            windows = self._conn.execute("SELECT COUNT(*) FROM coverage").fetchone()[0]
+        return {"articles": articles, "coverage_windows": windows}
+
+
+_stores: Dict[str, NewsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_news_store() -> Optional[NewsStore]:
+    """Process-wide store for NEWS_STORE_PATH, or None when NEWS_STORE_MODE=off"""
+    if get_news_store_mode() == "off":
+        return None
+    path = os.getenv("NEWS_STORE_PATH", "data/news/news_sentiment.sqlite")
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = NewsStore(path)
+        return _stores[path]
+
+
+def ingest(
+    store: NewsStore,
+    fetch: Callable[..., List[Dict[str, Any]]],
+    tickers: List[str],
+    start: datetime,
+    end: datetime,
+    chunk_days: int = 7,
+    limit: int = 1000,
+) -> int:
+    """
+    Fill the store for a ticker universe and date window.
+
+    Each ticker is fetched in windows of chunk_days; a window that hits the API limit is
+    split in half until it returns fewer than limit articles, so every covered window is
+    complete. A window whose fetch raises (e.g. a response without a feed) is skipped and
+    not marked covered.
+
+    Args:
+        store: Target store
+        fetch: Callable(tickers=, topics=, time_from=, time_to=, sort=, limit=) returning feed items;
+            raises when the response has no feed
+        tickers: Tickers to ingest (an empty list ingests the unfiltered feed)
+        start: Window start
+        end: Window end
+        chunk_days: Days per API request
+        limit: Articles per API request (Alpha Vantage maximum: 1000)
+
+    Returns:
+        Number of articles written
+    """
+    total = 0
+
+    def fetch_window(ticker: Optional[str], window_start: datetime, window_end: datetime) -> None:
+        nonlocal total
+        time_from, time_to = window_start.strftime(TIME_FORMAT), window_end.strftime(TIME_FORMAT)
+        try:
+            articles = fetch(tickers=ticker, topics=None, time_from=time_from[:13], time_to=time_to[:13],
+                             sort="EARLIEST", limit=limit)
+        except Exception as e:
+            # Only windows the API answered with a feed are covered; this one is retried next run
+            print(f"⚠️ No feed for {ticker or 'all tickers'} {time_from}..{time_to}, window not covered: {e}")
+            return
+        if len(articles) >= limit and window_end - window_start > timedelta(hours=1):
+            middle = window_start + (window_end - window_start) / 2
+            fetch_window(ticker, window_start, middle)
+            fetch_window(ticker, middle, window_end)
+            return
+        total += store.add_articles(articles)
+        store.mark_covered(ticker, None, time_from, time_to)
+
+    for ticker in tickers or [None]:
+        window_start = start
+        while window_start < end:
+            window_end = min(end, window_start + timedelta(days=chunk_days))
+            fetch_window(ticker, window_start, window_end)
+            window_start = window_end
+        print(f"✅ Ingested news for {ticker or 'all tickers'} ({store.stats()['articles']} articles in store)")
+    return total
+
+
+def main():
+    project_root = str(Path(__file__).resolve().parents[1])
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+    parser = argparse.ArgumentParser(description="Bulk-ingest Alpha Vantage news into the offline news store")
+    parser.add_argument("--tickers", default="", help="Comma separated tickers, e.g. AAPL,MSFT")
+    parser.add_argument("--universe", choices=["nasdaq100", "sse50"], help="Ingest a predefined ticker universe")
+    parser.add_argument("--start", required=True, help="Window start (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="Window end (YYYY-MM-DD, exclusive)")
+    parser.add_argument("--chunk-days", type=int, default=7, help="Days per API request (default: 7)")
+    parser.add_argument("--db", default=None, help="SQLite file (default: NEWS_STORE_PATH)")
+    args = parser.parse_args()
+
+    from agent_tools.tool_alphavantage_news import AlphaVantageNewsTool
+    from tools.alphavantage_client import BULK
+    from tools.price_tools import all_nasdaq_100_symbols, all_sse_50_symbols
+
+    tickers = _split(args.tickers)
+    if args.universe == "nasdaq100":
+        tickers += all_nasdaq_100_symbols
+    elif args.universe == "sse50":
+        tickers += all_sse_50_symbols
+
+    store = NewsStore(args.db)
+    tool = AlphaVantageNewsTool()
+    written = ingest(
+        store,
+        # Bulk priority: agent queries sharing the API key are served first
+        functools.partial(tool._fetch_news, priority=BULK),
+        tickers,
+        datetime.strptime(args.start, "%Y-%m-%d"),
+        datetime.strptime(args.end, "%Y-%m-%d"),
+        chunk_days=args.chunk_days,
+    )
+    print(f"📰 Wrote {written} articles to {store.path}: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
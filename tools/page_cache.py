@@ -0,0 +1,152 @@
+"""
+Disk cache of scraped web pages for the Jina search tool.
+
+Agents backtesting the same date search similar queries and used to re-download the same
+URLs through the Jina reader. PageCache keeps every scraped page under PAGE_CACHE_DIR
+(default data/.page_cache):
+
+    entries/<sha256(url)>.json     url and other page fields, fetch time, ETag/Last-Modified,
+                                   content hash
+    blobs/<content hash>.json      title and content, stored once for all URLs serving them
+
+An entry younger than PAGE_CACHE_TTL seconds (default 86400) is served as is. An older
+entry is revalidated with If-None-Match/If-Modified-Since; a 304 answer only refreshes the
+fetch time. The validators are whatever the fetcher stored: for the Jina search tool they
+are the r.jina.ai reader's response headers, not the origin page's, so revalidation only
+saves a download if the reader honours them (otherwise a stale page is fetched again in
+full). Whether a page (cached or fresh) may be shown for the simulated TODAY_DATE is
+decided by the caller from its publish time.
+
+PAGE_CACHE=false disables the cache.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Page fields stored in the shared blob; the rest (url, publish time, ...) stay per entry
+CONTENT_FIELDS = ("title", "content")
+
+
+def is_page_cache_enabled() -> bool:
+    return os.getenv("PAGE_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class PageCache:
+    """URL-keyed page cache with TTL, conditional revalidation and content dedup"""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Initialize PageCache
+
+        Args:
+            cache_dir: Cache directory; defaults to PAGE_CACHE_DIR (data/.page_cache)
+            ttl: Seconds an entry is served without revalidation; defaults to PAGE_CACHE_TTL (86400)
+        """
+        if cache_dir is None:
+            cache_dir = os.getenv("PAGE_CACHE_DIR", "data/.page_cache")
+        if not os.path.isabs(cache_dir):
+            cache_dir = str(Path(__file__).resolve().parents[1] / cache_dir)
+        self.cache_dir = Path(cache_dir)
+        self.ttl = float(os.getenv("PAGE_CACHE_TTL", "86400")) if ttl is None else ttl
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        return self.cache_dir / "entries" / f"{self._url_key(url)}.json"
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.cache_dir / "blobs" / f"{content_hash}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for url.
+
+        Returns:
+            None on a miss, else {"page", "fresh", "etag", "last_modified", "fetched_at"};
+            fresh is False once the entry is older than the TTL and needs revalidation
+        """
+        entry = _read_json(self._entry_path(url))
+        if not entry or entry.get("url") != url:
+            return None
+        content = _read_json(self._blob_path(entry.get("content_hash", "")))
+        if content is None:
+            return None
+        return {
+            "page": {**entry.get("fields", {}), **content},
+            "fresh": time.time() - entry.get("fetched_at", 0) < self.ttl,
+            "etag": entry.get("etag"),
+            "last_modified": entry.get("last_modified"),
+            "fetched_at": entry.get("fetched_at"),
+        }
+
+    def put(self, url: str, page: Dict[str, Any], etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> str:
+        """Store a freshly fetched page; returns the hash of its title and content"""
+        content = {key: page[key] for key in CONTENT_FIELDS if key in page}
+        encoded = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        content_hash = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        if not blob_path.exists():
+            _write_json(blob_path, content)
+        _write_json(self._entry_path(url), {
+            "url": url,
+            "fields": {key: value for key, value in page.items() if key not in CONTENT_FIELDS},
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+        })
+        return content_hash
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated now (the origin answered 304 Not Modified)"""
+        entry = _read_json(self._entry_path(url))
+        if entry and entry.get("url") == url:
+            entry["fetched_at"] = time.time()
+            _write_json(self._entry_path(url), entry)
+
+    def stats(self) -> Dict[str, int]:
+        entries = self.cache_dir / "entries"
+        blobs = self.cache_dir / "blobs"
+        return {
+            "entries": len(list(entries.glob("*.json"))) if entries.exists() else 0,
+            "blobs": len(list(blobs.glob("*.json"))) if blobs.exists() else 0,
+        }
+
+
+_caches: Dict[str, PageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Process-wide cache for PAGE_CACHE_DIR, or None when PAGE_CACHE=false"""
+    if not is_page_cache_enabled():
+        return None
+    cache_dir = os.getenv("PAGE_CACHE_DIR", "data/.page_cache")
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = PageCache(cache_dir)
+        return _caches[cache_dir]
@@ -11,6 +11,16 @@ import seaborn as sns
 from pathlib import Path
 import json
 import argparse
+import sys
+
+project_root = str(Path(__file__).resolve().parents[1])
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+from tools.asof_join import CLOSE_FIELDS, AsOfSeries
+from tools.downsample import lttb_indices
+
+# Points drawn per line; longer series are reduced with LTTB (metrics use every point)
+MAX_PLOT_POINTS = 1000
 
 # Set seaborn style for beautiful plots
 sns.set_theme(style="whitegrid", palette="husl")
@@ -60,64 +70,31 @@ def calculate_rolling_metrics(df, is_hourly=True):
 
     # SR: Sortino Ratio (expanding window)
     periods_per_year = 252 * 6.5 if is_hourly else 252
-    sortino_ratios = []
+    returns = df['returns']
 
     # Use minimum periods to avoid unstable early calculations
     # For daily: 3 days is enough, for hourly: 10 hours
     min_periods = 10 if is_hourly else 3
 
-    for i in range(len(df)):
-        if i < min_periods:
-            sortino_ratios.append(np.nan)
-            continue
-
-        returns_so_far = df['returns'].iloc[1:i+1].dropna()
-
-        if len(returns_so_far) < min_periods:
-            sortino_ratios.append(np.nan)
-            continue
-
-        # Calculate downside deviation
-        negative_returns = returns_so_far[returns_so_far < 0]
-
-        if len(negative_returns) > 0:
-            downside_std = negative_returns.std()
-            # Use a minimum threshold for downside std to avoid extreme spikes
-            min_downside_std = 0.0001
-            downside_std = max(downside_std, min_downside_std)
-
-            sortino = (returns_so_far.mean() / downside_std) * np.sqrt(periods_per_year)
-            # Cap to reasonable range
-            sortino = np.clip(sortino, -20, 20)
-        else:
-            # No negative returns yet
-            mean_return = returns_so_far.mean()
-            if mean_return > 0:
-                sortino = 20  # Cap at upper limit
-            else:
-                sortino = 0
+    # Expanding aggregates over returns[1..i]; pandas skips the leading NaN return
+    count = returns.notna().cumsum()
+    mean_return = returns.expanding().mean()
+    negative_count = (returns < 0).cumsum()
+    downside_std = returns.where(returns < 0).expanding().std()
 
-        sortino_ratios.append(sortino)
+    # Use a minimum threshold for downside std to avoid extreme spikes
+    # (a single negative return has no std yet and leaves the ratio undefined)
+    min_downside_std = 0.0001
+    downside_std = downside_std.where(~(downside_std < min_downside_std), min_downside_std)
 
-    df['SR'] = sortino_ratios
+    # Cap to reasonable range; without negative returns yet, cap at the upper limit if gaining
+    sortino = np.clip(mean_return / downside_std * np.sqrt(periods_per_year), -20, 20)
+    sortino = sortino.where(negative_count > 0, np.where(mean_return > 0, 20, 0))
+    ready = (np.arange(len(df)) >= min_periods) & (count >= min_periods)
+    df['SR'] = sortino.where(ready)
 
     # Vol: Expanding Volatility
-    volatilities = []
-    for i in range(len(df)):
-        if i < 2:
-            volatilities.append(np.nan)
-            continue
-
-        returns_so_far = df['returns'].iloc[1:i+1].dropna()
-
-        if len(returns_so_far) < 2:
-            volatilities.append(np.nan)
-            continue
-
-        vol = returns_so_far.std() * np.sqrt(periods_per_year) * 100
-        volatilities.append(vol)
-
-    df['Vol'] = volatilities
+    df['Vol'] = returns.expanding(min_periods=2).std() * np.sqrt(periods_per_year) * 100
 
     # MDD: Maximum Drawdown
     cumulative = (1 + df['returns'].fillna(0)).cumprod()
@@ -133,39 +110,24 @@ def load_baseline_data(baseline_file, is_hourly=True, date_range=None):
     with open(baseline_file, 'r') as f:
         data = json.load(f)
 
-    # Find time series key
-    time_series_key = None
-    for key in ['Time Series (60min)', 'Time Series (Daily)', 'Time Series (Hourly)']:
-        if key in data:
-            time_series_key = key
-            break
-
-    if not time_series_key:
+    series = AsOfSeries.from_price_file(data, CLOSE_FIELDS)
+    if series is None:
         return None
 
-    time_series = data[time_series_key]
-
-    # Extract dates and prices
-    all_dates = sorted(time_series.keys())
-
-    # Filter by date range
+    # Filter by date range (timestamps are sorted, so slice with binary search)
+    first, last = 0, len(series)
     if date_range:
         start_date, end_date = date_range
-        if is_hourly:
-            dates = [d for d in all_dates if start_date <= d <= end_date]
-        else:
-            dates = [d for d in all_dates if start_date <= d <= end_date]
-    else:
-        dates = all_dates
-
-    if len(dates) < 2:
+        first = np.searchsorted(series.timestamps, start_date, side='left')
+        last = np.searchsorted(series.timestamps, end_date, side='right')
+
+    if last - first < 2:
         return None
 
     # Create DataFrame
-    prices = [float(time_series[d].get('4. close', time_series[d].get('4. sell price', 0))) for d in dates]
     df = pd.DataFrame({
-        'date': pd.to_datetime(dates),
-        'price': prices
+        'date': pd.to_datetime(series.timestamps[first:last]),
+        'price': series.prices[first:last]
     })
 
     # Normalize to portfolio value starting at 10000 (US) or 100000 (A-Stock)
@@ -196,7 +158,17 @@ def get_agent_date_range(agent_data_dir):
     return None
 
 
-def plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabel, title, output_file):
+def plot_points(df, metric_key, max_points=MAX_PLOT_POINTS):
+    """Non-NaN (date, metric) rows of df, reduced to max_points with LTTB on the time axis."""
+    plot_df = df[['date', metric_key]].dropna()
+    if max_points and len(plot_df) > max_points:
+        x = plot_df['date'].values.astype('datetime64[s]').astype(float)
+        plot_df = plot_df.iloc[lttb_indices(plot_df[metric_key].values, max_points, x)]
+    return plot_df
+
+
+def plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabel, title, output_file,
+                       max_points=MAX_PLOT_POINTS):
     """Create a single plot for one metric with larger fonts for better readability."""
     fig, ax = plt.subplots(figsize=(14, 8))
 
@@ -206,14 +178,14 @@ def plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabe
         color = AGENT_COLORS.get(display_name, None)
 
         # Skip NaN values for cleaner plots
-        plot_df = df[['date', metric_key]].dropna()
+        plot_df = plot_points(df, metric_key, max_points)
 
         ax.plot(plot_df['date'], plot_df[metric_key],
                label=display_name, linewidth=3.0, alpha=0.8, color=color)
 
     # Plot baseline if available
     if baseline_data is not None:
-        plot_df = baseline_data[['date', metric_key]].dropna()
+        plot_df = plot_points(baseline_data, metric_key, max_points)
         ax.plot(plot_df['date'], plot_df[metric_key],
                label='Baseline', linewidth=3.5, linestyle='--',
                color='black', alpha=0.7)
@@ -238,7 +210,8 @@ def plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabe
     plt.close()
 
 
-def plot_separate_metrics(agent_data, baseline_data, market_name, output_dir, is_hourly=True):
+def plot_separate_metrics(agent_data, baseline_data, market_name, output_dir, is_hourly=True,
+                          max_points=MAX_PLOT_POINTS):
     """Create 4 separate plots for each metric."""
     metrics = [
         ('CR', 'Cumulative Return (%)', 'Cumulative Return (CR)'),
@@ -252,10 +225,12 @@ def plot_separate_metrics(agent_data, baseline_data, market_name, output_dir, is
     for metric_key, ylabel, title in metrics:
         filename = f"{market_suffix}_{metric_key.lower()}_metrics.pdf"
         output_file = output_dir / filename
-        plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabel, title, output_file)
+        plot_single_metric(agent_data, baseline_data, market_name, metric_key, ylabel, title, output_file,
+                           max_points)
 
 
-def plot_market_metrics(agent_data, baseline_data, market_name, output_file, is_hourly=True):
+def plot_market_metrics(agent_data, baseline_data, market_name, output_file, is_hourly=True,
+                        max_points=MAX_PLOT_POINTS):
     """Create 4 horizontal subplots for a market."""
     fig, axes = plt.subplots(1, 4, figsize=(24, 5))
 
@@ -275,14 +250,14 @@ def plot_market_metrics(agent_data, baseline_data, market_name, output_file, is_
             color = AGENT_COLORS.get(display_name, None)
 
             # Skip NaN values for cleaner plots
-            plot_df = df[['date', metric_key]].dropna()
+            plot_df = plot_points(df, metric_key, max_points)
 
             ax.plot(plot_df['date'], plot_df[metric_key],
                    label=display_name, linewidth=2, alpha=0.8, color=color)
 
         # Plot baseline if available
         if baseline_data is not None:
-            plot_df = baseline_data[['date', metric_key]].dropna()
+            plot_df = plot_points(baseline_data, metric_key, max_points)
             ax.plot(plot_df['date'], plot_df[metric_key],
                    label='Baseline', linewidth=2.5, linestyle='--',
                    color='black', alpha=0.7)
@@ -313,6 +288,8 @@ def main():
     parser.add_argument('--skip-crypto', action='store_true', help='Skip Crypto market plots')
     parser.add_argument('--separate-plots', action='store_true', help='Save each metric as a separate plot instead of combined 4-subplot figure')
     parser.add_argument('--output-dir', default='plots', help='Output directory for plots')
+    parser.add_argument('--max-points', type=int, default=MAX_PLOT_POINTS,
+                        help=f'Points drawn per line, reduced with LTTB (0 draws all; default: {MAX_PLOT_POINTS})')
 
     args = parser.parse_args()
 
@@ -361,11 +338,11 @@ def main():
         if agent_data:
             if args.separate_plots:
                 plot_separate_metrics(agent_data, baseline_data, 'U.S. Market (NASDAQ-100)',
-                                    output_dir, is_hourly=True)
+                                    output_dir, is_hourly=True, max_points=args.max_points)
             else:
                 output_file = output_dir / 'us_market_metrics.pdf'
                 plot_market_metrics(agent_data, baseline_data, 'U.S. Market (NASDAQ-100)',
-                                  output_file, is_hourly=True)
+                                  output_file, is_hourly=True, max_points=args.max_points)
 
     # Process A-Stock Market
     if not args.skip_astock:
@@ -411,11 +388,11 @@ def main():
         if agent_data:
             if args.separate_plots:
                 plot_separate_metrics(agent_data, baseline_data, 'A-Share Market (SSE-50)',
-                                    output_dir, is_hourly=False)
+                                    output_dir, is_hourly=False, max_points=args.max_points)
             else:
                 output_file = output_dir / 'astock_market_metrics.pdf'
                 plot_market_metrics(agent_data, baseline_data, 'A-Share Market (SSE-50)',
-                                  output_file, is_hourly=False)
+                                  output_file, is_hourly=False, max_points=args.max_points)
 
     # Process Crypto Market
     if not args.skip_crypto:
@@ -458,11 +435,11 @@ def main():
         if agent_data:
             if args.separate_plots:
                 plot_separate_metrics(agent_data, baseline_data, 'Crypto Market',
-                                    output_dir, is_hourly=False)
+                                    output_dir, is_hourly=False, max_points=args.max_points)
             else:
                 output_file = output_dir / 'crypto_market_metrics.pdf'
                 plot_market_metrics(agent_data, baseline_data, 'Crypto Market',
-                                  output_file, is_hourly=False)
+                                  output_file, is_hourly=False, max_points=args.max_points)
 
     print("\n" + "=" * 70)
     print(f"✅ All plots saved to: {output_dir}/")
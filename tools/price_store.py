@@ -0,0 +1,201 @@
+"""
+Shared store for the merged price JSONL files.
+
+The price tools and tools.price_tools helpers used to re-read and re-parse merged.jsonl
+line by line on every call. The store indexes each file once per process and serves every
+caller (price lookups, open prices, previous-bar prices, trading calendar) from it. When
+all tool servers run in one consolidated process, the data is loaded once for all of them.
+
+Each process keeps the raw file bytes with a symbol -> byte range index plus a small LRU
+of parsed documents (PRICE_STORE_CACHE_SIZE), instead of every parsed document. The bytes
+are read once rather than memory-mapped: the data scripts rewrite merged.jsonl in place
+(open(path, "w")), and reading a mapping of a file truncated underneath it raises SIGBUS
+and kills the server. Multi-worker MCP servers (MCP_WORKERS > 1) hold one copy of the raw
+file per worker.
+
+Files are re-indexed automatically when their size or mtime changes, so data updates
+(or test fixtures rewriting a file) are picked up without a restart.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+
+def _first_series(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the first "Time Series ..." mapping of a document"""
+    for key, value in doc.items():
+        if key.startswith("Time Series"):
+            return value if isinstance(value, dict) else None
+    return None
+
+
+class PriceFile:
+    """
+    Line index over the raw bytes of one price file.
+
+    Besides the bytes, only the byte range of each symbol's line and the set of bar
+    timestamps are kept; documents are parsed on demand and held in a small LRU.
+    """
+
+    def __init__(self, path: Path, signature: Tuple[int, int], cache_size: int):
+        self.signature = signature
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+
+        # A private copy: a writer truncating the file cannot invalidate it mid-read
+        self._data = path.read_bytes() if signature[0] > 0 else b""
+
+        timestamps = set()
+        for start, end in self._lines():
+            doc = self._parse(start, end)
+            if doc is None:
+                continue
+            series = _first_series(doc)
+            if series:
+                timestamps.update(series.keys())
+            symbol = doc.get("Meta Data", {}).get("2. Symbol")
+            # Keep the first document per symbol, like the line-by-line lookups did
+            if symbol is not None and symbol not in self.offsets:
+                self.offsets[symbol] = (start, end)
+        self.timestamps: FrozenSet[str] = frozenset(timestamps)
+
+    def _lines(self):
+        size = len(self._data)
+        pos = 0
+        while pos < size:
+            end = self._data.find(b"\n", pos)
+            if end == -1:
+                end = size
+            yield pos, end
+            pos = end + 1
+
+    def _parse(self, start: int, end: int) -> Optional[Dict[str, Any]]:
+        line = self._data[start:end]
+        if not line.strip():
+            return None
+        try:
+            doc = json.loads(line)
+        except Exception:
+            return None
+        return doc if isinstance(doc, dict) else None
+
+    def get_document(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            doc = self._cache.get(symbol)
+            if doc is not None:
+                self._cache.move_to_end(symbol)
+                return doc
+        span = self.offsets.get(symbol)
+        if span is None:
+            return None
+        doc = self._parse(*span)
+        with self._lock:
+            self._cache[symbol] = doc
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return doc
+
+
+class PriceStore:
+    """Process-wide cache of indexed price files, validated against file size/mtime"""
+
+    def __init__(self, cache_size: Optional[int] = None):
+        """
+        Initialize PriceStore
+
+        Args:
+            cache_size: Parsed documents kept per file; defaults to PRICE_STORE_CACHE_SIZE (128)
+        """
+        if cache_size is None:
+            cache_size = int(os.getenv("PRICE_STORE_CACHE_SIZE", "128"))
+        self.cache_size = max(1, cache_size)
+        self._files: Dict[str, PriceFile] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: PathLike) -> Optional[PriceFile]:
+        """
+        Get the indexed contents of a price file.
+
+        Args:
+            path: Path to a merged JSONL price file
+
+        Returns:
+            PriceFile, or None if the file does not exist
+        """
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_size, stat.st_mtime_ns)
+        key = str(path.resolve())
+
+        cached = self._files.get(key)
+        if cached is not None and cached.signature == signature:
+            return cached
+        with self._lock:
+            cached = self._files.get(key)
+            if cached is None or cached.signature != signature:
+                # The old mapping is released once no reader references it any more
+                cached = PriceFile(path, signature, self.cache_size)
+                self._files[key] = cached
+            return cached
+
+    def symbols(self, path: PathLike) -> List[str]:
+        """Symbols of a file in file order (empty if missing)"""
+        loaded = self.load(path)
+        return list(loaded.offsets) if loaded is not None else []
+
+    def get_document(self, path: PathLike, symbol: str) -> Optional[Dict[str, Any]]:
+        """Full Alpha Vantage style document for one symbol"""
+        loaded = self.load(path)
+        return loaded.get_document(symbol) if loaded is not None else None
+
+    def get_series(self, path: PathLike, symbol: str, series_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Time series of one symbol.
+
+        Args:
+            path: Path to a merged JSONL price file
+            symbol: Symbol to look up
+            series_key: Exact series key (e.g. "Time Series (Daily)"); defaults to the
+                first key starting with "Time Series"
+        """
+        doc = self.get_document(path, symbol)
+        if doc is None:
+            return None
+        if series_key is not None:
+            return doc.get(series_key, {})
+        return _first_series(doc)
+
+    def timestamps(self, path: PathLike) -> FrozenSet[str]:
+        """All bar timestamps present in a file"""
+        loaded = self.load(path)
+        return loaded.timestamps if loaded is not None else frozenset()
+
+    def clear(self) -> None:
+        """Drop all cached files"""
+        with self._lock:
+            self._files.clear()
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_store() -> PriceStore:
+    """Process-wide PriceStore shared by all tools"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceStore()
+    return _store
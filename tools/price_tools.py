@@ -14,6 +14,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 from tools.general_tools import get_config_value
+from tools.asof_join import previous_timestamp, sorted_timestamps
+from tools.price_store import get_price_store
 
 def _normalize_timestamp_str(ts: str) -> str:
     """
@@ -470,23 +472,8 @@ def get_yesterday_date(today_date: str, merged_path: Optional[str] = None, marke
             yesterday_dt = input_dt - timedelta(hours=1)
             return yesterday_dt.strftime("%Y-%m-%d %H:%M:%S")
     
-    # 从 merged.jsonl 读取所有可用的交易时间
-    all_timestamps = set()
-    
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-                # 查找所有以 "Time Series" 开头的键
-                for key, value in doc.items():
-                    if key.startswith("Time Series"):
-                        if isinstance(value, dict):
-                            all_timestamps.update(value.keys())
-                        break
-            except Exception:
-                continue
+    # 从共享价格缓存读取 merged.jsonl 中所有可用的交易时间
+    all_timestamps = get_price_store().timestamps(merged_file)
     
     if not all_timestamps:
         # 如果没有找到任何时间戳，根据输入类型回退
@@ -499,20 +486,11 @@ def get_yesterday_date(today_date: str, merged_path: Optional[str] = None, marke
             yesterday_dt = input_dt - timedelta(hours=1)
             return yesterday_dt.strftime("%Y-%m-%d %H:%M:%S")
     
-    # 将所有时间戳转换为 datetime 对象，并找到小于 today_date 的最大时间戳
-    previous_timestamp = None
-    
-    for ts_str in all_timestamps:
-        try:
-            ts_dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-            if ts_dt < input_dt:
-                if previous_timestamp is None or ts_dt > previous_timestamp:
-                    previous_timestamp = ts_dt
-        except Exception:
-            continue
+    # 在排好序的日内时间戳中二分查找小于 today_date 的最大时间戳
+    previous = previous_timestamp(sorted_timestamps(all_timestamps, intraday_only=True), today_date)
     
     # 如果没有找到更早的时间戳，根据输入类型回退
-    if previous_timestamp is None:
+    if previous is None:
         if date_only:
             yesterday_dt = input_dt - timedelta(days=1)
             while yesterday_dt.weekday() >= 5:
@@ -524,9 +502,9 @@ def get_yesterday_date(today_date: str, merged_path: Optional[str] = None, marke
 
     # 返回结果
     if date_only:
-        return previous_timestamp.strftime("%Y-%m-%d")
+        return previous.split(" ", 1)[0]
     else:
-        return previous_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return previous
 
 
 
@@ -552,35 +530,22 @@ def get_open_prices(
     if not merged_file.exists():
         return results
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
+    store = get_price_store()
+    for sym in store.symbols(merged_file):
+        if sym not in wanted:
+            continue
+        series = store.get_series(merged_file, sym)
+        if not isinstance(series, dict):
+            continue
+        bar = series.get(today_date)
+
+        if isinstance(bar, dict):
+            open_val = bar.get("1. buy price")
+
             try:
-                doc = json.loads(line)
+                results[f"{sym}_price"] = float(open_val) if open_val is not None else None
             except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            # 查找所有以 "Time Series" 开头的键
-            series = None
-            for key, value in doc.items():
-                if key.startswith("Time Series"):
-                    series = value
-                    break
-            if not isinstance(series, dict):
-                continue
-            bar = series.get(today_date)
-            
-            if isinstance(bar, dict):
-                open_val = bar.get("1. buy price")
-                
-                try:
-                    results[f"{sym}_price"] = float(open_val) if open_val is not None else None
-                except Exception:
-                    results[f"{sym}_price"] = None
+                results[f"{sym}_price"] = None
 
     return results
 
@@ -610,78 +575,32 @@ def get_yesterday_open_and_close_price(
 
     yesterday_date = get_yesterday_date(today_date, merged_path=merged_path, market=market)
 
-    with merged_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                doc = json.loads(line)
-            except Exception:
-                continue
-            meta = doc.get("Meta Data", {}) if isinstance(doc, dict) else {}
-            sym = meta.get("2. Symbol")
-            if sym not in wanted:
-                continue
-            # 查找所有以 "Time Series" 开头的键
-            series = None
-            for key, value in doc.items():
-                if key.startswith("Time Series"):
-                    series = value
-                    break
-            if not isinstance(series, dict):
-                continue
+    store = get_price_store()
+    for sym in store.symbols(merged_file):
+        if sym not in wanted:
+            continue
+        series = store.get_series(merged_file, sym)
+        if not isinstance(series, dict):
+            continue
 
-            # 尝试获取昨日买入价和卖出价
-            bar = series.get(yesterday_date)
-            if isinstance(bar, dict):
-                buy_val = bar.get("1. buy price")  # 买入价字段
-                sell_val = bar.get("4. sell price")  # 卖出价字段
+        # 尝试获取昨日买入价和卖出价
+        bar = series.get(yesterday_date)
+        if isinstance(bar, dict):
+            buy_val = bar.get("1. buy price")  # 买入价字段
+            sell_val = bar.get("4. sell price")  # 卖出价字段
 
-                try:
-                    buy_price = float(buy_val) if buy_val is not None else None
-                    sell_price = float(sell_val) if sell_val is not None else None
-                    buy_results[f"{sym}_price"] = buy_price
-                    sell_results[f"{sym}_price"] = sell_price
-                except Exception:
-                    buy_results[f"{sym}_price"] = None
-                    sell_results[f"{sym}_price"] = None
-            else:
-                # 如果昨日没有数据，尝试向前查找最近的交易日
-                # raise ValueError(f"No data found for {sym} on {yesterday_date}")
-                # print(f"No data found for {sym} on {yesterday_date}")
-                buy_results[f'{sym}_price'] = None
-                sell_results[f'{sym}_price'] = None
-                # today_dt = datetime.strptime(today_date, "%Y-%m-%d")
-                # yesterday_dt = today_dt - timedelta(days=1)
-                # current_date = yesterday_dt
-                # found_data = False
-                
-                # # 最多向前查找5个交易日
-                # for _ in range(5):
-                #     current_date -= timedelta(days=1)
-                #     # 跳过周末
-                #     while current_date.weekday() >= 5:
-                #         current_date -= timedelta(days=1)
-                    
-                #     check_date = current_date.strftime("%Y-%m-%d")
-                #     bar = series.get(check_date)
-                #     if isinstance(bar, dict):
-                #         buy_val = bar.get("1. buy price")
-                #         sell_val = bar.get("4. sell price")
-                        
-                #         try:
-                #             buy_price = float(buy_val) if buy_val is not None else None
-                #             sell_price = float(sell_val) if sell_val is not None else None
-                #             buy_results[f'{sym}_price'] = buy_price
-                #             sell_results[f'{sym}_price'] = sell_price
-                #             found_data = True
-                #             break
-                #         except Exception:
-                #             continue
-                
-                # if not found_data:
-                #     buy_results[f'{sym}_price'] = None
-                #     sell_results[f'{sym}_price'] = None
+            try:
+                buy_price = float(buy_val) if buy_val is not None else None
+                sell_price = float(sell_val) if sell_val is not None else None
+                buy_results[f"{sym}_price"] = buy_price
+                sell_results[f"{sym}_price"] = sell_price
+            except Exception:
+                buy_results[f"{sym}_price"] = None
+                sell_results[f"{sym}_price"] = None
+        else:
+            # 昨日没有数据
+            buy_results[f'{sym}_price'] = None
+            sell_results[f'{sym}_price'] = None
 
     return buy_results, sell_results
 
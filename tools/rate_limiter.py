@@ -0,0 +1,304 @@
+"""
+Cross-process rate limiting for LLM provider calls.
+
+Every provider (keyed by its base URL) gets a token bucket and a circuit breaker whose
+state lives in a small JSON file under data/.rate_limits/. All agent processes spawned by
+main_parrallel.py read and update the same file under an fcntl lock, so when a provider
+starts throttling, every process backs off together instead of retrying on its own.
+
+Agents attach a ProviderCallLimiter callback to their runs, so every model call made by
+the agent loop (not every agent invocation) takes a token, and only provider errors
+(throttling, 5xx, timeouts, connection failures) count towards opening the circuit.
+
+Configuration (environment variables):
+    LLM_RATE_LIMIT_RPM: Requests per minute allowed per provider (default 60)
+    LLM_RATE_LIMIT_BURST: Bucket capacity, i.e. max burst size (default 10)
+    LLM_CIRCUIT_FAILURES: Consecutive failures that open the circuit (default 5)
+    LLM_CIRCUIT_COOLDOWN: Seconds the circuit stays open after tripping (default 30)
+    RATE_LIMIT_DIR: Directory holding the shared state files (default data/.rate_limits)
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+# Upper bound for a single circuit-open period, regardless of how often it trips
+MAX_CIRCUIT_COOLDOWN = 600.0
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float = 60.0) -> float:
+    """
+    Exponential backoff with equal jitter.
+
+    Args:
+        attempt: 1-based attempt number that just failed
+        base_delay: Delay for the first retry
+        max_delay: Upper bound for the un-jittered delay
+
+    Returns:
+        Seconds to wait before the next attempt, in [delay/2, delay]
+    """
+    delay = min(max_delay, base_delay * (2 ** max(attempt - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Heuristically detect provider throttling errors (HTTP 429 / quota messages)."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "too many requests" in text
+
+
+def is_provider_error(error: BaseException) -> bool:
+    """
+    Whether an error means the provider is throttling or unavailable (HTTP 429/5xx,
+    timeouts, connection failures), as opposed to a bad request, tool or parsing error.
+    The error's cause chain is checked too, since frameworks often wrap client errors.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if isinstance(status, int) and (status == 429 or status >= 500):
+            return True
+        if isinstance(error, (TimeoutError, ConnectionError)) or is_rate_limit_error(error):
+            return True
+        # Client library errors (openai.APITimeoutError, httpx.ConnectTimeout, ...) by name
+        name = type(error).__name__
+        if "Timeout" in name or name in ("APIConnectionError", "InternalServerError", "ServiceUnavailableError"):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class ProviderRateLimiter:
+    """
+    Token bucket plus circuit breaker shared by all processes calling one provider.
+
+    The state file holds:
+        tokens / updated_at: token bucket level and last refill time
+        failures: consecutive failure count
+        trips: number of times the circuit opened without a success in between
+        open_until: while in the future the circuit is open and callers wait
+        probe_until: after the circuit re-closes, only one caller probes until this time
+    """
+
+    def __init__(
+        self,
+        key: str,
+        rate_per_minute: float = 60.0,
+        burst: int = 10,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        state_dir: Optional[str] = None,
+    ):
+        """
+        Initialize ProviderRateLimiter
+
+        Args:
+            key: Provider identifier, usually the OpenAI-compatible base URL
+            rate_per_minute: Sustained request budget per minute
+            burst: Bucket capacity
+            failure_threshold: Consecutive failures before the circuit opens
+            cooldown: Base open duration in seconds, doubled on every repeated trip
+            state_dir: Directory for the shared state/lock files
+        """
+        self.key = key
+        self.rate_per_second = max(rate_per_minute, 1e-6) / 60.0
+        self.burst = max(int(burst), 1)
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.cooldown = cooldown
+
+        if state_dir is None:
+            state_dir = os.getenv("RATE_LIMIT_DIR") or str(Path(__file__).resolve().parents[1] / "data" / ".rate_limits")
+        slug = hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_file = self.state_dir / f"{slug}.json"
+        self.lock_file = self.state_dir / f".{slug}.lock"
+
+    @contextmanager
+    def _locked_state(self):
+        """Yield the shared state dict under an exclusive lock and persist it on exit."""
+        with open(self.lock_file, "a+") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                state = self._read_state()
+                yield state
+                tmp_file = self.state_file.with_suffix(".tmp")
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_file, self.state_file)
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _read_state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        state.setdefault("key", self.key)
+        state.setdefault("tokens", float(self.burst))
+        state.setdefault("updated_at", time.time())
+        state.setdefault("failures", 0)
+        state.setdefault("trips", 0)
+        state.setdefault("open_until", 0.0)
+        state.setdefault("probe_until", 0.0)
+        return state
+
+    def try_acquire(self, now: Optional[float] = None, reserve: float = 0.0) -> float:
+        """
+        Try to take one token.
+
+        Args:
+            now: Current time (for tests)
+            reserve: Tokens that must remain in the bucket after this call, so low
+                priority callers leave headroom for others
+
+        Returns:
+            0.0 if the call may proceed, otherwise the number of seconds to wait
+            before trying again (circuit open, probe in flight, or bucket empty)
+        """
+        now = time.time() if now is None else now
+        with self._locked_state() as state:
+            if state["open_until"] > now:
+                return state["open_until"] - now
+
+            # Half-open: the first caller after the cooldown probes the provider alone
+            if state["trips"] > 0:
+                if state["probe_until"] > now:
+                    return min(state["probe_until"] - now, 1.0)
+                state["probe_until"] = now + max(self.cooldown, 1.0)
+
+            elapsed = max(0.0, now - state["updated_at"])
+            state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * self.rate_per_second)
+            state["updated_at"] = now
+            needed = 1.0 + min(max(reserve, 0.0), self.burst - 1.0)
+            if state["tokens"] >= needed:
+                state["tokens"] -= 1.0
+                return 0.0
+            return (needed - state["tokens"]) / self.rate_per_second
+
+    async def acquire(self, max_wait: Optional[float] = None) -> float:
+        """
+        Wait until the bucket and circuit allow a call.
+
+        Waiting here does not consume a retry attempt: while the circuit is open the
+        session simply pauses.
+
+        Args:
+            max_wait: Optional cap on the total time spent waiting
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            # The state file is read and written under a blocking flock, off the event loop
+            wait = await asyncio.to_thread(self.try_acquire)
+            if wait <= 0:
+                return waited
+            if max_wait is not None and waited + wait > max_wait:
+                raise TimeoutError(f"Rate limiter for {self.key} did not admit a call within {max_wait}s")
+            # Small jitter keeps processes from waking up in lockstep
+            wait += random.uniform(0, min(0.25, wait * 0.1))
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        with self._locked_state() as state:
+            state["failures"] = 0
+            state["trips"] = 0
+            state["open_until"] = 0.0
+            state["probe_until"] = 0.0
+
+    def record_failure(self, error: Optional[BaseException] = None, now: Optional[float] = None) -> None:
+        """
+        Register a failed call; opens the circuit once the failure threshold is reached.
+
+        A throttling error also drains the bucket so every process slows down at once.
+        """
+        now = time.time() if now is None else now
+        with self._locked_state() as state:
+            state["failures"] += 1
+            state["probe_until"] = 0.0
+            if error is not None and is_rate_limit_error(error):
+                state["tokens"] = 0.0
+                state["updated_at"] = now
+            half_open_probe_failed = state["trips"] > 0 and state["open_until"] <= now
+            if state["failures"] >= self.failure_threshold or half_open_probe_failed:
+                cooldown = min(MAX_CIRCUIT_COOLDOWN, self.cooldown * (2 ** state["trips"]))
+                state["open_until"] = now + cooldown
+                state["trips"] += 1
+                state["failures"] = 0
+                print(f"⛔ Circuit opened for {self.key} for {cooldown:.1f}s (trip {state['trips']})")
+
+    def status(self) -> Dict[str, Any]:
+        """Return a snapshot of the shared state (for diagnostics)."""
+        with self._locked_state() as state:
+            return dict(state)
+
+
+class ProviderCallLimiter(AsyncCallbackHandler):
+    """
+    LangChain callback that throttles every model call of a run through a limiter.
+
+    Passed as a run callback, it fires for each model call the agent loop makes: the call
+    waits for a token before it starts, a success closes the circuit and a provider error
+    counts as a failure. Tool, parsing and other errors are left to the caller.
+    """
+
+    def __init__(self, limiter: ProviderRateLimiter):
+        self.limiter = limiter
+
+    async def on_chat_model_start(self, serialized: Dict[str, Any], messages: Any, **kwargs: Any) -> None:
+        await self.limiter.acquire()
+
+    async def on_llm_start(self, serialized: Dict[str, Any], prompts: Any, **kwargs: Any) -> None:
+        await self.limiter.acquire()
+
+    async def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        await asyncio.to_thread(self.limiter.record_success)
+
+    async def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        if is_provider_error(error):
+            await asyncio.to_thread(self.limiter.record_failure, error)
+
+
+_LIMITERS: Dict[str, ProviderRateLimiter] = {}
+
+
+def get_provider_limiter(base_url: Optional[str]) -> ProviderRateLimiter:
+    """
+    Get the process-wide limiter for an LLM provider.
+
+    Args:
+        base_url: OpenAI-compatible base URL; None means the default OpenAI endpoint
+
+    Returns:
+        ProviderRateLimiter configured from LLM_RATE_LIMIT_* / LLM_CIRCUIT_* env vars
+    """
+    key = (base_url or "https://api.openai.com/v1").rstrip("/")
+    if key not in _LIMITERS:
+        _LIMITERS[key] = ProviderRateLimiter(
+            key,
+            rate_per_minute=float(os.getenv("LLM_RATE_LIMIT_RPM", "60")),
+            burst=int(os.getenv("LLM_RATE_LIMIT_BURST", "10")),
+            failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURES", "5")),
+            cooldown=float(os.getenv("LLM_CIRCUIT_COOLDOWN", "30")),
+        )
+    return _LIMITERS[key]
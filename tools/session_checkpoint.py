@@ -0,0 +1,90 @@
+"""
+Step-level checkpoints for trading sessions.
+
+After every completed step the session's system prompt, message list and step counter are
+written to checkpoint.json next to the session's log.jsonl. When run_with_retry restarts a
+failed session (or a preempted run is started again), run_trading_session resumes from the
+last completed step instead of rebuilding the prompt and repeating every LLM call, so
+trades already recorded in position.jsonl are not replayed. The checkpoint is removed once
+the session has finished.
+
+Set SESSION_CHECKPOINT=false to disable checkpointing.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_VERSION = 1
+
+
+class SessionCheckpoint:
+    """Atomic JSON checkpoint for one trading session"""
+
+    def __init__(self, log_dir: str, enabled: Optional[bool] = None):
+        """
+        Initialize SessionCheckpoint
+
+        Args:
+            log_dir: Session log directory (e.g. data/agent_data/<signature>/log/<date>)
+            enabled: Whether to read/write checkpoints; defaults to SESSION_CHECKPOINT (true)
+        """
+        if enabled is None:
+            enabled = os.getenv("SESSION_CHECKPOINT", "true").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self.path = os.path.join(log_dir, "checkpoint.json")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the last checkpoint.
+
+        Returns:
+            Dict with system_prompt, messages, step and finished, or None if there is no
+            usable checkpoint
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+        if state.get("version") != CHECKPOINT_VERSION or not isinstance(state.get("messages"), list):
+            print(f"⚠️ Ignoring incompatible checkpoint {self.path}")
+            return None
+        state.setdefault("finished", False)
+        return state
+
+    def save(self, system_prompt: str, messages: List[Dict[str, Any]], step: int, finished: bool = False) -> None:
+        """
+        Persist the session state after a completed step.
+
+        Args:
+            system_prompt: System prompt the session was started with
+            messages: Conversation so far
+            step: Number of completed steps
+            finished: True once the agent emitted the stop signal
+        """
+        if not self.enabled:
+            return
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "system_prompt": system_prompt,
+            "messages": messages,
+            "step": step,
+            "finished": finished,
+        }
+        # Called on the event loop after every step, so no fsync: os.replace already keeps
+        # the file whole if the process dies, and a checkpoint torn by a power loss is
+        # ignored by load() (the session then starts over)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove the checkpoint after the session completed"""
+        for path in (self.path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
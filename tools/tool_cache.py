@@ -0,0 +1,188 @@
+"""
+Point-in-time result cache for read-only MCP tools.
+
+Data tools (get_price_local, get_market_news, get_information) are called with the same
+arguments by every agent backtesting the same simulated date. cached_tool memoizes their
+results under (tool name, normalized arguments, TODAY_DATE): TODAY_DATE is part of the
+key because these tools hide data from after the simulated time, so a result is only
+valid for the date it was produced on. The agent signature is not part of the key, so
+all models share the entries.
+
+    - In memory: LRU of TOOL_CACHE_SIZE entries (default 1024) per process.
+    - On disk (optional): set TOOL_CACHE_DIR to also keep JSON entries there, which
+      survive restarts and are shared by every process/worker using the directory.
+
+Failures (raised exceptions, {"error": ...} dicts, "❌"/"⚠️" messages) are never cached.
+Trade tools change state and must not use this decorator. TOOL_CACHE=false disables it.
+Clear TOOL_CACHE_DIR after refreshing price/news data, since disk entries do not expire.
+"""
+
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tools.general_tools import get_config_value
+
+_MISS = object()
+
+
+def is_cache_enabled() -> bool:
+    return os.getenv("TOOL_CACHE", "true").lower() not in ("0", "false", "no")
+
+
+def _is_cacheable(result: Any) -> bool:
+    if isinstance(result, dict):
+        return "error" not in result
+    if isinstance(result, str):
+        return not result.lstrip().startswith(("❌", "⚠️"))
+    return True
+
+
+class ToolResultCache:
+    """LRU of tool results with an optional JSON directory as second tier"""
+
+    def __init__(self, max_entries: Optional[int] = None, cache_dir: Optional[str] = None):
+        """
+        Initialize ToolResultCache
+
+        Args:
+            max_entries: In-memory entries; defaults to TOOL_CACHE_SIZE (1024)
+            cache_dir: Directory for the disk tier; defaults to TOOL_CACHE_DIR (disabled if unset)
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+        if cache_dir is None:
+            cache_dir = os.getenv("TOOL_CACHE_DIR") or None
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(tool: str, arguments: Dict[str, Any], today_date: Optional[str]) -> str:
+        payload = json.dumps([tool, arguments, today_date], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, tool: str, key: str) -> Path:
+        return self.cache_dir / tool / f"{key}.json"
+
+    def get(self, tool: str, key: str) -> Any:
+        """Cached result, or _MISS"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+
+        if self.cache_dir is not None:
+            try:
+                with open(self._disk_path(tool, key), "r", encoding="utf-8") as f:
+                    result = json.load(f)["result"]
+            except (OSError, ValueError, KeyError):
+                pass
+            else:
+                self._remember(key, result)
+                with self._lock:
+                    self.disk_hits += 1
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self.misses += 1
+        return _MISS
+
+    def put(self, tool: str, key: str, result: Any) -> None:
+        self._remember(key, copy.deepcopy(result))
+        if self.cache_dir is None:
+            return
+        try:
+            encoded = json.dumps({"tool": tool, "result": result}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        path = self._disk_path(tool, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+
+TOOL_CACHE = ToolResultCache()
+
+
+def _normalized_arguments(signature: inspect.Signature, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Bind positional/keyword arguments and fill defaults, so equivalent calls share a key"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+def cached_tool(fn: Callable) -> Callable:
+    """
+    Decorator caching a read-only tool's results per (tool, arguments, TODAY_DATE).
+
+    Apply it below @mcp.tool() (and @instrument_tool, so cache hits are still counted as
+    calls); the wrapper keeps the original signature, so tool schemas are unchanged.
+    """
+    name = fn.__name__
+    signature = inspect.signature(fn)
+
+    def _key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        arguments = _normalized_arguments(signature, args, kwargs)
+        return ToolResultCache.make_key(name, arguments, get_config_value("TODAY_DATE"))
+
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not is_cache_enabled():
+                return await fn(*args, **kwargs)
+            key = _key(args, kwargs)
+            result = TOOL_CACHE.get(name, key)
+            if result is _MISS:
+                result = await fn(*args, **kwargs)
+                if _is_cacheable(result):
+                    TOOL_CACHE.put(name, key, result)
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not is_cache_enabled():
+            return fn(*args, **kwargs)
+        key = _key(args, kwargs)
+        result = TOOL_CACHE.get(name, key)
+        if result is _MISS:
+            result = fn(*args, **kwargs)
+            if _is_cacheable(result):
+                TOOL_CACHE.put(name, key, result)
+        return result
+
+    return wrapper
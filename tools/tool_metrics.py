@@ -0,0 +1,168 @@
+"""
+Per-tool call metrics for the MCP tool servers.
+
+instrument_tool wraps a tool function and records, per (tool, signature):
+    - mcp_tool_calls_total            number of calls
+    - mcp_tool_errors_total           calls that raised or returned {"error": ...}
+    - mcp_tool_latency_seconds        latency histogram (buckets, sum, count)
+
+The signature label is the agent signature from the runtime config (SIGNATURE), so a
+slow tool can be traced to the models calling it. register_metrics_route() serves the
+metrics in Prometheus text format from GET /metrics on a FastMCP server; the consolidated
+server exposes one /metrics for all mounted tools.
+
+Metrics are per process: with MCP_WORKERS > 1 every worker reports its own share.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools.general_tools import get_config_value
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[str, str]
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "buckets", "total")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+
+
+class ToolMetrics:
+    """Thread-safe registry of per-tool counters and latency histograms"""
+
+    def __init__(self):
+        self._series: Dict[Labels, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, tool: str, signature: str, seconds: float, error: bool) -> None:
+        """Record one finished tool call"""
+        with self._lock:
+            series = self._series.get((tool, signature))
+            if series is None:
+                series = self._series[(tool, signature)] = _Series()
+            series.calls += 1
+            if error:
+                series.errors += 1
+            series.total += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    series.buckets[i] += 1
+
+    def snapshot(self) -> Dict[Labels, Dict[str, Any]]:
+        """Copy of all series: {(tool, signature): {calls, errors, buckets, sum}}"""
+        with self._lock:
+            return {
+                labels: {"calls": s.calls, "errors": s.errors, "buckets": list(s.buckets), "sum": s.total}
+                for labels, s in self._series.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """All series in Prometheus text exposition format"""
+        snapshot = sorted(self.snapshot().items())
+        lines: List[str] = [
+            "# HELP mcp_tool_calls_total Tool calls.",
+            "# TYPE mcp_tool_calls_total counter",
+        ]
+        for (tool, signature), s in snapshot:
+            lines.append(f"mcp_tool_calls_total{{{_labels(tool, signature)}}} {s['calls']}")
+        lines += ["# HELP mcp_tool_errors_total Tool calls that raised or returned an error.",
+                  "# TYPE mcp_tool_errors_total counter"]
+        for (tool, signature), s in snapshot:
+            lines.append(f"mcp_tool_errors_total{{{_labels(tool, signature)}}} {s['errors']}")
+        lines += ["# HELP mcp_tool_latency_seconds Tool call latency.",
+                  "# TYPE mcp_tool_latency_seconds histogram"]
+        for (tool, signature), s in snapshot:
+            labels = _labels(tool, signature)
+            for bound, count in zip(LATENCY_BUCKETS, s["buckets"]):
+                lines.append(f'mcp_tool_latency_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'mcp_tool_latency_seconds_bucket{{{labels},le="+Inf"}} {s["calls"]}')
+            lines.append(f"mcp_tool_latency_seconds_sum{{{labels}}} {s['sum']:.6f}")
+            lines.append(f"mcp_tool_latency_seconds_count{{{labels}}} {s['calls']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(tool: str, signature: str) -> str:
+    return f'tool="{_escape(tool)}",signature="{_escape(signature)}"'
+
+
+TOOL_METRICS = ToolMetrics()
+
+
+def _is_error(result: Any) -> bool:
+    # Tools in this repo report failures as {"error": ...} dicts rather than raising
+    return isinstance(result, dict) and "error" in result
+
+
+def _current_signature() -> str:
+    try:
+        return str(get_config_value("SIGNATURE") or "unknown")
+    except Exception:
+        return "unknown"
+
+
+def instrument_tool(fn: Callable) -> Callable:
+    """
+    Decorator recording call count, errors and latency of a tool function.
+
+    Apply it below @mcp.tool() so FastMCP registers the instrumented function; the
+    wrapper keeps the original signature and docstring, so tool schemas are unchanged.
+    """
+    name = fn.__name__
+
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await fn(*args, **kwargs)
+                error = _is_error(result)
+                return result
+            finally:
+                TOOL_METRICS.observe(name, _current_signature(), time.perf_counter() - start, error)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        error = True
+        try:
+            result = fn(*args, **kwargs)
+            error = _is_error(result)
+            return result
+        finally:
+            TOOL_METRICS.observe(name, _current_signature(), time.perf_counter() - start, error)
+
+    return wrapper
+
+
+async def metrics_endpoint(request: Any) -> Any:
+    """Starlette handler serving TOOL_METRICS in Prometheus text format"""
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(TOOL_METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def register_metrics_route(mcp: Any) -> None:
+    """Serve GET /metrics from a FastMCP server (next to its /mcp endpoint)"""
+    mcp.custom_route("/metrics", methods=["GET"])(metrics_endpoint)